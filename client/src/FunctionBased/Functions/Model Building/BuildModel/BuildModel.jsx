@@ -210,6 +210,7 @@ function BuildModel({
             [Type === "regressor" ? "regressor" : "classifier"]: reg,
             ...model_setting,
             file: csvData,
+            inline_model: true,
           }),
         }
       );
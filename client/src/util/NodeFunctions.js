@@ -1393,6 +1393,7 @@ export const handleModel = async (rflow, params) => {
         target_var: testTrain.target_variable,
         ...model_setting,
         file: testTrain.table,
+        inline_model: true,
       }),
     });
     const data = await res.json();
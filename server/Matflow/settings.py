@@ -53,6 +53,7 @@ INSTALLED_APPS = [
     'pfs',
     'eda',
     "dataset_manager",
+    'jobs',
     # 'graph_analysis'
 ]
 REST_FRAMEWORK = {
@@ -161,3 +162,41 @@ CORS_ALLOW_METHODS = [
     'OPTIONS',
 ]
 
+
+# Memory budget (in bytes) for datasets kept in RAM by the dataset store
+DATASET_STORE_MEMORY = 2 * 1024 ** 3
+# Memory budget (in bytes) for parsed dataset files cached by read_file
+DATASET_READ_CACHE_MEMORY = 1024 ** 3
+# Memory budget (in bytes) for the filtered and sorted row orders of dataset windows
+DATASET_WINDOW_CACHE_MEMORY = 256 * 1024 ** 2
+# Background jobs running at the same time, and how long (in seconds) finished jobs are kept
+JOB_WORKERS = 2
+JOB_RETENTION = 24 * 3600
+# Seconds between checks for jobs cancelled through another server process
+JOB_CANCEL_CHECK = 1
+# Memory budget (in bytes) for cached feature selection scores, and whether they are also kept on disk
+PFS_SCORE_CACHE_MEMORY = 64 * 1024 ** 2
+PFS_SCORE_CACHE_DISK = True
+# Memory budget (in bytes) for fitted models kept unpickled by the model registry, and the gzip level of its files
+MODEL_REGISTRY_MEMORY = 1024 ** 3
+MODEL_COMPRESS_LEVEL = 3
+# Seconds a single-row prediction waits for more rows to predict with it (0: only rows queued meanwhile), and the largest batch
+PREDICT_BATCH_WINDOW = 0
+PREDICT_MAX_BATCH = 256
+# Rows per chunk when batch_predict streams a dataset through a model
+BATCH_PREDICT_CHUNKSIZE = 50000
+# Points kept per ROC/precision-recall curve, larger test sets are decimated to this resolution
+CURVE_MAX_POINTS = 1000
+# Keep hyperparameter trials in dataset/.cache/studies.sqlite3 so later searches resume and warm-start from them
+HYPER_STUDIES = True
+# Seconds a leaderboard model may take to fit and evaluate before it is stopped
+LEADERBOARD_TIMEOUT = 600
+# Numeric targets with at most this many distinct values are ranked as classification when 'type' is missing
+LEADERBOARD_MAX_CLASSES = 20
+# Default and maximum DPI of EDA PNG renderings, which are only drawn when a request asks for png/svg
+EDA_DPI = 150
+EDA_MAX_DPI = 300
+# EDA plot results: memory budget, and whether to also keep them, up to a byte budget, in dataset/.cache/plots.sqlite3
+EDA_PLOT_CACHE_MEMORY = 256 * 1024 ** 2
+EDA_PLOT_CACHE_DISK = True
+EDA_PLOT_CACHE_DISK_BYTES = 1024 ** 3
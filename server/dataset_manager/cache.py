@@ -0,0 +1,85 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def sizeof(value):
+    """
+    Approximate in-memory size of a cached value in bytes.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    nbytes = getattr(value, 'nbytes', None)
+    if nbytes is not None:
+        return int(nbytes)
+    return sys.getsizeof(value)
+
+
+def column_hash(series):
+    """
+    Fingerprint of a column's name, dtype and values in row order.
+    """
+    digest = hashlib.sha1(f"{series.name}|{series.dtype}".encode())
+    digest.update(pd.util.hash_pandas_object(series, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by an approximate memory budget.
+
+    Values larger than the whole budget are not kept at all.
+    """
+
+    def __init__(self, max_bytes, sizer=sizeof):
+        self.max_bytes = max_bytes
+        self.sizer = sizer
+        self.current_bytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key][0]
+
+    def put(self, key, value):
+        size = self.sizer(value)
+        with self._lock:
+            if key in self._items:
+                self.current_bytes -= self._items.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._items[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                return default
+            value, size = self._items.pop(key)
+            self.current_bytes -= size
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.current_bytes = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
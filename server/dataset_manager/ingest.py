@@ -0,0 +1,291 @@
+import io
+import os
+import pickle
+import re
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from .reader import READ_CACHE_MEMORY, prime
+
+# Partially received uploads, hidden from the file tab
+UPLOAD_DIR = os.path.join(settings.BASE_DIR, 'dataset', '.uploads')
+# CSV uploads up to this size are also cached as a DataFrame once the last byte lands
+INGEST_PRIME_BYTES = getattr(settings, 'DATASET_INGEST_PRIME_BYTES', READ_CACHE_MEMORY // 4)
+
+UPLOAD_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class ColumnStats:
+    """
+    Column statistics accumulated chunk by chunk: inferred dtype, null count
+    and min/max of numeric columns.
+    """
+
+    def __init__(self):
+        self.n_rows = 0
+        self.columns = {}
+
+    def update(self, df):
+        self.n_rows += len(df)
+        for name in df.columns:
+            series = df[name]
+            col = self.columns.setdefault(name, {'dtype': None, 'null_count': 0, 'min': None, 'max': None})
+            col['null_count'] += int(series.isna().sum())
+            col['dtype'] = merge_dtype(col['dtype'], series)
+            if col['dtype'] in ('int64', 'float64') and series.notna().any():
+                low, high = series.min(), series.max()
+                col['min'] = low if col['min'] is None else min(col['min'], low)
+                col['max'] = high if col['max'] is None else max(col['max'], high)
+            elif col['dtype'] not in ('int64', 'float64'):
+                col['min'] = col['max'] = None
+
+    def to_dict(self):
+        return {
+            'n_rows': self.n_rows,
+            'columns': [
+                {
+                    'name': name,
+                    'dtype': col['dtype'],
+                    'null_count': col['null_count'],
+                    'min': to_python(col['min']),
+                    'max': to_python(col['max']),
+                }
+                for name, col in self.columns.items()
+            ],
+        }
+
+
+def to_python(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def dtype_kind(series):
+    """
+    The type read_csv inferred for a chunk of a column, None when the chunk
+    is all null.
+    """
+    if series.isna().all():
+        return None
+    if pd.api.types.is_bool_dtype(series):
+        return 'bool'
+    if pd.api.types.is_integer_dtype(series):
+        return 'int64'
+    if pd.api.types.is_float_dtype(series):
+        return 'float64'
+    return 'object'
+
+
+def merge_dtype(current, series):
+    """
+    Widen the dtype seen so far with the dtype of a new chunk, the same way
+    read_csv would for the whole column.
+    """
+    new = dtype_kind(series)
+    if new is None:
+        # Nulls turn integer columns into floats and boolean ones into objects
+        return {'int64': 'float64', 'bool': 'object'}.get(current, current)
+    if current is None or current == new:
+        return new
+    if {current, new} == {'int64', 'float64'}:
+        return 'float64'
+    return 'object'
+
+
+class CsvIngest:
+    """
+    Parses a CSV upload while its bytes arrive.
+
+    Every complete record is parsed as soon as it lands and folded into the
+    column statistics, so they are ready with the last byte. Records end at
+    newlines outside quotes; the quote state is carried across chunks, so
+    quoted fields may span lines and chunks. Uploads up to INGEST_PRIME_BYTES
+    also keep their parsed pieces on disk, to cache the dataset when the
+    pieces agree on every column's type as a single read_csv would. A record
+    that can't be parsed stops the parsing, the upload itself is kept.
+    """
+
+    def __init__(self, work_dir):
+        self.work_dir = work_dir
+        self.header = None
+        self.remainder = b''
+        self.in_quote = 0
+        self.n_bytes = 0
+        self.n_pieces = 0
+        self.keep = True
+        self.kinds = {}
+        self.stats = ColumnStats()
+        self.error = None
+
+    def feed(self, chunk):
+        if self.error is not None or not chunk:
+            return
+        data = np.frombuffer(chunk, dtype=np.uint8)
+        # Quotes seen since the last record end, at every byte: odd inside a quoted field
+        quotes = np.cumsum(data == ord('"')) + self.in_quote
+        newlines = np.flatnonzero(data == ord('\n'))
+        ends = newlines[quotes[newlines] % 2 == 0]
+        if not len(ends):
+            self.remainder += chunk
+            self.in_quote = int(quotes[-1] % 2)
+            return
+        end = int(ends[-1]) + 1
+        offset = len(self.remainder)
+        records, self.remainder = self.remainder + chunk[:end], chunk[end:]
+        self.in_quote = int((quotes[-1] - quotes[end - 1]) % 2)
+        if self.header is None:
+            split = offset + int(ends[0]) + 1
+            self.header, records = records[:split], records[split:]
+        self.parse(records)
+
+    def parse(self, records):
+        if not records.strip():
+            return
+        try:
+            df = pd.read_csv(io.BytesIO(self.header + records))
+        except (ValueError, UnicodeDecodeError) as e:  # ParserError is a ValueError
+            self.error = str(e)
+            self.drop_pieces()
+            return
+        self.stats.update(df)
+        for name in df.columns:
+            kind = dtype_kind(df[name])
+            if kind is not None:
+                self.kinds.setdefault(name, set()).add(kind)
+        self.n_bytes += len(records)
+        if self.n_bytes > INGEST_PRIME_BYTES:
+            self.drop_pieces()  # Too large to cache, the statistics are all that's needed
+        if self.keep:
+            os.makedirs(self.work_dir, exist_ok=True)
+            df.to_pickle(os.path.join(self.work_dir, f"{self.n_pieces:06d}.pkl"))
+            self.n_pieces += 1
+
+    def drop_pieces(self):
+        self.keep = False
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def finish(self):
+        """
+        Parse whatever is left after the last record end. Returns the whole
+        dataset as one DataFrame when it can be cached, None otherwise.
+        """
+        if self.remainder and self.header is None:
+            self.header, self.remainder = self.remainder, b''
+        if self.remainder:
+            self.parse(self.remainder + b'\n')
+            self.remainder = b''
+        if self.header is not None and self.error is None and self.in_quote:
+            self.error = "Unterminated quoted field at the end of the file."
+        if self.error is not None or not self.keep or self.header is None:
+            return None
+        if any(len(kinds) > 1 and kinds != {'int64', 'float64'} for kinds in self.kinds.values()):
+            return None  # Mixed types the pieces read differently than the whole file
+        if not self.n_pieces:
+            return pd.read_csv(io.BytesIO(self.header))
+        pieces = [pd.read_pickle(os.path.join(self.work_dir, f"{i:06d}.pkl")) for i in range(self.n_pieces)]
+        return pd.concat(pieces, ignore_index=True)
+
+    def result(self):
+        """
+        The column statistics so far, None when the file couldn't be parsed.
+        """
+        return None if self.error is not None else self.stats.to_dict()
+
+    def cleanup(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+def is_csv(file_path):
+    return os.path.splitext(file_path)[1].lower() == '.csv'
+
+
+def stream_to_disk(chunks, file_path):
+    """
+    Write an iterable of byte chunks to `file_path`, parsing CSV uploads on the
+    way. Returns the column statistics, or None for other file types and CSV
+    files that couldn't be parsed.
+    """
+    ingest = CsvIngest(os.path.join(UPLOAD_DIR, uuid.uuid4().hex)) if is_csv(file_path) else None
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    try:
+        with open(file_path + '.part', 'wb') as out:
+            for chunk in chunks:
+                out.write(chunk)
+                if ingest:
+                    ingest.feed(chunk)
+        df = ingest.finish() if ingest else None
+        os.replace(file_path + '.part', file_path)
+        if df is not None:
+            prime(file_path, df)
+        return ingest.result() if ingest else None
+    finally:
+        if ingest:
+            ingest.cleanup()
+        if os.path.exists(file_path + '.part'):
+            os.remove(file_path + '.part')
+
+
+class ChunkedUpload:
+    """
+    A resumable upload made of several requests.
+
+    Received bytes are appended to a part file and the parser state is saved
+    next to it, so an interrupted upload continues from `received` bytes.
+    """
+
+    def __init__(self, upload_id=None):
+        self.upload_id = upload_id or uuid.uuid4().hex
+        if not UPLOAD_ID.match(self.upload_id):
+            raise ValueError(f"Invalid upload id '{self.upload_id}'.")
+        self.part_path = os.path.join(UPLOAD_DIR, f"{self.upload_id}.part")
+        self.state_path = os.path.join(UPLOAD_DIR, f"{self.upload_id}.state")
+
+    @property
+    def received(self):
+        return os.path.getsize(self.part_path) if os.path.exists(self.part_path) else 0
+
+    def load_ingest(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'rb') as f:
+                return pickle.load(f)
+        return CsvIngest(os.path.join(UPLOAD_DIR, self.upload_id))
+
+    def save_ingest(self, ingest):
+        with open(self.state_path + '.tmp', 'wb') as f:
+            pickle.dump(ingest, f)
+        os.replace(self.state_path + '.tmp', self.state_path)
+
+    def append(self, chunk, parse=True):
+        """
+        Append the next chunk; CSV chunks (`parse`) are also fed to the parser.
+        Returns the column statistics so far, None when not parsing.
+        """
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        ingest = self.load_ingest()
+        if parse:
+            ingest.feed(chunk)
+        with open(self.part_path, 'ab') as out:
+            out.write(chunk)
+        self.save_ingest(ingest)
+        return ingest.result() if parse else None
+
+    def complete(self, file_path):
+        """
+        Move the received file to `file_path` and return its statistics
+        (None when the file isn't a CSV or couldn't be parsed).
+        """
+        ingest = self.load_ingest()
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        try:
+            df = ingest.finish() if is_csv(file_path) else None
+            os.replace(self.part_path, file_path)
+            if df is not None:
+                prime(file_path, df)
+            return ingest.result() if is_csv(file_path) else None
+        finally:
+            ingest.cleanup()
+            if os.path.exists(self.state_path):
+                os.remove(self.state_path)
@@ -0,0 +1,105 @@
+import glob
+import hashlib
+import os
+
+import pandas as pd
+import pyarrow.feather as feather
+from django.conf import settings
+
+from .cache import LRUCache
+
+# Feather copies of parsed CSV/Excel files, hidden from the file tab
+SIDECAR_DIR = os.path.join(settings.BASE_DIR, 'dataset', '.cache')
+READ_CACHE_MEMORY = getattr(settings, 'DATASET_READ_CACHE_MEMORY', 1024 ** 3)
+
+_frames = LRUCache(READ_CACHE_MEMORY)
+
+
+def parse_file(file_path):
+    """
+    Read a CSV or Excel file into a DataFrame.
+    Raises ValueError for unsupported file types.
+    """
+    file_extension = os.path.splitext(file_path)[1].lower()
+    if file_extension == '.csv':
+        return pd.read_csv(file_path)  # Read CSV file
+    elif file_extension in ['.xlsx', '.xls']:
+        return pd.read_excel(file_path)  # Read Excel file
+    raise ValueError("Unsupported file type. Supported types are .csv, .xlsx, .xls.")
+
+
+def file_key(file_path):
+    """
+    Cache key of a file: any write changes its mtime or size and so its key.
+    """
+    stat = os.stat(file_path)
+    return os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size
+
+
+def sidecar_prefix(file_path):
+    return os.path.join(SIDECAR_DIR, hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest())
+
+
+def sidecar_path(key):
+    path, mtime_ns, size = key
+    return f"{sidecar_prefix(path)}-{mtime_ns}-{size}.feather"
+
+
+def write_sidecar(df, key):
+    """
+    Save an uncompressed Feather copy so later reads can memory-map it.
+    Older copies of the same file are removed.
+    """
+    forget(key[0])
+    os.makedirs(SIDECAR_DIR, exist_ok=True)
+    path = sidecar_path(key)
+    try:
+        feather.write_feather(df, path + '.tmp', compression='uncompressed')
+        os.replace(path + '.tmp', path)
+    except Exception:
+        # Mixed-type object columns can't be stored as Arrow, keep parsing the text instead
+        if os.path.exists(path + '.tmp'):
+            os.remove(path + '.tmp')
+
+
+def read_dataset(file_path):
+    """
+    Read a dataset file through the in-memory cache and its Feather sidecar.
+
+    The first read parses the file and writes the sidecar; later reads
+    memory-map the sidecar, and repeated reads are served from memory until
+    the file changes. The returned DataFrame is shared, callers must not
+    modify it in place.
+    """
+    key = file_key(file_path)
+    df = _frames.get(key)
+    if df is not None:
+        return df
+
+    sidecar = sidecar_path(key)
+    if os.path.isfile(sidecar):
+        df = feather.read_table(sidecar, memory_map=True).to_pandas(split_blocks=True)
+    else:
+        df = parse_file(file_path)
+        write_sidecar(df, key)
+
+    _frames.put(key, df)
+    return df
+
+
+def prime(file_path, df):
+    """
+    Cache a DataFrame that was already parsed from `file_path`, e.g. while it
+    was being uploaded, so the first read doesn't parse the file again.
+    """
+    key = file_key(file_path)
+    write_sidecar(df, key)
+    _frames.put(key, df)
+
+
+def forget(file_path):
+    """
+    Drop the sidecars of a file, e.g. after it was deleted or replaced.
+    """
+    for path in glob.glob(sidecar_prefix(file_path) + '-*.feather'):
+        os.remove(path)
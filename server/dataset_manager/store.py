@@ -0,0 +1,130 @@
+import os
+import re
+import uuid
+
+import pandas as pd
+from django.conf import settings
+from django.http import Http404, JsonResponse
+
+from matflow_test.Matflow_Main.modules.classes.data import Dataset
+from .cache import LRUCache
+from .wire import WIRE_FORMAT, arrow_response
+
+# Pickled DataFrames live in a hidden folder so they don't show up in the file tab
+STORE_DIR = os.path.join(settings.BASE_DIR, 'dataset', '.store')
+STORE_MEMORY = getattr(settings, 'DATASET_STORE_MEMORY', 2 * 1024 ** 3)
+PREVIEW_ROWS = 100
+
+DATASET_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class DatasetStore(Dataset):
+    """
+    Server-side dataset registry addressed by opaque ids.
+
+    Every dataset is written to disk once and the most recently used ones are
+    kept in memory, so a handle stays valid across server restarts.
+    """
+
+    def __init__(self, root, max_bytes):
+        super().__init__()
+        self.root = root
+        self.data = LRUCache(max_bytes)
+
+    def path(self, name):
+        if not DATASET_ID.match(str(name)):
+            raise Http404(f"Unknown dataset id '{name}'.")
+        return os.path.join(self.root, f"{name}.pkl")
+
+    def put(self, data):
+        name = uuid.uuid4().hex
+        self.add(name, data)
+        return name
+
+    def add(self, name, data):
+        path = self.path(name)
+        os.makedirs(self.root, exist_ok=True)
+        data.to_pickle(path + '.tmp')
+        os.replace(path + '.tmp', path)
+        self.data.put(name, data)
+
+    def remove(self, name):
+        path = self.path(name)
+        self.data.pop(name)
+        if not os.path.isfile(path):
+            raise Http404(f"Unknown dataset id '{name}'.")
+        os.remove(path)
+
+    def get_data(self, name):
+        data = self.data.get(name)
+        if data is None:
+            path = self.path(name)
+            if not os.path.isfile(path):
+                raise Http404(f"Unknown dataset id '{name}'.")
+            data = pd.read_pickle(path)
+            self.data.put(name, data)
+        return data
+
+    def list_name(self):
+        if not os.path.isdir(self.root):
+            return []
+        return [name[:-4] for name in os.listdir(self.root) if name.endswith('.pkl')]
+
+    def get_shape(self):
+        data_shape = [self.get_data(name).shape for name in self.list_name()]
+        n_rows = [shape[0] for shape in data_shape]
+        n_cols = [shape[1] for shape in data_shape]
+        return n_rows, n_cols
+
+
+datasets = DatasetStore(STORE_DIR, STORE_MEMORY)
+
+
+def handle_key(key):
+    """
+    Name of the request field carrying the handle for a dataset field,
+    e.g. 'file' -> 'dataset_id', 'train' -> 'train_id'.
+    """
+    return 'dataset_id' if key == 'file' else f'{key}_id'
+
+
+def resolve_frame(file, key='file'):
+    """
+    Return the DataFrame a request refers to, either through its handle or
+    from the records sent inline under `key`.
+    """
+    dataset_id = file.get(handle_key(key))
+    if dataset_id:
+        return datasets.get_data(dataset_id)
+    return pd.DataFrame(file.get(key))
+
+
+def describe(dataset_id, df, n_rows=PREVIEW_ROWS):
+    return {
+        'dataset_id': dataset_id,
+        'n_rows': len(df),
+        'columns': df.columns.tolist(),
+        'preview': df.head(n_rows).to_dict(orient='records'),
+    }
+
+
+def wants_records(file):
+    """
+    True when the client expects the full dataset back as JSON records.
+    """
+    return not file.get('dataset_id') and file.get(WIRE_FORMAT) != 'arrow'
+
+
+def frame_response(df, file):
+    """
+    Return a transformed dataset to the client.
+
+    Requests that referred to their input by handle get a new handle and a
+    preview back, Arrow requests get an Arrow stream, everything else keeps
+    receiving the full list of records.
+    """
+    if file.get('dataset_id'):
+        return JsonResponse(describe(datasets.put(df), df))
+    if file.get(WIRE_FORMAT) == 'arrow':
+        return arrow_response(df)
+    return JsonResponse(df.to_dict(orient='records'), safe=False)
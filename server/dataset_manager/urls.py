@@ -4,8 +4,14 @@ from . import views
 urlpatterns = [
     path('dataset/', views.get_dataset_structure, name='get_dataset_structure'),
     path('upload/', views.upload_file, name='upload_file'),
+    path('upload/chunk/', views.upload_chunk, name='upload_chunk'),
+    path('upload/complete/', views.upload_complete, name='upload_complete'),
     path('create-folder/', views.create_folder, name='create_folder'),
     path('create-file/', views.create_file, name='create_file'),
     path('delete/', views.delete_item, name='delete_item'),
     path('read_file/', views.read_file, name='read_file'),  # New route for reading file content
+    path('read_rows/', views.read_rows, name='read_rows'),
+    path('datasets/', views.register_dataset, name='register_dataset'),
+    path('datasets/<str:dataset_id>/', views.dataset_handle, name='dataset_handle'),
+    path('datasets/<str:dataset_id>/rows/', views.dataset_rows, name='dataset_rows'),
 ]
\ No newline at end of file
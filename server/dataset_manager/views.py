@@ -6,6 +6,12 @@ from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 import json
 
+from .ingest import ChunkedUpload, stream_to_disk
+from .reader import file_key, forget, read_dataset
+from .store import datasets, describe
+from .window import window_response
+from .wire import accepts_arrow, arrow_response, read_body
+
 # Path to the dataset directory (one level up from the current file directory)
 DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'dataset')
 
@@ -15,6 +21,8 @@ def get_nested_directory_structure(root_path):
     """
     structure = {}
     for item in os.listdir(root_path):
+        if item.startswith('.'):
+            continue  # Skip internal folders such as the dataset store
         item_path = os.path.join(root_path, item)
         if os.path.isdir(item_path):
             structure[item] = get_nested_directory_structure(item_path)  # Recursive call for subfolders
@@ -47,15 +55,14 @@ def get_dataset_structure(request):
         if os.path.isfile(file_path):
             try:
                 # Read the file based on the extension
-                file_extension = os.path.splitext(file_path)[1].lower()
-                if file_extension == '.csv':
-                    df = pd.read_csv(file_path)  # Read CSV file
-                elif file_extension in ['.xlsx', '.xls']:
-                    df = pd.read_excel(file_path)  # Read Excel file
-                else:
+                try:
+                    df = read_dataset(file_path)
+                except ValueError:
                     return HttpResponse("Unsupported file type", status=400)
 
-                # Return the content as a JSON response
+                # Return the content as an Arrow stream or a JSON response
+                if accepts_arrow(request):
+                    return arrow_response(df)
                 return JsonResponse(df.to_dict(orient='records'), safe=False)
             except Exception as e:
                 # Return error message if there was an issue reading the file
@@ -94,13 +101,74 @@ def upload_file(request):
     file = request.FILES.get('file')
 
     if file:
-        file_path = os.path.join(DATASET_DIR, folder, file.name)
-        path = default_storage.save(file_path, ContentFile(file.read()))
-        return JsonResponse({"message": "File uploaded successfully!"}, status=201)
+        file_path = default_storage.get_available_name(os.path.join(DATASET_DIR, folder, file.name))
+        # Written chunk by chunk, CSV files are parsed on the way
+        stats = stream_to_disk(file.chunks(), file_path)
+        return JsonResponse({"message": "File uploaded successfully!", "stats": stats}, status=201)
 
     return JsonResponse({"error": "No file uploaded"}, status=400)
 
 
+@csrf_exempt
+def upload_chunk(request):
+    """
+    Resumable upload, one chunk per request.
+
+    POST sends the chunk as 'chunk' in a multipart form (or as the raw body) with
+    its 'offset' and the 'filename'; the first request may omit 'upload_id' to
+    start a new upload. GET with 'upload_id' returns how many bytes were
+    received so far, so an interrupted upload can continue from there. CSV
+    chunks answer with the column statistics of the records received so far.
+    """
+    params = request.GET if request.method == 'GET' else request.POST or request.GET
+    try:
+        upload = ChunkedUpload(params.get('upload_id'))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    if request.method == 'GET':
+        return JsonResponse({"upload_id": upload.upload_id, "received": upload.received})
+    if request.method != 'POST':
+        return JsonResponse({"error": "Invalid request method"}, status=405)
+
+    chunk = request.FILES.get('chunk')
+    chunk = chunk.read() if chunk else request.body
+    offset = int(params.get('offset', 0))
+    if offset != upload.received:
+        # The client resends from what we actually have
+        return JsonResponse({"error": "Offset mismatch", "upload_id": upload.upload_id,
+                             "received": upload.received}, status=409)
+
+    is_csv = os.path.splitext(params.get('filename', ''))[1].lower() == '.csv'
+    stats = upload.append(chunk, parse=is_csv)
+    return JsonResponse({"upload_id": upload.upload_id, "received": upload.received, "stats": stats})
+
+
+@csrf_exempt
+def upload_complete(request):
+    """
+    Finish a chunked upload: move it to 'folder'/'filename' and return the
+    column statistics gathered while the chunks arrived.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Invalid request method"}, status=405)
+
+    data = json.loads(request.body)
+    filename = data.get('filename')
+    if not filename:
+        return JsonResponse({"error": "Filename is required"}, status=400)
+    try:
+        upload = ChunkedUpload(data.get('upload_id'))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    if not upload.received:
+        return JsonResponse({"error": "No file uploaded"}, status=400)
+
+    file_path = default_storage.get_available_name(os.path.join(DATASET_DIR, data.get('folder', ''), filename))
+    stats = upload.complete(file_path)
+    return JsonResponse({"message": "File uploaded successfully!", "stats": stats}, status=201)
+
+
 import shutil
 @csrf_exempt
 def delete_item(request):
@@ -119,12 +187,16 @@ def delete_item(request):
                 path = os.path.join(DATASET_DIR, folder, file)
                 if os.path.isfile(path):
                     os.remove(path)  # Delete the file
+                    forget(path)  # and its cached copy
                     return JsonResponse({"message": "File deleted successfully!"}, status=200)
                 else:
                     return JsonResponse({"error": "File not found"}, status=404)
             else:
                 path = os.path.join(DATASET_DIR, folder)
                 if os.path.isdir(path):
+                    for dirpath, _, filenames in os.walk(path):
+                        for filename in filenames:
+                            forget(os.path.join(dirpath, filename))
                     # Use shutil.rmtree() to delete the folder and all its contents recursively
                     shutil.rmtree(path)
                     return JsonResponse({"message": "Folder and its contents deleted successfully!"}, status=200)
@@ -140,14 +212,15 @@ def create_file(request):
     """
     API endpoint to create a new file with provided data and save it in the backend.
     Expects 'data', 'filename', and 'foldername' in the request body.
-    Assumes 'data' is always an array of objects (list of dictionaries).
+    Assumes 'data' is always an array of objects (list of dictionaries), or an
+    Arrow stream body with the other fields in the query string.
     Supports saving data only in CSV or Excel format.
     """
     if request.method == 'POST':
         try:
             print("s")
-            # Parse the JSON request body
-            body = json.loads(request.body)
+            # Parse the JSON (or Arrow) request body
+            body = read_body(request, 'data')
             data = body.get('data')
             filename = body.get('filename')
             foldername = body.get('foldername', '')  # Default to root dataset directory if foldername is empty
@@ -213,16 +286,105 @@ def read_file(request):
 
     try:
         # Read the file based on its extension
-        file_extension = os.path.splitext(file_path)[1].lower()
-        if file_extension == '.csv':
-            df = pd.read_csv(file_path)  # Read CSV file into DataFrame
-        elif file_extension in ['.xlsx', '.xls']:
-            df = pd.read_excel(file_path)  # Read Excel file into DataFrame
-        else:
-            return JsonResponse({"error": "Unsupported file type. Supported types are .csv, .xlsx, .xls."}, status=400)
+        try:
+            df = read_dataset(file_path)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
 
         # Convert the DataFrame to a list of dictionaries and return as JSON
+        if accepts_arrow(request):
+            return arrow_response(df)
         return JsonResponse(df.to_dict(orient='records'), safe=False)
     except Exception as e:
         # Return error message if there was an issue reading the file
         return JsonResponse({"error": f"Error reading file: {str(e)}"}, status=500)
+
+
+@csrf_exempt
+def register_dataset(request):
+    """
+    Register a dataset in the server-side store and return its handle.
+    Expects either 'data' (an array of objects or an Arrow stream body) or
+    'folder' and 'file' naming a file inside the dataset directory.
+    Transform endpoints accept the returned 'dataset_id' in place of 'file'.
+    """
+    if request.method != 'POST':
+        return HttpResponse(status=405)  # Method not allowed
+
+    try:
+        body = read_body(request, 'data')
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON data"}, status=400)
+
+    if body.get('data') is not None:
+        try:
+            df = pd.DataFrame(body.get('data'))
+        except ValueError as e:
+            return JsonResponse({"error": f"Data is not a valid table: {str(e)}"}, status=400)
+    elif body.get('file'):
+        file_path = os.path.join(DATASET_DIR, body.get('folder', ''), body.get('file'))
+        if not os.path.isfile(file_path):
+            return JsonResponse({"error": f"File '{body.get('file')}' not found."}, status=404)
+        try:
+            df = read_dataset(file_path)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        except Exception as e:
+            return JsonResponse({"error": f"Error reading file: {str(e)}"}, status=500)
+    else:
+        return JsonResponse({"error": "Either 'data' or 'file' is required."}, status=400)
+
+    dataset_id = datasets.put(df)
+    return JsonResponse(describe(dataset_id, df), status=201)
+
+
+@csrf_exempt
+def dataset_handle(request, dataset_id):
+    """
+    GET returns the shape, columns and the first 'n' rows of a stored dataset.
+    DELETE removes it from the store.
+    """
+    if request.method == 'GET':
+        df = datasets.get_data(dataset_id)
+        n_rows = int(request.GET.get('n', 100))
+        return JsonResponse(describe(dataset_id, df, n_rows=n_rows))
+    elif request.method == 'DELETE':
+        datasets.remove(dataset_id)
+        return JsonResponse({"message": "Dataset deleted successfully!"}, status=200)
+
+    return HttpResponse(status=405)  # Method not allowed
+
+
+def read_rows(request):
+    """
+    Windowed read of a file in the dataset directory.
+    Accepts 'folder' and 'file' plus 'offset', 'limit', 'columns', 'sort' and
+    'filters' query parameters and returns only the requested rows.
+    """
+    folder = request.GET.get('folder', '')
+    file = request.GET.get('file')
+    if not file:
+        return JsonResponse({"error": "File name is required."}, status=400)
+
+    file_path = os.path.join(DATASET_DIR, folder, file)
+    if not os.path.isfile(file_path):
+        return JsonResponse({"error": f"File '{file}' not found in folder '{folder}'."}, status=404)
+
+    try:
+        df = read_dataset(file_path)
+        return window_response(request, df, file_key(file_path))
+    except (KeyError, ValueError) as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Error reading file: {str(e)}"}, status=500)
+
+
+def dataset_rows(request, dataset_id):
+    """
+    Windowed read of a dataset in the store, with the same parameters as read_rows.
+    """
+    df = datasets.get_data(dataset_id)
+    try:
+        return window_response(request, df, dataset_id)
+    except (KeyError, ValueError) as e:
+        return JsonResponse({"error": str(e)}, status=400)
@@ -0,0 +1,147 @@
+import json
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.http import JsonResponse
+
+from .cache import LRUCache
+from .wire import accepts_arrow, arrow_response
+
+MAX_LIMIT = 10000
+WINDOW_CACHE_MEMORY = getattr(settings, 'DATASET_WINDOW_CACHE_MEMORY', 256 * 1024 ** 2)
+
+# Row order after filtering and sorting, reused while the client scrolls
+_positions = LRUCache(WINDOW_CACHE_MEMORY)
+
+
+def filter_result(data, filter_var, filter_operator, filter_value):
+    if filter_operator == "<":
+        result = data.loc[data[filter_var] < filter_value]
+    elif filter_operator == ">":
+        result = data.loc[data[filter_var] > filter_value]
+    elif filter_operator == "==":
+        if type(filter_value) != str:  # np.isna() cannot pass str as parameter
+            if np.isnan(filter_value):  # check if value is nan
+                result = data.loc[data[filter_var].isna() == True]
+            else:
+                result = data.loc[data[filter_var] == filter_value]
+        else:
+            result = data.loc[data[filter_var] == filter_value]
+    elif filter_operator == "<=":
+        result = data.loc[data[filter_var] <= filter_value]
+    elif filter_operator == ">=":
+        result = data.loc[data[filter_var] >= filter_value]
+    else:
+        if type(filter_value) != str:  # np.isna() cannot pass str as parameter
+            if np.isnan(filter_value):  # check if value is nan
+                result = data.loc[data[filter_var].isna() == False]
+            else:
+                result = data.loc[data[filter_var] != filter_value]
+        else:
+            result = data.loc[data[filter_var] != filter_value]
+
+    return result
+
+
+def parse_value(series, value):
+    """
+    Convert a filter value from the query string to the column's type.
+    """
+    if value is None or str(value).lower() in ('', 'nan', 'null'):
+        return np.nan
+    if pd.api.types.is_numeric_dtype(series) and isinstance(value, str):
+        return float(value)
+    return value
+
+
+def row_positions(df, key, sort, filters):
+    """
+    Positions of the rows left after applying `filters` in `sort` order.
+
+    `sort` is a list of column names, prefixed with '-' for descending order.
+    Only the columns involved are touched and the result is cached per dataset
+    version, so moving the window over the same view costs nothing.
+    """
+    cache_key = (key, json.dumps(filters, sort_keys=True, default=str), tuple(sort))
+    positions = _positions.get(cache_key)
+    if positions is not None:
+        return positions
+
+    by = [column.lstrip('-') for column in sort]
+    needed = list(dict.fromkeys(by + [f.get('filter_var') for f in filters]))
+    view = df[needed].reset_index(drop=True)
+    for f in filters:
+        filter_var = f.get('filter_var')
+        filter_value = parse_value(view[filter_var], f.get('filter_value'))
+        view = filter_result(view, filter_var, f.get('filter_cond', '=='), filter_value)
+    if by:
+        view = view.sort_values(by=by, ascending=[not column.startswith('-') for column in sort], kind='stable')
+
+    positions = view.index.to_numpy()
+    _positions.put(cache_key, positions)
+    return positions
+
+
+def read_window(df, key, offset=0, limit=1000, columns=None, sort=None, filters=None):
+    """
+    Return (total rows in the view, window DataFrame) for a slice of `df`.
+    """
+    sort = sort or []
+    filters = filters or []
+    limit = min(limit, MAX_LIMIT)
+    col_positions = df.columns.get_indexer(columns) if columns else np.arange(df.shape[1])
+    if (col_positions < 0).any():
+        missing = [c for c, i in zip(columns, col_positions) if i < 0]
+        raise KeyError(f"Unknown columns: {missing}")
+
+    if sort or filters:
+        positions = row_positions(df, key, sort, filters)
+        return len(positions), df.iloc[positions[offset:offset + limit], col_positions]
+    return len(df), df.iloc[offset:offset + limit, col_positions]
+
+
+def window_params(query):
+    """
+    Read offset, limit, columns, sort and filters from the query string.
+
+    columns and sort are comma separated; filters is a JSON list of objects with
+    filter_var, filter_cond and filter_value, or a single filter can be given
+    with those keys directly.
+    """
+    columns = query.get('columns')
+    sort = query.get('sort')
+    if query.get('filters'):
+        filters = json.loads(query.get('filters'))
+    elif query.get('filter_var'):
+        filters = [{key: query.get(key) for key in ('filter_var', 'filter_cond', 'filter_value')}]
+    else:
+        filters = []
+    return {
+        'offset': max(int(query.get('offset', 0)), 0),
+        'limit': max(int(query.get('limit', 1000)), 0),
+        'columns': columns.split(',') if columns else None,
+        'sort': sort.split(',') if sort else None,
+        'filters': filters,
+    }
+
+
+def window_response(request, df, key):
+    """
+    JSON (or Arrow) response with one window of rows of `df`.
+    The total row count of the filtered view is sent in the X-Total-Count header.
+    """
+    params = window_params(request.GET)
+    total, window = read_window(df, key, **params)
+    if accepts_arrow(request):
+        response = arrow_response(window)
+    else:
+        response = JsonResponse({
+            'n_rows': total,
+            'offset': params['offset'],
+            'limit': len(window),
+            'columns': window.columns.tolist(),
+            'rows': window.to_dict(orient='records'),
+        })
+    response['X-Total-Count'] = str(total)
+    return response
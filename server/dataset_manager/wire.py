@@ -0,0 +1,83 @@
+import json
+
+import pyarrow as pa
+from django.http import HttpResponse
+from rest_framework.parsers import BaseParser
+
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+
+# Set on the parsed parameters when the client asked for Arrow back
+WIRE_FORMAT = '_wire_format'
+
+
+def is_arrow(request):
+    return request.META.get('CONTENT_TYPE', '').startswith(ARROW_STREAM)
+
+
+def accepts_arrow(request):
+    return is_arrow(request) or ARROW_STREAM in request.META.get('HTTP_ACCEPT', '')
+
+
+def read_arrow(body):
+    """
+    Read an Arrow IPC stream into a DataFrame.
+
+    Numeric columns without nulls share memory with the request body instead of
+    being copied, so the resulting columns are read-only.
+    """
+    table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def query_params(query):
+    """
+    Parameters of an Arrow request travel in the query string, either as a JSON
+    object in 'params' or as plain key/value pairs.
+    """
+    if 'params' in query:
+        return json.loads(query.get('params'))
+    return {key: query.get(key) for key in query}
+
+
+def read_body(request, key='file'):
+    """
+    Parse a request into the parameter dict the views work with.
+
+    JSON bodies are decoded as before. An Arrow stream body becomes the
+    DataFrame stored under `key`, with the remaining parameters taken from the
+    query string.
+    """
+    if is_arrow(request):
+        data = query_params(request.GET)
+        data[key] = read_arrow(request.body)
+    else:
+        data = json.loads(request.body)
+    if accepts_arrow(request):
+        data[WIRE_FORMAT] = 'arrow'
+    return data
+
+
+def arrow_response(df, status=200):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return HttpResponse(sink.getvalue().to_pybytes(), content_type=ARROW_STREAM, status=status)
+
+
+class ArrowStreamParser(BaseParser):
+    """
+    Parses an Arrow IPC stream body for class based views.
+
+    The table is returned under the view's `arrow_key` (default 'dataset')
+    together with the parameters from the query string.
+    """
+    media_type = ARROW_STREAM
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        request = parser_context['request']
+        key = getattr(parser_context.get('view'), 'arrow_key', 'dataset')
+        data = query_params(request.query_params)
+        data[key] = read_arrow(stream.read())
+        return data
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+from django.conf import settings
+
+from dataset_manager.cache import LRUCache, column_hash
+from dataset_manager.store import datasets, resolve_frame
+from dataset_manager.wire import WIRE_FORMAT
+
+PLOT_CACHE_MEMORY = getattr(settings, 'EDA_PLOT_CACHE_MEMORY', 256 * 1024 ** 2)
+# Set EDA_PLOT_CACHE_DISK to False to keep plots in memory only
+PLOT_CACHE_DISK = getattr(settings, 'EDA_PLOT_CACHE_DISK', True)
+PLOT_CACHE_DISK_BYTES = getattr(settings, 'EDA_PLOT_CACHE_DISK_BYTES', 1024 ** 3)
+PLOT_DB = os.path.join(settings.BASE_DIR, 'dataset', '.cache', 'plots.sqlite3')
+
+# Request fields that carry the data rather than plot parameters
+DATA_KEYS = ('file', 'dataset_id', WIRE_FORMAT)
+
+
+class PlotCache:
+    """
+    Serialized results of EDA plot requests, most recently used in memory
+    and optionally, up to `disk_bytes`, in an SQLite file shared by the
+    server processes.
+    """
+
+    def __init__(self, max_bytes, db_path=None, disk_bytes=PLOT_CACHE_DISK_BYTES):
+        self.memory = LRUCache(max_bytes)
+        self.db_path = db_path
+        self.disk_bytes = disk_bytes
+
+    def connect(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('CREATE TABLE IF NOT EXISTS plots (key TEXT PRIMARY KEY, result BLOB NOT NULL, '
+                     'size INTEGER NOT NULL, used REAL NOT NULL)')
+        return conn
+
+    def get(self, key):
+        raw = self.memory.get(key)
+        if raw is None and self.db_path:
+            with closing(self.connect()) as conn, conn:
+                row = conn.execute('SELECT result FROM plots WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    conn.execute('UPDATE plots SET used = ? WHERE key = ?', (time.time(), key))
+            if row is not None:
+                raw = bytes(row[0])
+                self.memory.put(key, raw)
+        return raw
+
+    def put(self, key, raw):
+        self.memory.put(key, raw)
+        if not self.db_path:
+            return
+        with closing(self.connect()) as conn, conn:
+            conn.execute('INSERT OR REPLACE INTO plots VALUES (?, ?, ?, ?)', (key, raw, len(raw), time.time()))
+            self.prune(conn)
+
+    def prune(self, conn):
+        """
+        Drop the least recently used plots beyond the disk budget.
+        """
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM plots').fetchone()[0]
+        stale = []
+        for key, size in conn.execute('SELECT key, size FROM plots ORDER BY used'):
+            if total <= self.disk_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        conn.executemany('DELETE FROM plots WHERE key = ?', stale)
+
+
+plots = PlotCache(PLOT_CACHE_MEMORY, PLOT_DB if PLOT_CACHE_DISK else None)
+
+# Columns and column fingerprints of stored datasets. A dataset id never
+# changes content, so these are computed once per dataset and column, and
+# only dropped when the dataset is removed.
+_fingerprints = LRUCache(16 * 1024 ** 2)
+
+
+def used_columns(params, columns):
+    """
+    The columns the plot parameters name, e.g. in 'var', 'cat' or 'hue'.
+    """
+    names = set()
+
+    def collect(value):
+        if isinstance(value, str):
+            names.add(value)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                collect(item)
+        elif isinstance(value, dict):
+            for item in value.values():
+                collect(item)
+
+    collect(params)
+    return sorted((c for c in columns if str(c) in names), key=str)
+
+
+def normalize(data):
+    """
+    The parameters of a plot request that can change its result.
+    """
+    params = {key: value for key, value in data.items() if key not in DATA_KEYS}
+    formats = sorted(set(params.get('formats', [])))
+    params['formats'] = formats
+    if 'png' not in formats:
+        params.pop('dpi', None)  # Only PNGs depend on it
+    return params
+
+
+def plot_key(plot_type, data):
+    """
+    Cache key of a plot request, from the fingerprints of the columns its
+    parameters use and its normalized parameters. Also returns the request's
+    DataFrame when it had to be built, None otherwise.
+
+    For a stored dataset the fingerprints are computed once, so a repeated
+    request is keyed without loading the data. A removed dataset raises
+    Http404 like any other read of it.
+    """
+    params = normalize(data)
+    df = None
+    dataset_id = data.get('dataset_id')
+    if dataset_id:
+        entry = _fingerprints.get(dataset_id)
+        if entry is not None and not os.path.isfile(datasets.path(dataset_id)):
+            # Removed since, maybe through another server process
+            _fingerprints.pop(dataset_id)
+            entry = None
+        if entry is None:
+            stored = datasets.get_data(dataset_id)
+            entry = {'columns': list(stored.columns), 'n_rows': len(stored), 'hashes': {}}
+            _fingerprints.put(dataset_id, entry)
+        columns = used_columns(params, entry['columns'])
+        missing = [c for c in columns if c not in entry['hashes']]
+        if missing:
+            stored = datasets.get_data(dataset_id)
+            for c in missing:
+                entry['hashes'][c] = column_hash(stored[c])
+        n_rows, hashes = entry['n_rows'], [entry['hashes'][c] for c in columns]
+    else:
+        df = resolve_frame(data)
+        n_rows, hashes = len(df), [column_hash(df[c]) for c in used_columns(params, df.columns)]
+    digest = hashlib.sha1(f"{plot_type}|{n_rows}|".encode())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    digest.update('|'.join(hashes).encode())
+    return digest.hexdigest(), df
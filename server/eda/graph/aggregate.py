@@ -0,0 +1,171 @@
+# server/eda/graph/aggregate.py
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from scipy.stats import gaussian_kde
+
+# Upper bound on the bins of an automatic histogram, whatever the spread of the data
+MAX_BINS = 1000
+# Rows the KDE curve is fit on, larger columns are sampled down to this
+KDE_SAMPLE = 100000
+KDE_POINTS = 200
+
+
+def numeric(series):
+    """
+    Values of a numeric column as floats, and the mask of the non-null ones.
+    """
+    values = series.to_numpy(dtype=float, na_value=np.nan)
+    return values, ~np.isnan(values)
+
+
+def factorize(series):
+    """
+    Integer codes of a column's categories, in order of first appearance as
+    Plotly orders them, with -1 for nulls; and the categories.
+    """
+    codes, categories = pd.factorize(series)
+    return codes, list(categories)
+
+
+def histogram_edges(values, bins="auto"):
+    """
+    Bin edges of the non-null `values`: `bins` equal-width bins, or with
+    "auto" the larger number of the Sturges and Freedman-Diaconis estimates,
+    as numpy's and seaborn's "auto", capped at MAX_BINS.
+    """
+    lo, hi = values.min(), values.max()
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    if isinstance(bins, int) and bins > 0:
+        n_bins = bins
+    else:
+        n_bins = int(np.ceil(np.log2(len(values)))) + 1
+        iqr = np.subtract(*np.percentile(values, [75, 25]))
+        if iqr > 0:
+            n_bins = max(n_bins, int(np.ceil((hi - lo) / (2 * iqr * len(values) ** (-1 / 3)))))
+    return np.linspace(lo, hi, min(n_bins, MAX_BINS) + 1)
+
+
+def bin_index(values, edges):
+    """
+    Bin of every value; the last bin includes the right edge.
+    """
+    index = np.searchsorted(edges, values, side='right') - 1
+    return np.clip(index, 0, len(edges) - 2)
+
+
+def aggregate(codes, n_groups, values=None, func="count"):
+    """
+    Count, sum, avg, min or max of `values` per group code in 0..n_groups-1.
+    Without values every function counts, as Plotly's histfunc does when a
+    histogram has no y. Empty groups are NaN for avg, min and max.
+    """
+    counts = np.bincount(codes, minlength=n_groups).astype(float)
+    if values is None or func == "count":
+        return counts
+    if func == "sum":
+        return np.bincount(codes, weights=values, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if func in ("avg", "mean"):
+            return np.bincount(codes, weights=values, minlength=n_groups) / counts
+    if func in ("min", "max"):
+        result = np.full(n_groups, np.inf if func == "min" else -np.inf)
+        (np.minimum if func == "min" else np.maximum).at(result, codes, values)
+        result[counts == 0] = np.nan
+        return result
+    raise ValueError(f"Unknown aggregate '{func}'.")
+
+
+def normalize(values, widths, norm=None):
+    """
+    Apply a Plotly histnorm to the bins of one trace.
+    """
+    total = np.nansum(values)
+    if norm == "percent":
+        return 100 * values / total if total else values
+    if norm == "probability":
+        return values / total if total else values
+    if norm == "density":
+        return values / widths
+    if norm == "probability density":
+        return values / total / widths if total else values
+    return values
+
+
+def histogram(x, edges, hue_codes=None, n_hue=1, weights=None, func="count", norm=None):
+    """
+    Per hue group and bin (shape n_hue x n_bins) histogram values of the
+    non-null `x`, optionally of `weights`, normalized per group like Plotly.
+    """
+    n_bins = len(edges) - 1
+    keep = ~np.isnan(x)
+    if weights is not None:
+        keep &= ~np.isnan(weights)
+    if hue_codes is not None:
+        keep &= hue_codes >= 0
+        groups = hue_codes[keep]
+    else:
+        groups = np.zeros(keep.sum(), dtype=int)
+    codes = groups * n_bins + bin_index(x[keep], edges)
+    values = aggregate(codes, n_hue * n_bins, None if weights is None else weights[keep], func)
+    values = values.reshape(n_hue, n_bins)
+    widths = np.diff(edges)
+    return np.vstack([normalize(row, widths, norm) for row in values])
+
+
+def crosstab(series, hue=None, values=None, func="count"):
+    """
+    Aggregates of `values` (counts without them) per category of `series`
+    and, with a hue column, per hue group. Returns the categories, the hue
+    groups ([None] without hue), the values (n_hue x n_categories) and the
+    number of rows behind each.
+    """
+    codes, categories = factorize(series)
+    keep = codes >= 0
+    if values is not None:
+        keep &= ~np.isnan(values)
+    if hue is not None:
+        hue_codes, groups = factorize(hue)
+        keep &= hue_codes >= 0
+        hue_codes = hue_codes[keep]
+    else:
+        hue_codes, groups = np.zeros(keep.sum(), dtype=int), [None]
+    n = len(categories)
+    combined = hue_codes * n + codes[keep]
+    counts = aggregate(combined, len(groups) * n).reshape(len(groups), n)
+    if values is None:
+        return categories, groups, counts, counts
+    result = aggregate(combined, len(groups) * n, values[keep], func).reshape(len(groups), n)
+    return categories, groups, result, counts
+
+
+def kde_curve(values, points=KDE_POINTS, sample=KDE_SAMPLE, seed=0):
+    """
+    Gaussian KDE of the non-null `values` on `points` points, extended by
+    three bandwidths past the data as seaborn's kdeplot does. Columns longer
+    than `sample` are fit on a random sample of it.
+    """
+    if len(values) > sample:
+        values = np.random.default_rng(seed).choice(values, sample, replace=False)
+    kde = gaussian_kde(values)
+    bandwidth = kde.factor * values.std(ddof=1)
+    grid = np.linspace(values.min() - 3 * bandwidth, values.max() + 3 * bandwidth, points)
+    return grid, kde(grid)
+
+
+def bar(categories, values, orient="Vertical", **kwargs):
+    """
+    A pre-aggregated go.Bar, vertical or horizontal as the plot asks.
+    """
+    if orient == "Vertical":
+        return go.Bar(x=categories, y=values, **kwargs)
+    return go.Bar(x=values, y=categories, orientation='h', **kwargs)
+
+
+def axis_titles(fig, category_title, value_title, orient="Vertical"):
+    if orient == "Vertical":
+        fig.update_layout(xaxis_title=category_title, yaxis_title=value_title)
+    else:
+        fig.update_layout(xaxis_title=value_title, yaxis_title=category_title)
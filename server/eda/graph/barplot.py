@@ -1,11 +1,11 @@
-import base64
-import io
 import matplotlib.pyplot as plt
 import seaborn as sns
 from django.http import JsonResponse
-import plotly.express as px
+import plotly.graph_objects as go
 import json
 import pandas as pd
+from eda.graph.aggregate import axis_titles, bar, crosstab, numeric
+from eda.graph.render import figure_dpi, save_figure, static_formats
 
 
 def barplot(df, data):
@@ -17,6 +17,7 @@ def barplot(df, data):
     annotate = data.get('annotate')
     title = data.get('title')
     color_palette = data.get('color_palette', 'husl')  # Default palette
+    estimator = data.get('estimator', 'sum')  # How the Plotly bars aggregate num: sum, avg, min, max or count
 
     if not isinstance(cats, list):
         cats = [cats]
@@ -50,114 +51,84 @@ def barplot(df, data):
         hue_color_mapping = {}
 
     # Create separate matplotlib figures for each categorical variable
-    for cat in cats:
-        fig, ax = plt.subplots(figsize=(6, 6), dpi=720)
+    if static_formats(data):
+        for cat in cats:
+            fig, ax = plt.subplots(figsize=(6, 6), dpi=figure_dpi(data))
 
-        if title:
-            ax.set_title(title)
-        else:
-            if orient == "Vertical":
-                ax.set_title(f"Bar Plot of {num} by {cat}")
-            else:
-                ax.set_title(f"Bar Plot of {num} by {cat}")
-
-        if orient == "Vertical":
-            if hue_param:
-                sns.barplot(data=df, x=cat, y=num, hue=hue_param, palette=hue_color_mapping, ax=ax, ci=95)
-            else:
-                sns.barplot(data=df, x=cat, y=num, ax=ax, color='blue', ci=95)
-        else:
-            if hue_param:
-                sns.barplot(data=df, x=num, y=cat, hue=hue_param, palette=hue_color_mapping, ax=ax, ci=95, orient='h')
+            if title:
+                ax.set_title(title)
             else:
-                sns.barplot(data=df, x=num, y=cat, ax=ax, color='blue', ci=95, orient='h')
+                if orient == "Vertical":
+                    ax.set_title(f"Bar Plot of {num} by {cat}")
+                else:
+                    ax.set_title(f"Bar Plot of {num} by {cat}")
 
-        if annotate:
             if orient == "Vertical":
-                for bar in ax.patches:
-                    ax.annotate(
-                        format("{:.3f}".format(bar.get_height())),
-                        (bar.get_x() + bar.get_width() / 2, bar.get_height()),
-                        ha='center',
-                        va='center',
-                        size=11,
-                        xytext=(0, 8),
-                        textcoords='offset points'
-                    )
+                if hue_param:
+                    sns.barplot(data=df, x=cat, y=num, hue=hue_param, palette=hue_color_mapping, ax=ax, ci=95)
+                else:
+                    sns.barplot(data=df, x=cat, y=num, ax=ax, color='blue', ci=95)
             else:
-                for rect in ax.patches:
-                    ax.annotate(
-                        format("{:.3f}".format(rect.get_width())),
-                        (rect.get_width(), rect.get_y() + rect.get_height() / 2),
-                        ha='center',
-                        va='center',
-                        size=11,
-                        xytext=(8, 0),
-                        textcoords='offset points'
-                    )
-
-        # Save the figure to a PNG buffer
-        image_stream_png = io.BytesIO()
-        fig.savefig(image_stream_png, format='png', bbox_inches='tight')
-        image_stream_png.seek(0)
-        image_base64_png = base64.b64encode(image_stream_png.getvalue()).decode('utf-8')
-        png_list.append(image_base64_png)
-
-        # Save the figure to an SVG buffer
-        image_stream_svg = io.BytesIO()
-        fig.savefig(image_stream_svg, format='svg', bbox_inches='tight')
-        image_stream_svg.seek(0)
-        image_svg = image_stream_svg.getvalue().decode('utf-8')
-        svg_list.append(image_svg)
-
-        plt.close(fig)
+                if hue_param:
+                    sns.barplot(data=df, x=num, y=cat, hue=hue_param, palette=hue_color_mapping, ax=ax, ci=95, orient='h')
+                else:
+                    sns.barplot(data=df, x=num, y=cat, ax=ax, color='blue', ci=95, orient='h')
+
+            if annotate:
+                if orient == "Vertical":
+                    for bar in ax.patches:
+                        ax.annotate(
+                            format("{:.3f}".format(bar.get_height())),
+                            (bar.get_x() + bar.get_width() / 2, bar.get_height()),
+                            ha='center',
+                            va='center',
+                            size=11,
+                            xytext=(0, 8),
+                            textcoords='offset points'
+                        )
+                else:
+                    for rect in ax.patches:
+                        ax.annotate(
+                            format("{:.3f}".format(rect.get_width())),
+                            (rect.get_width(), rect.get_y() + rect.get_height() / 2),
+                            ha='center',
+                            va='center',
+                            size=11,
+                            xytext=(8, 0),
+                            textcoords='offset points'
+                        )
+
+            save_figure(fig, data, png_list, svg_list)
+
+            plt.close(fig)
 
     # Create separate Plotly figures
     plotly_figs = []
 
     for cat in cats:
-        if orient == "Vertical":
-            if hue_param:
-                fig_plotly = px.bar(
-                    df,
-                    x=cat,
-                    y=num,
-                    color=hue_param,
-                    color_discrete_map=hue_color_mapping,
-                    title=title if title else f"Bar Plot of {num} by {cat}",
-                    text=num if annotate else None
-                )
-            else:
-                fig_plotly = px.bar(
-                    df,
-                    x=cat,
-                    y=num,
-                    title=title if title else f"Bar Plot of {num} by {cat}",
-                    text=num if annotate else None,
-                    color_discrete_sequence=['blue']
-                )
-        else:
-            if hue_param:
-                fig_plotly = px.bar(
-                    df,
-                    x=num,
-                    y=cat,
-                    color=hue_param,
-                    orientation='h',
-                    color_discrete_map=hue_color_mapping,
-                    title=title if title else f"Bar Plot of {num} by {cat}",
-                    text=num if annotate else None
-                )
-            else:
-                fig_plotly = px.bar(
-                    df,
-                    x=num,
-                    y=cat,
-                    orientation='h',
-                    title=title if title else f"Bar Plot of {num} by {cat}",
-                    text=num if annotate else None,
-                    color_discrete_sequence=['blue']
-                )
+        # Aggregate on the server: one bar per category and hue group, not one bar segment per row.
+        # The default sum is the height of the stacked per-row bars the figure used to draw.
+        categories, groups, values, counts = crosstab(
+            df[cat], df[hue_param] if hue_param else None, numeric(df[num])[0], estimator)
+
+        fig_plotly = go.Figure()
+        for i, group in enumerate(groups):
+            present = counts[i] > 0
+            fig_plotly.add_trace(bar(
+                [c for c, p in zip(categories, present) if p],
+                values[i][present],
+                orient,
+                name=str(group) if group is not None else num,
+                showlegend=group is not None,
+                marker_color=hue_color_mapping.get(group) if group is not None else 'blue',
+                text=values[i][present] if annotate else None
+            ))
+        fig_plotly.update_layout(
+            title=title if title else f"Bar Plot of {num} by {cat}",
+            barmode='relative',
+            legend_title_text=hue_param
+        )
+        axis_titles(fig_plotly, cat, num if estimator == 'sum' else f"{estimator} of {num}", orient)
 
         if annotate:
             fig_plotly.update_traces(texttemplate='%{text:.3f}', textposition='outside')
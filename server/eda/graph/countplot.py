@@ -1,14 +1,14 @@
 # server/eda/graph/countplot.py
 
-import base64
-import io
 import matplotlib.pyplot as plt
 import seaborn as sns
 from django.http import JsonResponse
-import plotly.express as px
+import plotly.graph_objects as go
 import json
 import pandas as pd
 import logging
+from eda.graph.aggregate import axis_titles, bar, crosstab
+from eda.graph.render import figure_dpi, save_figure, static_formats
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -51,132 +51,95 @@ def countplot(df, data):
             hue_color_mapping = {}
 
         # Create separate matplotlib figures for each categorical variable
-        for var in vars:
-            fig, ax = plt.subplots(figsize=(6, 6), dpi=720)
+        if static_formats(data):
+            for var in vars:
+                fig, ax = plt.subplots(figsize=(6, 6), dpi=figure_dpi(data))
 
-            # Set title
-            if title:
-                ax.set_title(title)
-            else:
-                ax.set_title(f"Count Plot of {var}")
+                # Set title
+                if title:
+                    ax.set_title(title)
+                else:
+                    ax.set_title(f"Count Plot of {var}")
 
-            # Determine unique categories for the main variable
-            unique_categories = df[var].dropna().unique().tolist()
-            num_categories = len(unique_categories)
+                # Determine unique categories for the main variable
+                unique_categories = df[var].dropna().unique().tolist()
+                num_categories = len(unique_categories)
 
-            if orient == "Vertical":
-                if hue_param:
-                    # Seaborn handles hue color mapping
-                    sns.countplot(data=df, x=var, hue=hue_param, palette=hue_color_mapping, dodge=True, ax=ax)
+                if orient == "Vertical":
+                    if hue_param:
+                        # Seaborn handles hue color mapping
+                        sns.countplot(data=df, x=var, hue=hue_param, palette=hue_color_mapping, dodge=True, ax=ax)
+                    else:
+                        # Generate palette for each category
+                        main_palette = generate_palette(num_categories, color_palette)
+                        sns.countplot(data=df, x=var, palette=main_palette, dodge=True, ax=ax)
                 else:
-                    # Generate palette for each category
-                    main_palette = generate_palette(num_categories, color_palette)
-                    sns.countplot(data=df, x=var, palette=main_palette, dodge=True, ax=ax)
-            else:
+                    if hue_param:
+                        sns.countplot(data=df, y=var, hue=hue_param, palette=hue_color_mapping, dodge=True, ax=ax)
+                    else:
+                        main_palette = generate_palette(num_categories, color_palette)
+                        sns.countplot(data=df, y=var, palette=main_palette, dodge=True, ax=ax)
+
+                # Add annotations if required
+                if annotate:
+                    if orient == "Vertical":
+                        for bar in ax.patches:
+                            height = bar.get_height()
+                            if height > 0:
+                                ax.annotate(f'{int(height)}',
+                                            (bar.get_x() + bar.get_width() / 2, height),
+                                            ha='center', va='bottom',
+                                            size=11, xytext=(0, 8),
+                                            textcoords='offset points')
+                    else:
+                        for rect in ax.patches:
+                            width = rect.get_width()
+                            if width > 0:
+                                ax.annotate(f'{int(width)}',
+                                            (width, rect.get_y() + rect.get_height() / 2),
+                                            ha='left', va='center',
+                                            size=11, xytext=(8, 0),
+                                            textcoords='offset points')
+
+                plt.tight_layout()
+
+                # Manage legend
                 if hue_param:
-                    sns.countplot(data=df, y=var, hue=hue_param, palette=hue_color_mapping, dodge=True, ax=ax)
-                else:
-                    main_palette = generate_palette(num_categories, color_palette)
-                    sns.countplot(data=df, y=var, palette=main_palette, dodge=True, ax=ax)
-
-            # Add annotations if required
-            if annotate:
-                if orient == "Vertical":
-                    for bar in ax.patches:
-                        height = bar.get_height()
-                        if height > 0:
-                            ax.annotate(f'{int(height)}',
-                                        (bar.get_x() + bar.get_width() / 2, height),
-                                        ha='center', va='bottom',
-                                        size=11, xytext=(0, 8),
-                                        textcoords='offset points')
+                    ax.legend(title=hue_param)
                 else:
-                    for rect in ax.patches:
-                        width = rect.get_width()
-                        if width > 0:
-                            ax.annotate(f'{int(width)}',
-                                        (width, rect.get_y() + rect.get_height() / 2),
-                                        ha='left', va='center',
-                                        size=11, xytext=(8, 0),
-                                        textcoords='offset points')
-
-            plt.tight_layout()
-
-            # Manage legend
-            if hue_param:
-                ax.legend(title=hue_param)
-            else:
-                ax.legend().remove()
-
-            # Save the figure to a PNG buffer
-            image_stream_png = io.BytesIO()
-            fig.savefig(image_stream_png, format='png', bbox_inches='tight')
-            image_stream_png.seek(0)
-            image_base64_png = base64.b64encode(image_stream_png.getvalue()).decode('utf-8')
-            png_list.append(image_base64_png)
+                    ax.legend().remove()
 
-            # Save the figure to an SVG buffer
-            image_stream_svg = io.BytesIO()
-            fig.savefig(image_stream_svg, format='svg', bbox_inches='tight')
-            image_stream_svg.seek(0)
-            image_svg = image_stream_svg.getvalue().decode('utf-8')
-            svg_list.append(image_svg)
+                save_figure(fig, data, png_list, svg_list)
 
-            plt.close(fig)
+                plt.close(fig)
 
         # Create separate Plotly figures
         plotly_figs = []
 
         for var in vars:
-            # Determine unique categories for the main variable
-            unique_categories = df[var].dropna().unique().tolist()
-            num_categories = len(unique_categories)
-
-            if orient == "Vertical":
-                if hue_param:
-                    fig_plotly = px.histogram(
-                        df,
-                        x=var,
-                        color=hue_param,
-                        title=title if title else f"Count Plot of {var}",
-                        barmode='group',
-                        text_auto=annotate,
-                        color_discrete_map=hue_color_mapping  # Map hue categories to colors
-                    )
-                else:
-                    # Generate color sequence for each category
-                    main_palette = generate_palette(num_categories, color_palette)
-                    fig_plotly = px.histogram(
-                        df,
-                        x=var,
-                        title=title if title else f"Count Plot of {var}",
-                        barmode='relative',
-                        text_auto=annotate,
-                        color_discrete_sequence=main_palette  # Assign different colors to each category
-                    )
-            else:
-                if hue_param:
-                    fig_plotly = px.histogram(
-                        df,
-                        y=var,
-                        color=hue_param,
-                        title=title if title else f"Count Plot of {var}",
-                        barmode='group',
-                        orientation='h',
-                        text_auto=annotate,
-                        color_discrete_map=hue_color_mapping
-                    )
-                else:
-                    main_palette = generate_palette(num_categories, color_palette)
-                    fig_plotly = px.histogram(
-                        df,
-                        y=var,
-                        title=title if title else f"Count Plot of {var}",
-                        barmode='relative',
-                        orientation='h',
-                        text_auto=annotate,
-                        color_discrete_sequence=main_palette
-                    )
+            # Count on the server: one bar per category and hue group, not one value per row
+            categories, groups, counts, _ = crosstab(df[var], df[hue_param] if hue_param else None)
+            main_palette = generate_palette(len(categories), color_palette)
+
+            fig_plotly = go.Figure()
+            for i, group in enumerate(groups):
+                present = counts[i] > 0
+                group_counts = counts[i][present].astype(int)
+                fig_plotly.add_trace(bar(
+                    [c for c, p in zip(categories, present) if p],
+                    group_counts,
+                    orient,
+                    name=str(group) if group is not None else var,
+                    showlegend=group is not None,
+                    marker_color=hue_color_mapping.get(group) if group is not None else main_palette[0],
+                    text=group_counts if annotate else None
+                ))
+            fig_plotly.update_layout(
+                title=title if title else f"Count Plot of {var}",
+                barmode='group' if hue_param else 'relative',
+                legend_title_text=hue_param
+            )
+            axis_titles(fig_plotly, var, 'count', orient)
 
             if annotate:
                 fig_plotly.update_traces(textposition='outside')
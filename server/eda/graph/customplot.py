@@ -1,5 +1,3 @@
-import base64
-import io
 import matplotlib.pyplot as plt
 import seaborn as sns
 from django.http import JsonResponse
@@ -8,6 +6,7 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import json
 import pandas as pd
+from eda.graph.render import figure_dpi, save_figure, static_formats
 
 def customplot(df, data):
     """
@@ -151,101 +150,80 @@ def customplot(df, data):
         # --------------------
         # **Seaborn/Matplotlib Plots**
         # --------------------
-        # Create separate figures for Line and Scatter plots
-
-        # **Line Plot**
-        fig_matplotlib_line, ax_line = plt.subplots(figsize=(6, 6), dpi=720)
-
-        if data.get('title'):
-            ax_line.set_title(data['title'])
-        else:
-            ax_line.set_title(f"Line Plot of {y} vs {x}")
-
-        if hue_param:
-            sns.lineplot(
-                data=df,
-                x=x,
-                y=y,
-                hue=hue_param,
-                palette=hue_color_mapping,
-                ax=ax_line,
-                linewidth=2.5
-            )
-            ax_line.legend_.remove()  # Remove individual legends to prevent repetition
-        else:
-            sns.lineplot(
-                data=df,
-                x=x,
-                y=y,
-                color='blue',
-                ax=ax_line,
-                linewidth=2.5,
-                label=x
-            )
-            ax_line.legend_.remove()
-
-        # Save Line Plot to PNG
-        image_stream_png_line = io.BytesIO()
-        fig_matplotlib_line.savefig(image_stream_png_line, format='png', bbox_inches='tight')
-        image_stream_png_line.seek(0)
-        image_base64_png_line = base64.b64encode(image_stream_png_line.getvalue()).decode('utf-8')
-        png_list.append(image_base64_png_line)
-
-        # Save Line Plot to SVG
-        image_stream_svg_line = io.BytesIO()
-        fig_matplotlib_line.savefig(image_stream_svg_line, format='svg', bbox_inches='tight')
-        image_stream_svg_line.seek(0)
-        image_svg_line = image_stream_svg_line.getvalue().decode('utf-8')
-        svg_list.append(image_svg_line)
-
-        plt.close(fig_matplotlib_line)
-
-        # **Scatter Plot**
-        fig_matplotlib_scatter, ax_scatter = plt.subplots(figsize=(6, 6), dpi=720)
-
-        if data.get('title'):
-            ax_scatter.set_title(data['title'])
-        else:
-            ax_scatter.set_title(f"Scatter Plot of {y} vs {x}")
-
-        if hue_param:
-            sns.scatterplot(
-                data=df,
-                x=x,
-                y=y,
-                hue=hue_param,
-                palette=hue_color_mapping,
-                ax=ax_scatter,
-                s=50
-            )
-            ax_scatter.legend_.remove()  # Remove individual legends to prevent repetition
-        else:
-            sns.scatterplot(
-                data=df,
-                x=x,
-                y=y,
-                color='blue',
-                ax=ax_scatter,
-                s=50,
-                label=x
-            )
-            ax_scatter.legend_.remove()
-
-        # Save Scatter Plot to PNG
-        image_stream_png_scatter = io.BytesIO()
-        fig_matplotlib_scatter.savefig(image_stream_png_scatter, format='png', bbox_inches='tight')
-        image_stream_png_scatter.seek(0)
-        image_base64_png_scatter = base64.b64encode(image_stream_png_scatter.getvalue()).decode('utf-8')
-        png_list.append(image_base64_png_scatter)
+        if static_formats(data):
+            # Create separate figures for Line and Scatter plots
+
+            # **Line Plot**
+            fig_matplotlib_line, ax_line = plt.subplots(figsize=(6, 6), dpi=figure_dpi(data))
+
+            if data.get('title'):
+                ax_line.set_title(data['title'])
+            else:
+                ax_line.set_title(f"Line Plot of {y} vs {x}")
+
+            if hue_param:
+                sns.lineplot(
+                    data=df,
+                    x=x,
+                    y=y,
+                    hue=hue_param,
+                    palette=hue_color_mapping,
+                    ax=ax_line,
+                    linewidth=2.5
+                )
+                ax_line.legend_.remove()  # Remove individual legends to prevent repetition
+            else:
+                sns.lineplot(
+                    data=df,
+                    x=x,
+                    y=y,
+                    color='blue',
+                    ax=ax_line,
+                    linewidth=2.5,
+                    label=x
+                )
+                ax_line.legend_.remove()
+
+            # Save Line Plot
+            save_figure(fig_matplotlib_line, data, png_list, svg_list)
+
+            plt.close(fig_matplotlib_line)
+
+            # **Scatter Plot**
+            fig_matplotlib_scatter, ax_scatter = plt.subplots(figsize=(6, 6), dpi=figure_dpi(data))
+
+            if data.get('title'):
+                ax_scatter.set_title(data['title'])
+            else:
+                ax_scatter.set_title(f"Scatter Plot of {y} vs {x}")
+
+            if hue_param:
+                sns.scatterplot(
+                    data=df,
+                    x=x,
+                    y=y,
+                    hue=hue_param,
+                    palette=hue_color_mapping,
+                    ax=ax_scatter,
+                    s=50
+                )
+                ax_scatter.legend_.remove()  # Remove individual legends to prevent repetition
+            else:
+                sns.scatterplot(
+                    data=df,
+                    x=x,
+                    y=y,
+                    color='blue',
+                    ax=ax_scatter,
+                    s=50,
+                    label=x
+                )
+                ax_scatter.legend_.remove()
 
-        # Save Scatter Plot to SVG
-        image_stream_svg_scatter = io.BytesIO()
-        fig_matplotlib_scatter.savefig(image_stream_svg_scatter, format='svg', bbox_inches='tight')
-        image_stream_svg_scatter.seek(0)
-        image_svg_scatter = image_stream_svg_scatter.getvalue().decode('utf-8')
-        svg_list.append(image_svg_scatter)
+            # Save Scatter Plot
+            save_figure(fig_matplotlib_scatter, data, png_list, svg_list)
 
-        plt.close(fig_matplotlib_scatter)
+            plt.close(fig_matplotlib_scatter)
 
     # Prepare the JSON response with separate lists for PNGs, SVGs, and Plotly figures
     response_data = {
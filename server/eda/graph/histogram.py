@@ -1,15 +1,16 @@
 # server/eda/graph/histogram.py
 
-import base64
-import io
 import matplotlib.pyplot as plt
 import seaborn as sns
 from django.http import JsonResponse
-import plotly.express as px
 import plotly.graph_objects as go
 import json
+import numpy as np
 import pandas as pd
 import logging
+from eda.graph.aggregate import axis_titles, bar, factorize, histogram_edges, kde_curve, numeric
+from eda.graph.aggregate import histogram as binned
+from eda.graph.render import figure_dpi, save_figure, static_formats
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -22,6 +23,7 @@ def histogram(df, data):
         hue = data.get('hue')
         orient = data.get('orient')
         stat = data.get('agg')  # Aggregation function
+        weight = data.get('weight')  # Column the sum/avg/min/max stats aggregate
         auto_bin = data.get('autoBin')
         kde = data.get('kde')
         legend = data.get('legend')
@@ -79,6 +81,13 @@ def histogram(df, data):
             else:
                 logger.info("No hue parameter provided.")
 
+        # Hue groups in the order of hue_categories, and the optional weight column of the stat
+        if hue_param and hue_param in df.columns:
+            hue_codes, hue_groups = factorize(df[hue_param])
+        else:
+            hue_codes, hue_groups = None, [None]
+        weights = numeric(df[weight])[0] if weight and weight != "-" and weight in df.columns else None
+
         # Iterate over variables to create Plotly figures
         for var in vars:
             logger.info(f"Creating Plotly histogram for variable: {var}")
@@ -92,34 +101,46 @@ def histogram(df, data):
                     logger.error(f"Variable '{var}' is not numeric. KDE requires numeric data.")
                     continue
 
-                # Create the histogram
-                if orient == "Vertical":
-                    fig_plotly = px.histogram(
-                        df,
-                        x=var,
-                        color=hue_param,
-                        title=title if title else f"Histogram of {var}",
-                        nbins=bins if isinstance(bins, int) else None,
-                        histfunc=histfunc,
-                        histnorm=histnorm,
-                        color_discrete_map=hue_color_mapping if hue_param else None,
-                        color_discrete_sequence=None if hue_param else sns.color_palette(color_palette, n_colors=df[var].nunique()).as_hex(),
-                        opacity=0.75
-                    )
+                # Bin on the server: the figure holds one bar per bin, not one value per row
+                x, valid = numeric(df[var])
+                if not valid.any():
+                    logger.error(f"Variable '{var}' has no values to bin.")
+                    continue
+                edges = histogram_edges(x[valid], bins)
+                values = binned(x, edges, hue_codes, len(hue_groups), weights, histfunc, histnorm)
+                centers = (edges[:-1] + edges[1:]) / 2
+                ranges = np.column_stack([edges[:-1], edges[1:]])
+                if histnorm:
+                    value_title = histnorm
+                elif weights is not None and histfunc != 'count':
+                    value_title = f"{histfunc} of {weight}"
                 else:
-                    fig_plotly = px.histogram(
-                        df,
-                        y=var,
-                        color=hue_param,
-                        title=title if title else f"Histogram of {var}",
-                        nbins=bins if isinstance(bins, int) else None,
-                        histfunc=histfunc,
-                        histnorm=histnorm,
-                        orientation='h',
-                        color_discrete_map=hue_color_mapping if hue_param else None,
-                        color_discrete_sequence=None if hue_param else sns.color_palette(color_palette, n_colors=df[var].nunique()).as_hex(),
-                        opacity=0.75
-                    )
+                    value_title = 'count'
+                value_axis = 'y' if orient == "Vertical" else 'x'
+                single_color = None if hue_param else sns.color_palette(color_palette, n_colors=df[var].nunique()).as_hex()[0]
+
+                fig_plotly = go.Figure()
+                for i, group in enumerate(hue_groups):
+                    fig_plotly.add_trace(bar(
+                        centers,
+                        values[i],
+                        orient,
+                        width=np.diff(edges),
+                        name=str(group) if group is not None else var,
+                        showlegend=group is not None,
+                        marker_color=hue_color_mapping.get(group) if group is not None else single_color,
+                        opacity=0.75,
+                        customdata=ranges,
+                        hovertemplate=f"{var}=%{{customdata[0]:.4g}} - %{{customdata[1]:.4g}}<br>"
+                                      f"{value_title}=%{{{value_axis}}}<extra></extra>"
+                    ))
+                fig_plotly.update_layout(
+                    title=title if title else f"Histogram of {var}",
+                    barmode='relative',
+                    bargap=0,
+                    legend_title_text=hue_param
+                )
+                axis_titles(fig_plotly, var, value_title, orient)
 
                 # Manage legend
                 if not legend:
@@ -136,16 +157,11 @@ def histogram(df, data):
 
                 # Add KDE as a separate trace if enabled
                 if kde:
-                    # Calculate KDE using Seaborn
-                    kde_data = sns.kdeplot(df[var].dropna(), bw_adjust=1.0)
-                    kde_x = kde_data.lines[0].get_xdata()
-                    kde_y = kde_data.lines[0].get_ydata()
-                    plt.close()  # Close the Seaborn plot
+                    kde_x, kde_y = kde_curve(x[valid])
 
                     # Scale KDE to match histogram
                     # Plotly doesn't support direct KDE overlay on histograms, so scaling is required
-                    hist_values = fig_plotly.data[0].y if orient == "Vertical" else fig_plotly.data[0].x
-                    max_hist = max(hist_values) if hist_values else 1
+                    max_hist = np.nanmax(values[0]) if np.isfinite(values[0]).any() else 1
                     kde_y_scaled = kde_y * max_hist / max(kde_y) if max(kde_y) > 0 else kde_y
 
                     # Add KDE trace
@@ -163,56 +179,46 @@ def histogram(df, data):
                 raise e  # Re-raise to be caught by outer try-except
 
         # Proceed with matplotlib/seaborn plots
-        fig, axs = plt.subplots(nrows=1, ncols=len(vars), figsize=(6 * len(vars), 6), dpi=720)
-        if len(vars) == 1:
-            axs = [axs]
-
-        for i, var in enumerate(vars):
-            ax = axs[i]
-            if orient == "Vertical":
-                sns.histplot(
-                    data=df,
-                    x=var,
-                    bins=bins,
-                    hue=hue_param,
-                    kde=kde,
-                    stat=stat,
-                    palette=hue_color_mapping if hue_param else 'Blues',
-                    ax=ax,
-                    legend=legend
-                )
-            else:
-                sns.histplot(
-                    data=df,
-                    y=var,
-                    bins=bins,
-                    hue=hue_param,
-                    kde=kde,
-                    stat=stat,
-                    palette=hue_color_mapping if hue_param else 'Blues',
-                    ax=ax,
-                    legend=legend
-                )
+        if static_formats(data):
+            fig, axs = plt.subplots(nrows=1, ncols=len(vars), figsize=(6 * len(vars), 6), dpi=figure_dpi(data))
+            if len(vars) == 1:
+                axs = [axs]
 
-            if title:
-                ax.set_title(title)
+            for i, var in enumerate(vars):
+                ax = axs[i]
+                if orient == "Vertical":
+                    sns.histplot(
+                        data=df,
+                        x=var,
+                        bins=bins,
+                        hue=hue_param,
+                        kde=kde,
+                        stat=stat,
+                        palette=hue_color_mapping if hue_param else 'Blues',
+                        ax=ax,
+                        legend=legend
+                    )
+                else:
+                    sns.histplot(
+                        data=df,
+                        y=var,
+                        bins=bins,
+                        hue=hue_param,
+                        kde=kde,
+                        stat=stat,
+                        palette=hue_color_mapping if hue_param else 'Blues',
+                        ax=ax,
+                        legend=legend
+                    )
 
-        plt.tight_layout()
+                if title:
+                    ax.set_title(title)
 
-        # Save the figure in both PNG and SVG formats
-        image_stream_png = io.BytesIO()
-        plt.savefig(image_stream_png, format='png', bbox_inches='tight')
-        image_stream_png.seek(0)
-        image_base64_png = base64.b64encode(image_stream_png.getvalue()).decode('utf-8')
-        png_list.append(image_base64_png)
+            plt.tight_layout()
 
-        image_stream_svg = io.BytesIO()
-        plt.savefig(image_stream_svg, format='svg', bbox_inches='tight')
-        image_stream_svg.seek(0)
-        image_svg = image_stream_svg.getvalue().decode('utf-8')
-        svg_list.append(image_svg)
+            save_figure(fig, data, png_list, svg_list)
 
-        plt.close(fig)
+            plt.close(fig)
 
         # Return images and Plotly figures in the response
         response_data = {
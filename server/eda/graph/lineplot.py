@@ -1,11 +1,10 @@
-import base64
-import io
 import matplotlib.pyplot as plt
 import seaborn as sns
 from django.http import JsonResponse
 import plotly.express as px
 import json
 import pandas as pd
+from eda.graph.render import figure_dpi, save_figure, static_formats
 
 
 def lineplot(df, data):
@@ -52,38 +51,27 @@ def lineplot(df, data):
         hue_color_mapping = {}
 
     # Create separate matplotlib figures for each x variable
-    for x in xs:
-        fig, ax = plt.subplots(figsize=(6, 6), dpi=720)
+    if static_formats(data):
+        for x in xs:
+            fig, ax = plt.subplots(figsize=(6, 6), dpi=figure_dpi(data))
 
-        if title:
-            ax.set_title(title)
-        else:
-            ax.set_title(f"Line Plot of {y} vs {x}")
+            if title:
+                ax.set_title(title)
+            else:
+                ax.set_title(f"Line Plot of {y} vs {x}")
 
-        if hue_param:
-            sns.lineplot(data=df, x=x, y=y, hue=hue_param, style=style if style != "-" else None,
-                         palette=hue_color_mapping, legend=legend, ax=ax)
-        else:
-            sns.lineplot(data=df, x=x, y=y, style=None if style == "-" else style,
-                         color='blue', legend=legend, ax=ax)
-
-        plt.tight_layout()
-
-        # Save the figure to a PNG buffer
-        image_stream_png = io.BytesIO()
-        fig.savefig(image_stream_png, format='png', bbox_inches='tight')
-        image_stream_png.seek(0)
-        image_base64_png = base64.b64encode(image_stream_png.getvalue()).decode('utf-8')
-        png_list.append(image_base64_png)
-
-        # Save the figure to an SVG buffer
-        image_stream_svg = io.BytesIO()
-        fig.savefig(image_stream_svg, format='svg', bbox_inches='tight')
-        image_stream_svg.seek(0)
-        image_svg = image_stream_svg.getvalue().decode('utf-8')
-        svg_list.append(image_svg)
-
-        plt.close(fig)
+            if hue_param:
+                sns.lineplot(data=df, x=x, y=y, hue=hue_param, style=style if style != "-" else None,
+                             palette=hue_color_mapping, legend=legend, ax=ax)
+            else:
+                sns.lineplot(data=df, x=x, y=y, style=None if style == "-" else style,
+                             color='blue', legend=legend, ax=ax)
+
+            plt.tight_layout()
+
+            save_figure(fig, data, png_list, svg_list)
+
+            plt.close(fig)
 
     # Create separate Plotly figures for each x variable
     for x in xs:
@@ -1,11 +1,11 @@
-import base64
-import io
 import matplotlib.pyplot as plt
 import seaborn as sns
 from django.http import JsonResponse
-import plotly.express as px
+import plotly.graph_objects as go
 import json
 import pandas as pd
+from eda.graph.aggregate import crosstab
+from eda.graph.render import figure_dpi, save_figure, static_formats
 
 
 def pieplot(df, data):
@@ -46,13 +46,14 @@ def pieplot(df, data):
         palette_hex = palette.as_hex()
         category_color_mapping = dict(zip(unique_categories, palette_hex))
 
-        # Create Plotly pie chart
-        fig_plotly = px.pie(
-            df,
-            names=var,
-            title=title if title else f"Pie Chart of {var}",
+        # Count on the server: one slice per category, not one value per row
+        categories, _, counts, _ = crosstab(df[var])
+        fig_plotly = go.Figure(go.Pie(
+            labels=categories,
+            values=counts[0].astype(int),
             hole=explode if explode > 0 else 0
-        )
+        ))
+        fig_plotly.update_layout(title=title if title else f"Pie Chart of {var}")
 
         if not label:
             fig_plotly.update_traces(textinfo='none')
@@ -71,53 +72,42 @@ def pieplot(df, data):
 
         plotly_figs.append(json.loads(fig_plotly.to_json()))
 
-        # Create matplotlib/seaborn pie chart
-        fig, ax = plt.subplots(figsize=(6, 6), dpi=720)
-        sizes = df[var].value_counts().values
-        labels_unique = df[var].value_counts().index.tolist()
-        colors_list = [category_color_mapping[label] for label in labels_unique]
+        if static_formats(data):
+            # Create matplotlib/seaborn pie chart
+            fig, ax = plt.subplots(figsize=(6, 6), dpi=figure_dpi(data))
+            sizes = df[var].value_counts().values
+            labels_unique = df[var].value_counts().index.tolist()
+            colors_list = [category_color_mapping[label] for label in labels_unique]
 
-        if percentage:
-            autopct = '%1.2f%%'
-        elif label:
-            autopct = None
-        else:
-            autopct = None
-
-        wedges, texts, autotexts = ax.pie(
-            sizes,
-            labels=labels_unique if label else None,
-            autopct=autopct,
-            explode=[explode for _ in labels_unique],
-            colors=colors_list,
-            startangle=140
-        )
+            if percentage:
+                autopct = '%1.2f%%'
+            elif label:
+                autopct = None
+            else:
+                autopct = None
 
-        if not label:
-            ax.set_ylabel('')
+            wedges, texts, autotexts = ax.pie(
+                sizes,
+                labels=labels_unique if label else None,
+                autopct=autopct,
+                explode=[explode for _ in labels_unique],
+                colors=colors_list,
+                startangle=140
+            )
 
-        ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
+            if not label:
+                ax.set_ylabel('')
 
-        if title:
-            ax.set_title(title)
+            ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
 
-        plt.tight_layout()
+            if title:
+                ax.set_title(title)
 
-        # Save the figure to a PNG buffer
-        image_stream_png = io.BytesIO()
-        fig.savefig(image_stream_png, format='png', bbox_inches='tight')
-        image_stream_png.seek(0)
-        image_base64_png = base64.b64encode(image_stream_png.getvalue()).decode('utf-8')
-        png_list.append(image_base64_png)
+            plt.tight_layout()
 
-        # Save the figure to an SVG buffer
-        image_stream_svg = io.BytesIO()
-        fig.savefig(image_stream_svg, format='svg', bbox_inches='tight')
-        image_stream_svg.seek(0)
-        image_svg = image_stream_svg.getvalue().decode('utf-8')
-        svg_list.append(image_svg)
+            save_figure(fig, data, png_list, svg_list)
 
-        plt.close(fig)
+            plt.close(fig)
 
     # Prepare the JSON response with separate lists for PNGs, SVGs, and Plotly figures
     response_data = {
@@ -1,5 +1,3 @@
-import base64
-import io
 import matplotlib.pyplot as plt
 import seaborn as sns
 from django.http import JsonResponse
@@ -7,6 +5,7 @@ import plotly.express as px
 import json
 import pandas as pd
 import statsmodels.api as sm
+from eda.graph.render import figure_dpi, save_figure, static_formats
 
 def regplot(df, data):
     # Extract parameters
@@ -54,33 +53,22 @@ def regplot(df, data):
 
         plotly_figs.append(json.loads(fig_plotly.to_json()))
 
-        # Create matplotlib/seaborn regression plot
-        fig, ax = plt.subplots(figsize=(6, 6), dpi=720)
+        if static_formats(data):
+            # Create matplotlib/seaborn regression plot
+            fig, ax = plt.subplots(figsize=(6, 6), dpi=figure_dpi(data))
 
-        sns.regplot(data=df, x=x, y=y, scatter=scatter, ax=ax, line_kws={'color': line_color})
+            sns.regplot(data=df, x=x, y=y, scatter=scatter, ax=ax, line_kws={'color': line_color})
 
-        if title:
-            ax.set_title(title)
-        else:
-            ax.set_title(f"Regression Plot of {y} vs {x}")
+            if title:
+                ax.set_title(title)
+            else:
+                ax.set_title(f"Regression Plot of {y} vs {x}")
 
-        plt.tight_layout()
+            plt.tight_layout()
 
-        # Save the figure to a PNG buffer
-        image_stream_png = io.BytesIO()
-        fig.savefig(image_stream_png, format='png', bbox_inches='tight')
-        image_stream_png.seek(0)
-        image_base64_png = base64.b64encode(image_stream_png.getvalue()).decode('utf-8')
-        png_list.append(image_base64_png)
+            save_figure(fig, data, png_list, svg_list)
 
-        # Save the figure to an SVG buffer
-        image_stream_svg = io.BytesIO()
-        fig.savefig(image_stream_svg, format='svg', bbox_inches='tight')
-        image_stream_svg.seek(0)
-        image_svg = image_stream_svg.getvalue().decode('utf-8')
-        svg_list.append(image_svg)
-
-        plt.close(fig)
+            plt.close(fig)
 
     # Prepare the JSON response with separate lists for PNGs, SVGs, and Plotly figures
     response_data = {
@@ -0,0 +1,74 @@
+# server/eda/graph/render.py
+
+import base64
+import io
+
+from django.conf import settings
+
+FORMATS = ('plotly', 'png', 'svg')
+STATIC_FORMATS = ('png', 'svg')
+# Resolution of PNG renderings, and the most a request may ask for
+EDA_DPI = getattr(settings, 'EDA_DPI', 150)
+EDA_MAX_DPI = getattr(settings, 'EDA_MAX_DPI', 300)
+
+
+def parse_formats(value, default=('plotly',)):
+    """
+    The formats a request asks for, as a list or a comma separated string.
+    Raises ValueError for an unknown format.
+    """
+    if not value:
+        return list(default)
+    if isinstance(value, str):
+        value = value.split(',')
+    formats = [str(f).strip().lower() for f in value if str(f).strip()]
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown format {', '.join(unknown)}, use {', '.join(FORMATS)}.")
+    return formats
+
+
+def parse_dpi(value):
+    """
+    The requested DPI, capped at EDA_MAX_DPI.
+    """
+    return max(min(int(value or EDA_DPI), EDA_MAX_DPI), 1)
+
+
+def static_formats(data):
+    """
+    The static formats of a plot request, empty when only Plotly is wanted.
+    The matplotlib/seaborn figures are only drawn for these.
+    """
+    return [f for f in parse_formats(data.get('formats')) if f in STATIC_FORMATS]
+
+
+def figure_dpi(data):
+    return parse_dpi(data.get('dpi'))
+
+
+def save_figure(fig, data, png_list, svg_list):
+    """
+    Encode a matplotlib figure in the static formats the request asks for.
+    """
+    formats = static_formats(data)
+    if 'png' in formats:
+        stream = io.BytesIO()
+        fig.savefig(stream, format='png', bbox_inches='tight')
+        png_list.append(base64.b64encode(stream.getvalue()).decode('utf-8'))
+    if 'svg' in formats:
+        stream = io.BytesIO()
+        fig.savefig(stream, format='svg', bbox_inches='tight')
+        svg_list.append(stream.getvalue().decode('utf-8'))
+
+
+def export_plotly(figure, fmt, dpi):
+    """
+    Render a serialized Plotly figure to PNG (base64) or SVG with kaleido.
+    Plotly lays figures out at 96 pixels per inch, so `dpi` sets the scale.
+    """
+    import plotly.io as pio
+    image = pio.to_image(figure, format=fmt, scale=dpi / 96)
+    if fmt == 'png':
+        return base64.b64encode(image).decode('utf-8')
+    return image.decode('utf-8')
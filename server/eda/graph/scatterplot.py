@@ -1,10 +1,9 @@
-import base64
-import io
 import matplotlib.pyplot as plt
 import seaborn as sns
 from django.http import JsonResponse
 import plotly.express as px
 import json
+from eda.graph.render import figure_dpi, save_figure, static_formats
 
 def scatterplot(df, data):
     """
@@ -41,51 +40,40 @@ def scatterplot(df, data):
         hue_color_mapping = {}
 
     # Create separate matplotlib figures for each x variable
-    for x in xs:
-        # Create a new figure and axis for each plot
-        fig, ax = plt.subplots(figsize=(6, 6), dpi=720)
-
-        # Set the title if provided
-        if title:
-            ax.set_title(title)
-        else:
-            ax.set_title(f"Scatter Plot of {y} vs {x}")
-
-        # Generate the scatter plot using seaborn with the defined palette
-        if hue_param:
-            sns.scatterplot(
-                data=df,
-                x=x,
-                y=y,
-                hue=hue_param,
-                palette=hue_color_mapping,
-                ax=ax
-            )
-        else:
-            sns.scatterplot(
-                data=df,
-                x=x,
-                y=y,
-                ax=ax,
-                color='blue'  # Default color if no hue
-            )
-
-        # Save the figure to a PNG buffer
-        image_stream_png = io.BytesIO()
-        fig.savefig(image_stream_png, format='png', bbox_inches='tight')
-        image_stream_png.seek(0)
-        image_base64_png = base64.b64encode(image_stream_png.getvalue()).decode('utf-8')
-        png_list.append(image_base64_png)
-
-        # Save the figure to an SVG buffer
-        image_stream_svg = io.BytesIO()
-        fig.savefig(image_stream_svg, format='svg', bbox_inches='tight')
-        image_stream_svg.seek(0)
-        image_svg = image_stream_svg.getvalue().decode('utf-8')
-        svg_list.append(image_svg)
-
-        # Close the figure to free up memory
-        plt.close(fig)
+    if static_formats(data):
+        for x in xs:
+            # Create a new figure and axis for each plot
+            fig, ax = plt.subplots(figsize=(6, 6), dpi=figure_dpi(data))
+
+            # Set the title if provided
+            if title:
+                ax.set_title(title)
+            else:
+                ax.set_title(f"Scatter Plot of {y} vs {x}")
+
+            # Generate the scatter plot using seaborn with the defined palette
+            if hue_param:
+                sns.scatterplot(
+                    data=df,
+                    x=x,
+                    y=y,
+                    hue=hue_param,
+                    palette=hue_color_mapping,
+                    ax=ax
+                )
+            else:
+                sns.scatterplot(
+                    data=df,
+                    x=x,
+                    y=y,
+                    ax=ax,
+                    color='blue'  # Default color if no hue
+                )
+
+            save_figure(fig, data, png_list, svg_list)
+
+            # Close the figure to free up memory
+            plt.close(fig)
 
     # Create separate Plotly figures
     plotly_figs = []
@@ -1,11 +1,10 @@
-import base64
-import io
 import matplotlib.pyplot as plt
 import seaborn as sns
 from django.http import JsonResponse
 import plotly.express as px
 import json
 import pandas as pd
+from eda.graph.render import figure_dpi, save_figure, static_formats
 
 
 def violinplot(df, data):
@@ -52,90 +51,79 @@ def violinplot(df, data):
         hue_color_mapping = {}
 
     # Create separate matplotlib figures for each categorical variable
-    for cat in cats:
-        fig, ax = plt.subplots(figsize=(6, 6), dpi=720)
+    if static_formats(data):
+        for cat in cats:
+            fig, ax = plt.subplots(figsize=(6, 6), dpi=figure_dpi(data))
 
-        if title:
-            ax.set_title(title)
-        else:
-            if orient == "Vertical":
-                ax.set_title(f"Violin Plot of {num} by {cat}")
+            if title:
+                ax.set_title(title)
             else:
-                ax.set_title(f"Violin Plot of {num} by {cat}")
+                if orient == "Vertical":
+                    ax.set_title(f"Violin Plot of {num} by {cat}")
+                else:
+                    ax.set_title(f"Violin Plot of {num} by {cat}")
 
-        if orient == "Vertical":
-            if hue_param:
-                sns.violinplot(
-                    data=df,
-                    x=cat,
-                    y=num,
-                    hue=hue_param,
-                    dodge=dodge,
-                    split=split,
-                    palette=hue_color_mapping,
-                    ax=ax
-                )
+            if orient == "Vertical":
+                if hue_param:
+                    sns.violinplot(
+                        data=df,
+                        x=cat,
+                        y=num,
+                        hue=hue_param,
+                        dodge=dodge,
+                        split=split,
+                        palette=hue_color_mapping,
+                        ax=ax
+                    )
+                else:
+                    sns.violinplot(
+                        data=df,
+                        x=cat,
+                        y=num,
+                        dodge=dodge,
+                        split=split,
+                        palette='Blues',
+                        ax=ax
+                    )
             else:
-                sns.violinplot(
-                    data=df,
-                    x=cat,
-                    y=num,
-                    dodge=dodge,
-                    split=split,
-                    palette='Blues',
-                    ax=ax
-                )
-        else:
+                if hue_param:
+                    sns.violinplot(
+                        data=df,
+                        x=num,
+                        y=cat,
+                        hue=hue_param,
+                        dodge=dodge,
+                        split=split,
+                        palette=hue_color_mapping,
+                        ax=ax,
+                        orient='h'
+                    )
+                else:
+                    sns.violinplot(
+                        data=df,
+                        x=num,
+                        y=cat,
+                        dodge=dodge,
+                        split=split,
+                        palette='Blues',
+                        ax=ax,
+                        orient='h'
+                    )
+
+            # Adjust legend
             if hue_param:
-                sns.violinplot(
-                    data=df,
-                    x=num,
-                    y=cat,
-                    hue=hue_param,
-                    dodge=dodge,
-                    split=split,
-                    palette=hue_color_mapping,
-                    ax=ax,
-                    orient='h'
-                )
+                if split:
+                    ax.legend(title=hue_param, bbox_to_anchor=(1.05, 1), loc='upper left')
+                else:
+                    ax.legend(title=hue_param, bbox_to_anchor=(1.05, 1), loc='upper left')
             else:
-                sns.violinplot(
-                    data=df,
-                    x=num,
-                    y=cat,
-                    dodge=dodge,
-                    split=split,
-                    palette='Blues',
-                    ax=ax,
-                    orient='h'
-                )
-
-        # Adjust legend
-        if hue_param:
-            if split:
-                ax.legend(title=hue_param, bbox_to_anchor=(1.05, 1), loc='upper left')
-            else:
-                ax.legend(title=hue_param, bbox_to_anchor=(1.05, 1), loc='upper left')
-        else:
-            ax.legend_.remove() if ax.get_legend() else None
-
-        plt.tight_layout()
+                ax.legend_.remove() if ax.get_legend() else None
 
-        # Save the figure to a PNG buffer
-        image_stream_png = io.BytesIO()
-        fig.savefig(image_stream_png, format='png', bbox_inches='tight')
-        image_stream_png.seek(0)
-        image_base64_png = base64.b64encode(image_stream_png.getvalue()).decode('utf-8')
-        png_list.append(image_base64_png)
+            plt.tight_layout()
 
-        # Save the figure to an SVG buffer
-        image_stream_svg = io.BytesIO()
-        fig.savefig(image_stream_svg, format='svg', bbox_inches='tight')
-        image_stream_svg.seek(0)
-        image_svg = image_stream_svg.getvalue().decode('utf-8')
-        svg_list.append(image_svg)
+            save_figure(fig, data, png_list, svg_list)
 
-        plt.close(fig)
+            plt.close(fig)
 
     # Create separate Plotly figures for each categorical variable
     for cat in cats:
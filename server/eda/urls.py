@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import EDA
+from .views import EDA, EDAExport
 
 urlpatterns = [
+    path('eda/export/<str:figure_id>/', EDAExport.as_view(), name='eda_export'),
     path('eda/<str:plot_type>/', EDA.as_view(), name='eda_plot'),
 ]
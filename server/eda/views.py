@@ -4,6 +4,8 @@ import matplotlib
 import pandas as pd
 from django.http import JsonResponse
 from rest_framework.views import APIView
+from dataset_manager.store import resolve_frame
+from dataset_manager.wire import read_body
 from eda.graph.barplot import barplot
 from eda.graph.boxplot import boxplot
 from eda.graph.countplot import countplot
@@ -14,6 +16,8 @@ from eda.graph.pieplot import pieplot
 from eda.graph.regplot import regplot
 from eda.graph.scatterplot import scatterplot
 from eda.graph.violinplot import violinplot
+from eda.graph.render import STATIC_FORMATS, export_plotly, parse_dpi, parse_formats
+from eda.cache import plot_key, plots
 
 
 # Ensure the 'Agg' backend is used for matplotlib
@@ -22,9 +26,32 @@ matplotlib.use('Agg')
 
 class EDA(APIView):
     def post(self, request, plot_type):
-        data = json.loads(request.body)
-        file = data.get('file')
-        df = pd.DataFrame(file)
+        data = read_body(request)
+        # 'formats' picks plotly, png and/or svg (plotly by default), 'dpi' the PNG resolution
+        try:
+            data['formats'] = parse_formats(data.get('formats'))
+            data['dpi'] = parse_dpi(data.get('dpi'))
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        # Identical requests on unchanged columns are served from the plot cache
+        key, df = plot_key(plot_type, data)
+        raw = plots.get(key)
+        if raw is None:
+            if df is None:
+                df = resolve_frame(data)
+            response = self.plot(df, data, plot_type)
+            if response.status_code != 200:
+                return response
+            raw = response.content
+            plots.put(key, raw)
+        result = json.loads(raw)
+        # Static exports of this plot are rendered later, on request, from its cached Plotly specification
+        result['figure_id'] = key
+        if 'plotly' not in data['formats']:
+            result['plotly'] = []
+        return JsonResponse(result)
+
+    def plot(self, df, data, plot_type):
         # Based on plot_type, call the appropriate method
         if plot_type == 'barplot':
             return barplot(df, data)
@@ -48,3 +75,23 @@ class EDA(APIView):
             return customplot(df, data)
         else:
             return JsonResponse({'error': 'Invalid plot type'}, status=400)
+
+
+class EDAExport(APIView):
+    def get(self, request, figure_id):
+        """
+        PNG and/or SVG renderings ('formats', both by default) at 'dpi' of the
+        figures an earlier plot request returned with this figure_id.
+        """
+        raw = plots.get(figure_id)
+        if raw is None:
+            return JsonResponse({'error': 'Unknown or expired figure_id, request the plot again.'}, status=404)
+        try:
+            formats = [f for f in parse_formats(request.GET.get('formats'), STATIC_FORMATS) if f in STATIC_FORMATS]
+            dpi = parse_dpi(request.GET.get('dpi'))
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        plotly_figs = json.loads(raw).get('plotly', [])
+        result = {fmt: [export_plotly(fig, fmt, dpi) for fig in plotly_figs] for fmt in formats}
+        result['figure_id'] = figure_id
+        return JsonResponse(result)
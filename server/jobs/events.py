@@ -0,0 +1,78 @@
+import json
+import os
+import time
+
+from .storage import job_dir, read_json, write_json
+
+# Job running in this worker process, set by run_job
+_current_job = None
+# (started, done) of every stage that reported its progress, for the ETA
+_stages = {}
+
+
+def start(job_id):
+    global _current_job
+    _current_job = job_id
+    _stages.clear()
+
+
+def eta(stage, done, total):
+    """
+    Seconds elapsed in `stage` and the estimated seconds left, assuming the
+    remaining steps take as long as the ones done so far.
+    """
+    now = time.time()
+    started, last_done = _stages.get(stage, (now, 0))
+    if done < last_done:
+        started = now  # The stage started over, e.g. the next PSO model
+    _stages[stage] = (started, done)
+    elapsed = now - started
+    if not done or total is None:
+        return elapsed, None
+    return elapsed, elapsed / done * max(total - done, 0)
+
+
+def report_progress(stage='job', done=None, total=None, **fields):
+    """
+    Publish a progress event of the running job, e.g.
+    report_progress('pso', done=3, total=10, best_error=0.02).
+
+    Events are appended to the job's event log, streamed by
+    /api/jobs/<job_id>/events/, and the latest one of every stage is kept as
+    the job's progress. Outside of a job this does nothing, so computations
+    can call it whether they were started from a request or from the queue.
+    """
+    if _current_job is None:
+        return
+    event = dict(fields, stage=stage, done=done, total=total, time=time.time())
+    if done is not None:
+        event['elapsed'], event['eta'] = eta(stage, done, total)
+    path = job_dir(_current_job)
+    with open(os.path.join(path, 'events.jsonl'), 'a') as f:
+        f.write(json.dumps(event, default=str) + '\n')
+    progress = read_json(os.path.join(path, 'progress.json'), {})
+    progress[stage] = event
+    write_json(os.path.join(path, 'progress.json'), progress)
+
+
+def read_progress(job_id):
+    return read_json(os.path.join(job_dir(job_id), 'progress.json'), {})
+
+
+def read_events(job_id, offset=0):
+    """
+    Events logged after byte `offset` of the event log, as a list of
+    (next offset, event). Only complete lines are returned.
+    """
+    path = os.path.join(job_dir(job_id), 'events.jsonl')
+    if not os.path.exists(path):
+        return []
+    events = []
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b'\n'):
+                break  # Still being written
+            offset += len(line)
+            events.append((offset, json.loads(line)))
+    return events
@@ -0,0 +1,263 @@
+import functools
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import traceback
+import uuid
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from . import events
+from .storage import FINAL_STATES, JOBS_DIR, job_dir, read_json, read_state, update_state
+
+JOB_WORKERS = getattr(settings, 'JOB_WORKERS', 2)
+JOB_RETENTION = getattr(settings, 'JOB_RETENTION', 24 * 3600)
+# Seconds between checks for jobs cancelled through another server process, while jobs run
+JOB_CANCEL_CHECK = getattr(settings, 'JOB_CANCEL_CHECK', 1)
+
+# Workers start from a fresh interpreter: forking the threaded server could
+# copy locks held by other threads into the child
+_context = multiprocessing.get_context('spawn')
+
+
+def is_cancelled(job_id):
+    return os.path.exists(os.path.join(job_dir(job_id), 'cancel'))
+
+
+def run_job(job_id, call):
+    """
+    Worker process entry point: replay the captured request against the view
+    and store the rendered response.
+    """
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()  # Spawned workers start from a fresh interpreter
+    from django.test import RequestFactory
+    from django.urls import resolve
+
+    events.start(job_id)
+    update_state(job_id, status='running', started=time.time(), pid=os.getpid())
+    files = []
+    try:
+        request = RequestFactory().generic(
+            call['method'], call['path'], data=call['body'] or b'', content_type=call['content_type'], **call['headers'])
+        if call.get('files') is not None:
+            files = replay_form(request, call)
+        match = resolve(request.path_info)
+        response = match.func.__wrapped__(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        with open(os.path.join(job_dir(job_id), 'result'), 'wb') as f:
+            f.write(response.content)
+        update_state(job_id, status='done', finished=time.time(), status_code=response.status_code,
+                     content_type=response.get('Content-Type'))
+    except Exception as e:
+        traceback.print_exc()
+        update_state(job_id, status='failed', finished=time.time(), error=str(e))
+    finally:
+        for f in files:
+            f.close()
+        shutil.rmtree(os.path.join(job_dir(job_id), 'uploads'), ignore_errors=True)
+
+
+def replay_form(request, call):
+    """
+    Give a replayed multipart request the form fields and the files saved by
+    capture, as Django would have parsed them. Returns the opened files.
+    """
+    from django.core.files.uploadedfile import UploadedFile
+    from django.http import QueryDict
+    from django.utils.datastructures import MultiValueDict
+
+    post = QueryDict(mutable=True)
+    for key, values in call['post']:
+        post.setlist(key, values)
+    files = MultiValueDict()
+    for field, path, name, content_type in call['files']:
+        files.appendlist(field, UploadedFile(open(path, 'rb'), name, content_type, os.path.getsize(path)))
+    request._post, request._files = post, files
+    return [f for _, values in files.lists() for f in values]
+
+
+class JobQueue:
+    """
+    Runs jobs in worker processes, at most `workers` at a time.
+
+    Every job gets its own process so a running job can be cancelled by
+    terminating it. State lives in files under JOBS_DIR, so any server process
+    can report on a job; the process that accepted a job starts it and
+    watches over it. The dispatcher thread sleeps until a job is submitted,
+    cancelled or exits, and stops when there is nothing left to run.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.pending = []
+        self.running = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.dispatcher = None
+
+    def submit(self, call, job_id=None):
+        job_id = job_id or uuid.uuid4().hex
+        os.makedirs(job_dir(job_id), exist_ok=True)
+        update_state(job_id, job_id=job_id, status='queued', path=call['path'], submitted=time.time())
+        with self.lock:
+            self.pending.append((job_id, call))
+            if self.dispatcher is None or not self.dispatcher.is_alive():
+                self.dispatcher = threading.Thread(target=self.dispatch, daemon=True)
+                self.dispatcher.start()
+        self.wakeup.set()
+        prune()
+        return job_id
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued or running job. Returns the job state.
+        """
+        state = read_state(job_id)
+        if state['status'] in FINAL_STATES:
+            return state
+        open(os.path.join(job_dir(job_id), 'cancel'), 'w').close()
+        with self.lock:
+            self.pending = [(pending_id, call) for pending_id, call in self.pending if pending_id != job_id]
+            process = self.running.pop(job_id, None)
+        if process is not None:
+            process.terminate()
+            process.join()
+        self.wakeup.set()
+        state = read_state(job_id)
+        if state['status'] in FINAL_STATES:
+            return state  # Finished before it could be stopped
+        return update_state(job_id, status='cancelled', finished=time.time())
+
+    def watch(self, process):
+        process.join()
+        self.wakeup.set()
+
+    def dispatch(self):
+        while True:
+            self.wakeup.wait(JOB_CANCEL_CHECK if self.running else None)
+            self.wakeup.clear()
+            with self.lock:
+                for job_id, process in list(self.running.items()):
+                    if is_cancelled(job_id):
+                        # Cancelled through another server process
+                        process.terminate()
+                    if not process.is_alive():
+                        process.join()
+                        del self.running[job_id]
+                        if read_state(job_id)['status'] not in FINAL_STATES:
+                            update_state(job_id, status='failed', finished=time.time(),
+                                         error=f"Worker exited with code {process.exitcode}")
+                while self.pending and len(self.running) < self.workers:
+                    job_id, call = self.pending.pop(0)
+                    if is_cancelled(job_id):
+                        continue
+                    # Not a daemon: jobs may start process pools of their own
+                    process = _context.Process(target=run_job, args=(job_id, call))
+                    process.start()
+                    self.running[job_id] = process
+                    threading.Thread(target=self.watch, args=(process,), daemon=True).start()
+                if not self.pending and not self.running:
+                    self.dispatcher = None  # submit() starts a new one
+                    return
+
+
+queue = JobQueue(JOB_WORKERS)
+
+
+def prune():
+    """
+    Remove finished jobs older than JOB_RETENTION seconds.
+    """
+    if not os.path.isdir(JOBS_DIR):
+        return
+    now = time.time()
+    for job_id in os.listdir(JOBS_DIR):
+        state = read_json(os.path.join(JOBS_DIR, job_id, 'state.json'), {})
+        if state.get('status') in FINAL_STATES and now - state.get('finished', now) > JOB_RETENTION:
+            shutil.rmtree(os.path.join(JOBS_DIR, job_id), ignore_errors=True)
+
+
+def list_jobs():
+    if not os.path.isdir(JOBS_DIR):
+        return []
+    states = [read_json(os.path.join(JOBS_DIR, job_id, 'state.json')) for job_id in os.listdir(JOBS_DIR)]
+    return sorted((state for state in states if state), key=lambda state: state['submitted'], reverse=True)
+
+
+def wants_job(request):
+    """
+    True when the client asked to run the request in the background, with
+    '?async=1' or a 'Prefer: respond-async' header.
+    """
+    return request.GET.get('async', '').lower() in ('1', 'true') \
+        or 'respond-async' in request.META.get('HTTP_PREFER', '')
+
+
+def capture(request, job_id):
+    """
+    The parts of a request needed to replay it in a worker process.
+
+    Multipart bodies aren't copied: the form fields are kept and uploaded
+    files are saved to the job's directory, to be reopened by the worker.
+    """
+    query = request.GET.copy()
+    query.pop('async', None)
+    path = request.path + ('?' + query.urlencode() if query else '')
+    headers = {key: value for key, value in request.META.items()
+               if key.startswith('HTTP_') and key != 'HTTP_PREFER' and isinstance(value, str)}
+    call = {
+        'method': request.method,
+        'path': path,
+        'body': None,
+        'content_type': request.META.get('CONTENT_TYPE', ''),
+        'headers': headers,
+    }
+    if not request.content_type.startswith('multipart/'):
+        call['body'] = request.body
+        return call
+    upload_dir = os.path.join(job_dir(job_id), 'uploads')
+    os.makedirs(upload_dir, exist_ok=True)
+    call['post'] = list(request.POST.lists())
+    call['files'] = []
+    for field, uploads in request.FILES.lists():
+        for upload in uploads:
+            file_path = os.path.join(upload_dir, str(len(call['files'])))
+            with open(file_path, 'wb') as out:
+                for piece in upload.chunks():
+                    out.write(piece)
+            call['files'].append((field, file_path, upload.name, upload.content_type))
+    return call
+
+
+def run_as_job(view):
+    """
+    Let a view run in the background job queue.
+
+    Requests asking for it (see wants_job) get 202 and a job id right away;
+    the view itself runs unchanged in a worker process and its response is
+    served later from /api/jobs/<job_id>/result/. Other requests are handled
+    synchronously as before.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not wants_job(request):
+            return view(request, *args, **kwargs)
+        job_id = uuid.uuid4().hex
+        queue.submit(capture(request, job_id), job_id)
+        response = JsonResponse({
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f'/api/jobs/{job_id}/',
+            'events_url': f'/api/jobs/{job_id}/events/',
+            'result_url': f'/api/jobs/{job_id}/result/',
+        }, status=202)
+        response['Location'] = f'/api/jobs/{job_id}/'
+        return response
+    return wrapper
@@ -0,0 +1,47 @@
+import json
+import os
+import re
+
+from django.conf import settings
+from django.http import Http404
+
+# Job state, progress and results, hidden from the file tab
+JOBS_DIR = os.path.join(settings.BASE_DIR, 'dataset', '.jobs')
+
+JOB_ID = re.compile(r'^[0-9a-f]{32}$')
+FINAL_STATES = ('done', 'failed', 'cancelled')
+
+
+def job_dir(job_id):
+    if not JOB_ID.match(str(job_id)):
+        raise Http404(f"Unknown job id '{job_id}'.")
+    return os.path.join(JOBS_DIR, job_id)
+
+
+def write_json(path, data):
+    with open(path + '.tmp', 'w') as f:
+        json.dump(data, f, default=str)
+    os.replace(path + '.tmp', path)
+
+
+def read_json(path, default=None):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def read_state(job_id):
+    state = read_json(os.path.join(job_dir(job_id), 'state.json'))
+    if state is None:
+        raise Http404(f"Unknown job id '{job_id}'.")
+    return state
+
+
+def update_state(job_id, **fields):
+    path = os.path.join(job_dir(job_id), 'state.json')
+    state = read_json(path, {})
+    state.update(fields)
+    write_json(path, state)
+    return state
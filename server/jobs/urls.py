@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('jobs/', views.list_all, name='list_jobs'),
+    path('jobs/<str:job_id>/', views.job_status, name='job_status'),
+    path('jobs/<str:job_id>/progress/', views.job_progress, name='job_progress'),
+    path('jobs/<str:job_id>/events/', views.job_events, name='job_events'),
+    path('jobs/<str:job_id>/cancel/', views.job_cancel, name='job_cancel'),
+    path('jobs/<str:job_id>/result/', views.job_result, name='job_result'),
+]
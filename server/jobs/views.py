@@ -0,0 +1,108 @@
+import json
+import os
+import shutil
+import time
+
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from .events import read_events, read_progress
+from .runner import list_jobs, queue
+from .storage import FINAL_STATES, job_dir, read_state
+
+# Seconds between checks for new events, and between keep-alive comments
+POLL_INTERVAL = 0.5
+KEEP_ALIVE = 15
+
+
+def list_all(request):
+    return JsonResponse(list_jobs(), safe=False)
+
+
+@csrf_exempt
+def job_status(request, job_id):
+    """
+    GET returns the state and latest progress of a job, DELETE cancels it and
+    removes its files.
+    """
+    if request.method == 'DELETE':
+        queue.cancel(job_id)
+        shutil.rmtree(job_dir(job_id), ignore_errors=True)
+        return JsonResponse({"message": "Job deleted successfully!"})
+    state = read_state(job_id)
+    state['progress'] = read_progress(job_id)
+    return JsonResponse(state)
+
+
+def job_progress(request, job_id):
+    read_state(job_id)  # 404 for unknown jobs
+    return JsonResponse(read_progress(job_id))
+
+
+def sse(event, data, event_id=None):
+    message = f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+    return f"id: {event_id}\n{message}" if event_id is not None else message
+
+
+def event_stream(job_id, offset):
+    status = None
+    last_sent = time.time()
+    while True:
+        for offset, event in read_events(job_id, offset):
+            yield sse('progress', event, offset)
+            last_sent = time.time()
+        try:
+            state = read_state(job_id)
+        except Http404:
+            yield sse('end', {'job_id': job_id, 'status': 'deleted'})
+            return
+        if state['status'] != status:
+            status = state['status']
+            yield sse('state', state)
+            last_sent = time.time()
+        if status in FINAL_STATES:
+            # Pick up events logged right before the job finished
+            for offset, event in read_events(job_id, offset):
+                yield sse('progress', event, offset)
+            yield sse('end', state)
+            return
+        if time.time() - last_sent > KEEP_ALIVE:
+            yield ": keep-alive\n\n"
+            last_sent = time.time()
+        time.sleep(POLL_INTERVAL)
+
+
+def job_events(request, job_id):
+    """
+    Server-Sent Events stream of a job: a 'progress' event for every event the
+    computation reports, a 'state' event when the job changes state and a final
+    'end' event. Reconnecting clients resume after their Last-Event-ID.
+    """
+    read_state(job_id)  # 404 for unknown jobs
+    offset = int(request.META.get('HTTP_LAST_EVENT_ID') or request.GET.get('offset', 0))
+    response = StreamingHttpResponse(event_stream(job_id, offset), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Don't let a proxy buffer the stream
+    return response
+
+
+@csrf_exempt
+def job_cancel(request, job_id):
+    if request.method != 'POST':
+        return JsonResponse({"error": "Invalid request method"}, status=405)
+    return JsonResponse(queue.cancel(job_id))
+
+
+def job_result(request, job_id):
+    """
+    The response the view produced, exactly as it would have been returned
+    synchronously. Jobs that aren't done yet answer 409 with their state.
+    """
+    state = read_state(job_id)
+    if state['status'] == 'failed':
+        return JsonResponse({"error": state.get('error'), "job_id": job_id}, status=500)
+    if state['status'] != 'done':
+        return JsonResponse(state, status=409)
+    with open(os.path.join(job_dir(job_id), 'result'), 'rb') as f:
+        content = f.read()
+    return HttpResponse(content, content_type=state.get('content_type'), status=state.get('status_code', 200))
@@ -4,7 +4,7 @@ from django.http import JsonResponse
 
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.neighbors import KNeighborsClassifier
-from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
+from ..search import search
 
 
 def hyperparameter_optimization(X_train, y_train,file):
@@ -17,8 +17,7 @@ def hyperparameter_optimization(X_train, y_train,file):
         "metric": ["minkowski", "euclidean", "manhattan"]
     }
     model = KNeighborsClassifier()
-    clf = RandomizedSearchCV(model, param_distributions=param_dist, n_iter=n_iter, cv=cv,
-                             random_state=random_state)
+    clf = search(model, param_dist, file, n_iter=n_iter, cv=cv, random_state=random_state)
     clf.fit(X_train, y_train)
     cv_results = clf.cv_results_
     param_names = list(cv_results['params'][0].keys())
@@ -2,7 +2,7 @@ import pandas as pd
 from django.http import JsonResponse
 
 from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import RandomizedSearchCV
+from ..search import search
 
 def hyperparameter_optimization(X_train, y_train,file):
     n_iter = int(file.get("Number of iterations for hyperparameter search"))
@@ -18,8 +18,7 @@ def hyperparameter_optimization(X_train, y_train,file):
     }
     model = LogisticRegression()
 
-    clf = RandomizedSearchCV(model, param_distributions=param_dist, n_iter=n_iter, cv=cv,
-                             random_state=random_state)
+    clf = search(model, param_dist, file, n_iter=n_iter, cv=cv, random_state=random_state)
     clf.fit(X_train, y_train)
 
     cv_results = clf.cv_results_
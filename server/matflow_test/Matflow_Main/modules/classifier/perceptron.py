@@ -1,8 +1,8 @@
 import pandas as pd
 import streamlit as st
 from django.http import JsonResponse
-from sklearn.model_selection import RandomizedSearchCV
 from sklearn.neural_network import MLPClassifier
+from ..search import search
 
 def hyperparameter_optimization(X_train, y_train,file):
 	n_iter = int(file.get(("Number of iterations for hyperparameter search")))
@@ -19,8 +19,7 @@ def hyperparameter_optimization(X_train, y_train,file):
 		'tol': [0.0001, 0.001, 0.01]
 	}
 	model = MLPClassifier()
-	clf = RandomizedSearchCV(model, param_distributions=param_dist, n_iter=n_iter, cv=cv,
-							 random_state=random_state)
+	clf = search(model, param_dist, file, n_iter=n_iter, cv=cv, random_state=random_state)
 	clf.fit(X_train, y_train)
 	cv_results = clf.cv_results_
 
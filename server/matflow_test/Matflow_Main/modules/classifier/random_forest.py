@@ -4,7 +4,7 @@ import pandas as pd
 import streamlit as st
 from django.http import JsonResponse
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import RandomizedSearchCV
+from ..search import search
 
 
 def hyperparameter_optimization(X_train, y_train,file):
@@ -21,8 +21,7 @@ def hyperparameter_optimization(X_train, y_train,file):
         "random_state": [0]
     }
     model = RandomForestClassifier()
-    clf = RandomizedSearchCV(model, param_distributions=param_dist, n_iter=n_iter, cv=cv,
-                             random_state=random_state)
+    clf = search(model, param_dist, file, n_iter=n_iter, cv=cv, random_state=random_state)
     clf.fit(X_train, y_train)
     cv_results = clf.cv_results_
     param_names = list(cv_results['params'][0].keys())
@@ -1,7 +1,7 @@
 import pandas as pd
 from django.http import JsonResponse
-from sklearn.model_selection import RandomizedSearchCV
 from sklearn.svm import SVC
+from ..search import search
 
 
 def hyperparameter_optimization(X_train, y_train,file):
@@ -17,8 +17,7 @@ def hyperparameter_optimization(X_train, y_train,file):
     }
     model = SVC()
 
-    clf = RandomizedSearchCV(model, param_distributions=param_dist, n_iter=n_iter, cv=cv,
-                             random_state=random_state)
+    clf = search(model, param_dist, file, n_iter=n_iter, cv=cv, random_state=random_state)
     clf.fit(X_train, y_train)
     cv_results = clf.cv_results_
     param_names = list(cv_results['params'][0].keys())
@@ -1,14 +1,18 @@
 import pandas as pd
 from django.http import JsonResponse
 
+from dataset_manager.store import resolve_frame, frame_response, wants_records
+
 def append (file):
     # append_name = file.get('select_dataset_you_wanna_append')
     # file_name = file.get('new_dataset_name')
-    data=pd.DataFrame(file.get("file"))
-    tmp = pd.DataFrame(file.get("file2"))
+    data=resolve_frame(file)
+    tmp = resolve_frame(file, "file2")
 
     temp2 = tmp.append(data)
     temp2 = temp2.reset_index()
 
+    if not wants_records(file):
+        return frame_response(temp2, file)
     new_value =temp2 .to_json(orient="records")
     return JsonResponse(new_value, safe=False)
\ No newline at end of file
@@ -1,12 +1,12 @@
 import pandas as pd
 from django.http import JsonResponse
 
+from dataset_manager.store import resolve_frame, frame_response
 from ...modules import utils
 from ...modules.classes import dtype_changer
 
 def Change_dtype(file):
-	data = file.get("file")
-	data = pd.DataFrame(data)
+	data = resolve_frame(file)
 	variables = utils.get_variables(data)
 	orig_dtypes = utils.get_dtypes(data)
 	n_iter = file.get("number_of_columns")
@@ -34,8 +34,7 @@ def Change_dtype(file):
 	if all(status):
 		chg = dtype_changer.DtypeChanger(change_dict)
 		new_value = chg.fit_transform(data)
-		df = new_value.to_dict(orient="records")
-		return JsonResponse(df, safe=False)
+		return frame_response(new_value, file)
 
 #
 def change_check(data, var, dtype):
@@ -1,13 +1,15 @@
 import pandas as pd
 from django.http import JsonResponse
 
+from dataset_manager.store import resolve_frame, frame_response
+
 
 def change_field_name(file):
     n_iter=int(file.get("number_of_columns"))
     selected = []
     # var=[]
     # var2=[]
-    modified_data=pd.DataFrame(file.get("file"))
+    modified_data=resolve_frame(file)
     temp_file=file.get("data")
     for i in range(n_iter):
         var = temp_file[i].get("column_name")
@@ -15,7 +17,6 @@ def change_field_name(file):
         var2 = temp_file[i].get('new_field_name')
         modified_data = modified_data.rename(columns={var: var2})
 
-    df = modified_data.to_dict(orient="records")
-    return JsonResponse(df, safe=False)
+    return frame_response(modified_data, file)
 
 
@@ -8,8 +8,10 @@ import plotly.graph_objects as go
 from sklearn.decomposition import PCA
 from sklearn.cluster import KMeans
 import matplotlib.pyplot as plt
+
+from dataset_manager.store import resolve_frame, datasets, describe
 def cluster_dataset(file):
-    df = pd.DataFrame( file.get("file"))
+    df = resolve_frame(file).copy()
     cls_ar=file.get('data')
     n_cls = len(cls_ar)
     print(f"n_cls = {n_cls}")
@@ -41,7 +43,7 @@ def cluster_dataset(file):
 
 
 # if display_type == "Table":
-    new_value = df.to_dict(orient="records")
+    new_value = None if file.get("dataset_id") else df.to_dict(orient="records")
     # return JsonResponse(new_value, safe=False)
 # else:
     # st.pyplot(fig)
@@ -70,4 +72,7 @@ def cluster_dataset(file):
         "table" : new_value,
         "graph" : graph_json
     }
+    if file.get("dataset_id"):
+        obj.update(describe(datasets.put(df), df))
+        obj["table"] = obj["preview"]
     return JsonResponse(obj, safe=False)
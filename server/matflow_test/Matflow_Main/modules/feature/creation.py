@@ -2,14 +2,14 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from django.http import JsonResponse
+from dataset_manager.store import resolve_frame, frame_response
 from ...modules import utils
 from ...modules.classes import creator
 
 def creation(file):
 	# variables = utils.get_variables(data)
 	# col1, col2, col3, col4 = st.columns([1.6, 3, 2.4, 2.4])
-	data=file.get("file")
-	data=pd.DataFrame(data)
+	data=resolve_frame(file)
 	add_or_mod =file.get("option")
 	# st.session_state.add=add_or_mod=='Add'
 	method_name = ["New Column","Math Operation", "Extract Text", "Group Categorical", "Group Numerical"]
@@ -44,6 +44,7 @@ def creation(file):
 def add_new(data,var,add_pipeline,file):
 
 	temp = data.copy(deep=True)
+	request=file
 	file=file.get("data")
 	slt_=file.get("select_methods")
 	if slt_=='Input String':
@@ -54,15 +55,13 @@ def add_new(data,var,add_pipeline,file):
 		temp[var]=value
 	else:
 		temp[var]=temp[col_name]
-	df = temp.to_dict(orient="records")
-	return JsonResponse(df, safe=False)
+	return frame_response(temp, request)
 
 def math_operation(data, var, add_pipeline, add_or_mod,file):
 	operation =file.get("data").get("new_value_operation")
 	crt = creator.Creator("Math Operation", var, operation_string=operation)
 	new_value = crt.fit_transform(data)
-	df=new_value.to_dict(orient="records")
-	return JsonResponse(df,safe=False)
+	return frame_response(new_value, file)
 	# col1, col2,c0 = st.columns([2,2,2])
 	# save_as = col1.checkbox('Save as New Dataset', True, key="save_as_new")
 	#
@@ -90,11 +89,11 @@ def extract_text(data,  var, add_pipeline, add_or_mod,file):
 	extract_var =file.get("extract_from")
 	crt = creator.Creator("Extract String", column=var, extract_col=extract_var, regex_pattern=regex)
 	new_value = crt.fit_transform(data)
-	df = new_value.to_dict(orient="records")
-	return JsonResponse(df, safe=False)
+	return frame_response(new_value, file)
 
 def group_categorical(data,  var, add_pipeline, add_or_mod,file):
 	group_dict = {}
+	request=file
 	file=file.get("data")
 	n_groups = file.get("n_groups")
 	group_var = file.get("group_column")
@@ -128,10 +127,10 @@ def group_categorical(data,  var, add_pipeline, add_or_mod,file):
 	# 	col2.write(group_dict)
 	crt = creator.Creator("Group Categorical", column=var, group_col=group_var, group_dict=group_dict)
 	new_value = crt.fit_transform(data)
-	new_value=new_value.to_dict(orient="records")
-	return JsonResponse(new_value,safe=False)
+	return frame_response(new_value, request)
 
 def group_numerical(data,  var, add_pipeline, add_or_mod,file):
+	request=file
 	file=file.get("data")
 	n_groups = file.get("n_groups")
 	group_var =file.get("bin_column")
@@ -157,12 +156,12 @@ def group_numerical(data,  var, add_pipeline, add_or_mod,file):
 
 	new_value[var] = new_value[var].astype(float)
 
-	new_value = new_value.to_dict(orient="records")
-	return JsonResponse(new_value, safe=False)
+	return frame_response(new_value, request)
 
 def replace_values(data,var,add_pipeline,file):
 	temp = data.copy(deep=True)
 	column=var
+	request=file
 	file=file.get("data")
 	new_value_input = file.get("sub_method")
 	if new_value_input!='Fill Null':
@@ -222,8 +221,7 @@ def replace_values(data,var,add_pipeline,file):
 		else:
 			temp[column] = temp[column].apply(options[operation])
 	# new_value=temp
-	new_value = temp.to_dict(orient="records")
-	return JsonResponse(new_value, safe=False)
+	return frame_response(temp, request)
 
 
 
@@ -256,6 +254,7 @@ def my_progress_apply(data, var,addpipe,file):
 	temp = data.copy(deep=True)
 	fun = ['Compute All Features using RDKit', 'Chem.inchi.MolToInchiKey']
 	var=file.get("select_column")
+	request=file
 	file = file.get("data")
 	selected_fun = file.get('select_function')
 
@@ -271,5 +270,7 @@ def my_progress_apply(data, var,addpipe,file):
 			## 	problem is this is a list
 		new_value=temp[var].progress_apply(lambda x: Chem.inchi.MolToInchiKey(Chem.MolFromSmiles(x))).to_list()
 
+	if isinstance(new_value, pd.DataFrame):
+		return frame_response(new_value, request)
 	new_value = new_value.to_dict(orient="records")
 	return JsonResponse(new_value, safe=False)
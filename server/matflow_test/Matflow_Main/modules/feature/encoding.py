@@ -3,25 +3,26 @@ import streamlit as st
 import numpy as np
 from django.http import JsonResponse
 
+from dataset_manager.store import resolve_frame, frame_response
 from ...modules import utils
 from ...modules.classes import encoder
 
 def encoding(file):
-    data=file.get("file")
-    data=pd.DataFrame(data)
+    data = resolve_frame(file)
     var = file.get("select_column")
     method = file.get("method")
     add_pipeline = file.get("add_to_pipeline")
+    request=file
     file=file.get('data')
     if method == "Ordinal Encoding":
-        return ordinal_encoding(data, var, add_pipeline,file)
+        return ordinal_encoding(data, var, add_pipeline,file,request)
     elif method == "One-Hot Encoding":
-        return onehot_encoding(data, var, add_pipeline,file)
+        return onehot_encoding(data, var, add_pipeline,file,request)
     elif method == "Target Encoding":
-        return target_encoding(data, var, add_pipeline,file)
+        return target_encoding(data, var, add_pipeline,file,request)
 
 
-def ordinal_encoding(data, var, add_pipeline,file):
+def ordinal_encoding(data, var, add_pipeline,file,request):
     from_zero = file.get("start_from_0") ==True
     inc_nan = file.get("include_nan") ==True
     asc_order = file.get("sort_values")  ==True
@@ -39,28 +40,25 @@ def ordinal_encoding(data, var, add_pipeline,file):
     if len(ordinal_enc_dict) == len(unique_val):
         enc = encoder.Encoder(strategy="ordinal", column=var, ordinal_dict=ordinal_enc_dict)
         new_value = enc.fit_transform(data)
-        new_value = new_value.to_dict(orient="records")
-        return JsonResponse(new_value, safe=False)
+        return frame_response(new_value, request)
     else:
         #return error
         return JsonResponse("")
 
 
 
-def onehot_encoding(data, var, add_pipeline,file):
+def onehot_encoding(data, var, add_pipeline,file,request):
     print(data)
     print(var)
     drop_first = file.get("drop_first")
 
     enc = encoder.Encoder(strategy="onehot", column=var)
     new_value = enc.fit_transform(data)
-    new_value = new_value.to_dict(orient="records")
-    return JsonResponse(new_value, safe=False)
+    return frame_response(new_value, request)
 
 
-def target_encoding(data,  var, add_pipeline,file):
+def target_encoding(data,  var, add_pipeline,file,request):
     target_var = file.get("select_target")
     enc = encoder.Encoder(strategy="target", column=var, target_var=target_var)
     new_value = enc.fit_transform(data)
-    new_value = new_value.to_dict(orient="records")
-    return JsonResponse(new_value, safe=False)
+    return frame_response(new_value, request)
@@ -1,10 +1,10 @@
 import pandas as pd
 from django.http import JsonResponse
+from dataset_manager.store import resolve_frame, frame_response
 from ...modules.classes import scaler
 
 def scaling(file):
-	data=file.get("file")
-	data=pd.DataFrame(data)
+	data=resolve_frame(file)
 	variables = data.columns.to_list()
 	col_options = file.get("options")
 	method =file.get("method")
@@ -15,5 +15,4 @@ def scaling(file):
 		columns = [var for var in variables if var not in columns]
 	sc = scaler.Scaler(method, columns)
 	new_value = sc.fit_transform(data)
-	new_value = new_value.to_dict(orient="records")
-	return JsonResponse(new_value, safe=False)
+	return frame_response(new_value, file)
@@ -1,18 +1,17 @@
-import base64
-
 import pandas as pd
 from django.http import JsonResponse
 from ...modules.utils import split_xy
+from dataset_manager.store import resolve_frame
+from matflow_test.evaluation import evaluate
+from matflow_test.registry import register
 from ...modules.classifier import knn, svm, log_reg, decision_tree, random_forest, perceptron
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 import json
-import pickle
 import numpy as np
 def classification(file):
     print(file.keys())
-    data = pd.DataFrame(file.get("file"))
-    train_data = pd.DataFrame(file.get("train"))
-    test_data = pd.DataFrame(file.get("test"))
+    data = resolve_frame(file)
+    train_data = resolve_frame(file, "train")
+    test_data = resolve_frame(file, "test")
     target_var = file.get("target_var")
     X_train, y_train = split_xy(train_data, target_var)
     X_test, y_test = split_xy(test_data, target_var)
@@ -45,17 +44,12 @@ def classification(file):
 
     model.fit(X_train, y_train)
     X, y = split_xy(data, target_var)
-    y_prediction=model.predict(X)
-    metrics = ["Accuracy", "Precision", "Recall", "F1-Score"]
-    selected_metrics = get_result(model, X_test, y_test,metrics, multi_average)
-
-
-    i=0
-    for X, y in zip([X_train, X_test], [y_train, y_test]):
-        list2 = get_result(model, X, y, metrics, multi_average)
-        if(i==0):
-            list1=get_result(model, X, y, metrics, multi_average)
-        i+=1
+    # One predict (and predict_proba) per split, every metric comes from these
+    evaluation = evaluate(model, {"train": (X_train, y_train), "test": (X_test, y_test), "data": (X, y)})
+    y_prediction = evaluation["data"].y_pred
+    list1 = evaluation["train"].classification_metrics(multi_average)
+    list2 = evaluation["test"].classification_metrics(multi_average)
+    selected_metrics = list2
 
     merged_list = {
         f"Train {key}": value
@@ -67,22 +61,11 @@ def classification(file):
         for key, value in list2.items()
     })
     y_prediction=json.dumps(y_prediction.tolist())
-    model= pickle.dumps(model)
-    model = base64.b64encode(model).decode('utf-8')
     obj={
         "metrics": selected_metrics,   #4
         "metrics_table":merged_list,     #8
         "y_pred" : y_prediction,
-        "model_deploy": model
     }
+    # model_id, plus the pickled model for clients that ask for it with inline_model
+    obj.update(register(model, file, "classifier", X_train, merged_list, evaluation))
     return JsonResponse(obj)
-
-def get_result(model, X, y, metrics,multi_average,pos_label=None):
-    y_pred = model.predict(X)
-    metric_dict = {}
-    metric_dict["Accuracy"] = accuracy_score(y, y_pred)
-    metric_dict["Precision"] = precision_score(y, y_pred, average=multi_average)
-    metric_dict["Recall"] = recall_score(y, y_pred, average=multi_average)
-    metric_dict["F1-Score"] = f1_score(y, y_pred, average=multi_average)
-    return metric_dict
-
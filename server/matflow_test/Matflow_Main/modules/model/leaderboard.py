@@ -0,0 +1,256 @@
+import math
+import multiprocessing
+import os
+import tempfile
+import time
+from multiprocessing.connection import wait
+
+import pandas as pd
+import pyarrow.feather as feather
+from django.conf import settings
+from django.http import JsonResponse
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.linear_model import Lasso, LinearRegression, LogisticRegression, Ridge
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.neural_network import MLPClassifier
+from sklearn.svm import SVC, SVR
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+from sklearn.utils.multiclass import type_of_target
+from threadpoolctl import threadpool_limits
+
+from dataset_manager.store import resolve_frame
+from jobs.events import report_progress
+from matflow_test.evaluation import evaluate
+from matflow_test.registry import register
+from ...modules.utils import split_xy
+
+# Seconds a model may take to fit and evaluate before it is stopped
+LEADERBOARD_TIMEOUT = getattr(settings, 'LEADERBOARD_TIMEOUT', 600)
+# Numeric targets with at most this many distinct values are taken as class labels when 'type' is missing
+LEADERBOARD_MAX_CLASSES = getattr(settings, 'LEADERBOARD_MAX_CLASSES', 20)
+
+# The estimators of modules/classifier and modules/regressor, with their defaults
+CLASSIFIERS = {
+    "K-Nearest Neighbors": KNeighborsClassifier,
+    "Support Vector Machine": SVC,
+    "Logistic Regression": LogisticRegression,
+    "Decision Tree Classification": DecisionTreeClassifier,
+    "Random Forest Classification": RandomForestClassifier,
+    "Multilayer Perceptron": MLPClassifier,
+}
+REGRESSORS = {
+    "Linear Regression": LinearRegression,
+    "Ridge Regression": Ridge,
+    "Lasso Regression": Lasso,
+    "Decision Tree Regression": DecisionTreeRegressor,
+    "Random Forest Regression": RandomForestRegressor,
+    "Support Vector Regressor": SVR,
+}
+CLASSIFICATION_METRICS = ["Accuracy", "Precision", "Recall", "F1-Score"]
+REGRESSION_METRICS = ["R-Squared", "Mean Absolute Error", "Mean Squared Error", "Root Mean Squared Error"]
+
+
+def share_splits(splits, directory):
+    """
+    Write every (X, y) split to uncompressed Feather files in `directory`
+    for the workers to memory-map, rather than pickling the data to each of
+    them. Returns {name: (X path, y path, y name)}, or the splits unchanged
+    when they can't be stored as Arrow.
+    """
+    shared = {}
+    try:
+        for name, (X, y) in splits.items():
+            X_path = os.path.join(directory, f"{name}-X.feather")
+            y_path = os.path.join(directory, f"{name}-y.feather")
+            feather.write_feather(X.reset_index(drop=True), X_path, compression='uncompressed')
+            feather.write_feather(y.reset_index(drop=True).to_frame('y'), y_path, compression='uncompressed')
+            shared[name] = (X_path, y_path, y.name)
+    except Exception:
+        # Mixed-type object columns or non-string column names, send the frames instead
+        return splits
+    return shared
+
+
+def load_splits(splits):
+    loaded = {}
+    for name, split in splits.items():
+        if len(split) == 3:
+            X_path, y_path, y_name = split
+            X = feather.read_table(X_path, memory_map=True).to_pandas()
+            y = feather.read_table(y_path, memory_map=True).to_pandas()['y'].rename(y_name)
+            split = (X, y)
+        loaded[name] = split
+    return loaded
+
+
+def fit_candidate(conn, estimator, splits, n_threads):
+    """
+    Worker process entry point: fit on the train split with at most
+    `n_threads` threads, evaluate on every split and send the results back.
+    """
+    try:
+        splits = load_splits(splits)
+        with threadpool_limits(limits=n_threads):
+            if 'n_jobs' in estimator.get_params():
+                estimator.set_params(n_jobs=n_threads)
+            start = time.time()
+            estimator.fit(*splits["train"])
+            fit_time = time.time() - start
+            conn.send(("done", estimator, evaluate(estimator, splits), fit_time))
+    except Exception as e:
+        conn.send(("failed", str(e), None, None))
+    finally:
+        conn.close()
+
+
+def fit_all(candidates, splits, n_jobs=-1, timeout=LEADERBOARD_TIMEOUT):
+    """
+    Fit and evaluate every (name, estimator) of `candidates` in a process of
+    its own, as many at a time as there are CPUs in `n_jobs`, each limited to
+    an equal share of them. Processes start from a fresh interpreter (with
+    forkserver where the platform has it), as forking the threaded server
+    would copy its locks, database connections and caches; they all
+    memory-map the same Feather copy of the split. A model still running
+    after `timeout` seconds is terminated.
+
+    Returns {name: (status, model or error, evaluation, fit_time)} with a
+    status of 'done', 'failed' or 'timeout'.
+    """
+    cpus = os.cpu_count() or 1
+    n_jobs = cpus if n_jobs is None or n_jobs <= 0 else min(n_jobs, cpus)
+    concurrent = max(min(len(candidates), n_jobs), 1)
+    share = max(n_jobs // concurrent, 1)
+    context = multiprocessing.get_context(
+        'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+    with tempfile.TemporaryDirectory() as directory:
+        return run_all(context, candidates, share_splits(splits, directory), concurrent, share, timeout)
+
+
+def run_all(context, candidates, splits, concurrent, share, timeout):
+    pending = list(candidates)
+    running = {}
+    results = {}
+    while pending or running:
+        while pending and len(running) < concurrent:
+            name, estimator = pending.pop(0)
+            reader, writer = context.Pipe(duplex=False)
+            process = context.Process(target=fit_candidate, args=(writer, estimator, splits, share), daemon=True)
+            process.start()
+            writer.close()
+            running[reader] = (name, process, time.time() + timeout if timeout else math.inf)
+
+        next_deadline = min(deadline for _, _, deadline in running.values())
+        wait_time = None if next_deadline == math.inf else max(next_deadline - time.time(), 0)
+        for reader in wait(list(running), timeout=wait_time):
+            name, process, _ = running.pop(reader)
+            try:
+                results[name] = reader.recv()
+            except EOFError:
+                process.join()
+                results[name] = ("failed", f"Worker exited with code {process.exitcode}", None, None)
+            process.join()
+            reader.close()
+
+        now = time.time()
+        for reader, (name, process, deadline) in list(running.items()):
+            if now >= deadline:
+                process.terminate()
+                process.join()
+                reader.close()
+                del running[reader]
+                results[name] = ("timeout", f"Stopped after {timeout} seconds", None, None)
+        report_progress('leaderboard', done=len(results), total=len(candidates))
+    return results
+
+
+def lower_is_better(metric):
+    return "Error" in metric
+
+
+def infer_model_type(y):
+    """
+    'classifier' for class labels, like sklearn's type_of_target, and for
+    integer targets with few distinct values; 'regressor' otherwise.
+    """
+    target = type_of_target(y.dropna())
+    if target == "continuous":
+        return "regressor"
+    if target == "multiclass" and pd.api.types.is_numeric_dtype(y) and y.nunique() > LEADERBOARD_MAX_CLASSES:
+        return "regressor"  # Counts, years and the like
+    return "classifier"
+
+
+def leaderboard(file):
+    """
+    Train every supported classifier or regressor (or the ones listed in
+    'models') on the same split, rank them by the test 'metric' and register
+    each fitted model.
+    """
+    train_data = resolve_frame(file, "train")
+    test_data = resolve_frame(file, "test")
+    target_var = file.get("target_var")
+    X_train, y_train = split_xy(train_data, target_var)
+    X_test, y_test = split_xy(test_data, target_var)
+
+    model_type = file.get("type")
+    if model_type not in ("classifier", "regressor"):
+        model_type = infer_model_type(y_train)
+    catalogue = CLASSIFIERS if model_type == "classifier" else REGRESSORS
+    names = file.get("models") or list(catalogue)
+    unknown = [name for name in names if name not in catalogue]
+    if unknown:
+        return JsonResponse({"error": f"Unknown {model_type}s: {', '.join(unknown)}."}, status=400)
+
+    if model_type == "classifier":
+        metric = file.get("metric", "Accuracy")
+        average = file.get("Multiclass Average", "macro") if y_train.nunique() > 2 else "binary"
+    else:
+        metric = file.get("metric", "R-Squared")
+    choices = CLASSIFICATION_METRICS if model_type == "classifier" else REGRESSION_METRICS
+    if metric not in choices:
+        return JsonResponse({"error": f"Unknown metric '{metric}', use one of {', '.join(choices)}."}, status=400)
+
+    candidates = []
+    for name in names:
+        estimator = catalogue[name]()
+        if file.get("random_state") is not None and 'random_state' in estimator.get_params():
+            estimator.set_params(random_state=int(file.get("random_state")))
+        candidates.append((name, estimator))
+
+    timeout = file.get("timeout", LEADERBOARD_TIMEOUT)
+    results = fit_all(candidates, {"train": (X_train, y_train), "test": (X_test, y_test)},
+                      n_jobs=int(file.get("n_jobs", -1)), timeout=float(timeout) if timeout else None)
+
+    rows = []
+    for name in names:
+        status, model, evaluation, fit_time = results[name]
+        row = {"model": name, "status": status, "fit_time": fit_time}
+        if status != "done":
+            row["error"] = model
+            rows.append(row)
+            continue
+        if model_type == "classifier":
+            train_metrics = evaluation["train"].classification_metrics(average)
+            test_metrics = evaluation["test"].classification_metrics(average)
+        else:
+            train_metrics = evaluation["train"].regression_metrics()
+            test_metrics = evaluation["test"].regression_metrics()
+        metrics_table = {f"Train {key}": value for key, value in train_metrics.items()}
+        metrics_table.update({f"Test {key}": value for key, value in test_metrics.items()})
+        model_name = f"{file.get('model_name')} - {name}" if file.get("model_name") else name
+        # Models stay in the registry, the client fetches the ones it keeps by model_id
+        model_file = dict(file, model_name=model_name, **{model_type: name})
+        row.update(score=test_metrics[metric], metrics=test_metrics, metrics_table=metrics_table)
+        row.update(register(model, model_file, model_type, X_train, metrics_table, evaluation))
+        rows.append(row)
+
+    def rank_key(row):
+        score = row.get("score")
+        if score is None or math.isnan(score):
+            return math.inf
+        return score if lower_is_better(metric) else -score
+
+    rows.sort(key=rank_key)
+    for rank, row in enumerate(rows, 1):
+        row["rank"] = rank if row["status"] == "done" else None
+    return JsonResponse({"type": model_type, "metric": metric, "leaderboard": rows})
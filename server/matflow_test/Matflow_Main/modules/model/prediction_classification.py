@@ -1,17 +1,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LogisticRegression
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.neural_network import MLPClassifier
-from sklearn.preprocessing import LabelEncoder,label_binarize
-from sklearn.multiclass import OneVsRestClassifier
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.svm import SVC
-from sklearn.tree import DecisionTreeClassifier
+from sklearn.preprocessing import LabelEncoder
 from ...modules import utils
-from sklearn.model_selection import train_test_split
+from dataset_manager.store import resolve_frame
+from matflow_test.curves import class_scores, ovr_curves
+from matflow_test.registry import cached_split, predictions
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, classification_report,confusion_matrix, roc_curve, precision_recall_curve, auc, average_precision_score
 import io
 import seaborn as sns
@@ -27,10 +21,15 @@ def prediction_classification(file):
     # data_opt = file.get("Select Data")
     target_var = file.get("Target Variable")
     model_opt=file.get("regressor")
-    data = pd.DataFrame(file.get("file"))
-    y_pred = file.get("y_pred")
+    data = resolve_frame(file)
     X, y = utils.split_xy(data, target_var)
+    split = cached_split(file, X)
+    y_pred = predictions(file, X, split)
     result_opt = file.get("Result")
+    if result_opt in ["ROC Curve", "Precision-Recall Curve"]:
+        # Probabilities of the trained model, cached for its test split
+        scores, classes = class_scores(file, X, y, y_pred, split)
+        return show_curve(y, scores, classes, result_opt)
     if y.nunique() > 2:
         # multiclass case (denied)
         # show_multiclass(y,y_pred)
@@ -109,114 +108,38 @@ def show_result(y, y_pred, result_opt, multi_average,X,model_name):
         response_data = {'graph': fig_json}
         return JsonResponse(response_data)
 
-    elif result_opt == "Precision-Recall Curve":
-        if y.nunique() > 2:
-            return JsonResponse({'error': 'Precision-Recall curve is not supported for multiclass classification'})
-        else:
-            # Encode y and y_pred
-            y_encoded = le.fit_transform(y)
-            y_pred_encoded = le.transform(y_pred)
-
-            precision, recall, _ = precision_recall_curve(y_encoded.ravel(), y_pred_encoded.ravel())
-
-            fig = go.Figure(data=go.Scatter(x=recall, y=precision, mode='lines'))
-
-            fig.update_layout(
-                title='Precision-Recall Curve',
-                xaxis=dict(title='Recall'),
-                yaxis=dict(title='Precision')
-            )
-
-            fig_json = pio.to_json(fig)
-            response_data = {'graph': fig_json}
-            return JsonResponse(response_data)
 
-    elif result_opt == "ROC Curve":
-        if y.nunique() > 2:
-            label_encoder = LabelEncoder()
-            label_encoder.fit(y)
-            y = label_encoder.transform(y)
-            classes = label_encoder.classes_
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
-            min_max_scaler = MinMaxScaler()
-            X_train_norm = min_max_scaler.fit_transform(X_train)
-            X_test_norm = min_max_scaler.fit_transform(X_test)
-            if model_name == "Random Forest Classification":
-                RF = OneVsRestClassifier(RandomForestClassifier(max_features=0.2))
-                RF.fit(X_train_norm, y_train)
-
-                y_pred = RF.predict(X_test_norm)
+def show_curve(y, scores, classes, result_opt):
+    """
+    ROC or precision-recall curves from the model's scores: the positive
+    class for binary targets, one vs rest for every class otherwise.
+    """
+    curves = ovr_curves(y, scores, classes)
+    if len(classes) == 2:
+        curves = curves[1:]
+    roc = result_opt == "ROC Curve"
+    fig = go.Figure()
+    for curve in curves:
+        if roc:
+            x, y_, name = curve['fpr'], curve['tpr'], '%s vs Rest (AUC=%0.2f)' % (curve['label'], curve['auc'])
+        else:
+            x, y_, name = curve['recall'], curve['precision'], '%s vs Rest (AP=%0.2f)' % (curve['label'], curve['average_precision'])
+        fig.add_trace(go.Scatter(x=x, y=y_, mode='lines', name=name))
+    if roc:
+        fig.add_shape(type='line', line=dict(dash='dash'), x0=0, y0=0, x1=1, y1=1)
+    fig.update_layout(
+        title=('ROC Curve' if roc else 'Precision-Recall Curve') if len(classes) == 2
+        else ('Multiclass ROC curve' if roc else 'Multiclass Precision-Recall curve'),
+        xaxis=dict(title='False Positive Rate' if roc else 'Recall'),
+        yaxis=dict(title='True Positive Rate' if roc else 'Precision')
+    )
+    # Convert fig to JSON-compatible format
+    fig_json = pio.to_json(fig)
+    # Create a JSON response with the fig_json
+    response_data = {'graph': fig_json}
+    return JsonResponse(response_data)
 
-                pred_prob = RF.predict_proba(X_test_norm)
 
-            elif model_name == "Multilayer Perceptron":
-                mlp = MLPClassifier(hidden_layer_sizes=(100, 50))
-                mlp.fit(X_train_norm, y_train)
-                y_pred = mlp.predict(X_test_norm)
-                pred_prob = mlp.predict_proba(X_test_norm)
-            elif model_name == "K-Nearest Neighbors":
-                k = 5
-                knn = KNeighborsClassifier(n_neighbors=k)
-                knn.fit(X_train_norm, y_train)
-                y_pred = knn.predict(X_test_norm)
-                pred_prob = knn.predict_proba(X_test_norm)
-            elif model_name == "Support Vector Machine":
-                svm = OneVsRestClassifier(SVC(kernel='linear', probability=True))
-                svm.fit(X_train_norm, y_train)
-                y_pred = svm.predict(X_test_norm)
-                pred_prob = svm.predict_proba(X_test_norm)
-            elif model_name == "Logistic Regression":
-                lr = OneVsRestClassifier(LogisticRegression(solver='lbfgs'))
-                lr.fit(X_train_norm, y_train)
-                y_pred = lr.predict(X_test_norm)
-                pred_prob = lr.predict_proba(X_test_norm)
-            elif model_name == "Decision Tree Classification":
-                dt = OneVsRestClassifier(DecisionTreeClassifier())
-                dt.fit(X_train_norm, y_train)
-                y_pred = dt.predict(X_test_norm)
-                pred_prob = dt.predict_proba(X_test_norm)
-            else:
-               raise ValueError("Invalid model name specified.")
-            y_test_binarized = label_binarize(y_test, classes=np.unique(y_test))
-            fpr = {}
-            tpr = {}
-            roc_auc = dict()
-            n_class = classes.shape[0]
-            for i in range(n_class):
-                fpr[i], tpr[i], _ = roc_curve(y_test_binarized[:, i], pred_prob[:, i])
-                roc_auc[i] = auc(fpr[i], tpr[i])
-            fig = go.Figure()
-            for i in range(n_class):
-                fig.add_trace(
-                    go.Scatter(x=fpr[i], y=tpr[i], mode='lines', name='%s vs Rest (AUC=%0.2f)' % (classes[i], roc_auc[i])))
-            fig.add_shape(
-                type='line', line=dict(dash='dash'), x0=0, y0=0, x1=1, y1=1
-            )
-            fig.update_layout(
-                title='Multiclass ROC curve',
-                xaxis=dict(title='False Positive Rate'),
-                yaxis=dict(title='True Positive Rate')
-            )
-            # Convert fig to JSON-compatible format
-            fig_json = pio.to_json(fig)
-            # Create a JSON response with the fig_json
-            response_data = {'graph': fig_json}
-            return JsonResponse(response_data)
-        else:
-            y_encoded = le.fit_transform(y)
-            y_pred_encoded = le.transform(y_pred)
-            fpr, tpr, _ = roc_curve(y_encoded.ravel(), y_pred_encoded.ravel())
-            fig = go.Figure(data=go.Scatter(x=fpr, y=tpr, mode='lines'))
-            fig.update_layout(
-                title='ROC Curve',
-                xaxis=dict(title='False Positive Rate'),
-                yaxis=dict(title='True Positive Rate')
-            )
-            # Convert fig to JSON-compatible format
-            fig_json = pio.to_json(fig)
-            # Create a JSON response with the fig_json
-            response_data = {'graph': fig_json}
-            return JsonResponse(response_data)
 def actvspred(y, y_pred, graph_header):
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=list(range(len(y))), y=y, mode='lines', name='Actual', line=dict(color='blue')))
@@ -6,13 +6,15 @@ from django.http import JsonResponse
 import plotly.graph_objects as go
 import plotly.io as pio
 from ...modules import utils
+from dataset_manager.store import resolve_frame
+from matflow_test.registry import predictions
 from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
 
 def prediction_regression(file):
     target_var = file.get( "Target Variable")
-    data = pd.DataFrame(file.get("file"))
+    data = resolve_frame(file)
     X, y = utils.split_xy(data, target_var)
-    y_pred = file.get("y_pred")
+    y_pred = predictions(file, X)
     result_opt = file.get("Result")
     return show_result(y, y_pred, result_opt)
 
@@ -1,19 +1,19 @@
-import base64
 import json
-import pickle
 
 import pandas as pd
 from django.http import JsonResponse
 from ..regressor import svr
 from ...modules.utils import split_xy
+from dataset_manager.store import resolve_frame
+from matflow_test.evaluation import evaluate
+from matflow_test.registry import register
 from ...modules.regressor import linear_regression, ridge_regression, lasso_regression, decision_tree_regression, random_forest_regression
-from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 
 
 def regression(file):
-    dataset=pd.DataFrame(file.get("file"))
-    train_data = pd.DataFrame(file.get("train"))
-    test_data = pd.DataFrame(file.get("test"))
+    dataset=resolve_frame(file)
+    train_data = resolve_frame(file, "train")
+    test_data = resolve_frame(file, "test")
     target_var = file.get("target_var")
     X_train, y_train = split_xy(train_data, target_var)
     X_test, y_test = split_xy(test_data, target_var)
@@ -47,15 +47,12 @@ def regression(file):
         model=svr.support_vector_regressor(X_train, y_train,file)
     model.fit(X_train, y_train)
     X, y = split_xy(dataset, target_var)
-    y_prediction = model.predict(X)
-
-    selected_metrics = get_result(model, X_test, y_test, metrics)
-    i = 0
-    for X, y in zip([X_train, X_test], [y_train, y_test]):
-        list2 = get_result(model, X, y, metrics)
-        if (i == 0):
-            list1 = get_result(model, X, y, metrics)
-            i += 1
+    # One predict per split, every metric comes from these
+    evaluation = evaluate(model, {"train": (X_train, y_train), "test": (X_test, y_test), "data": (X, y)})
+    y_prediction = evaluation["data"].y_pred
+    list1 = evaluation["train"].regression_metrics()
+    list2 = evaluation["test"].regression_metrics()
+    selected_metrics = list2
     merged_list = {
         f"Train {key}": value
         for key, value in list1.items()
@@ -66,23 +63,11 @@ def regression(file):
         for key, value in list2.items()
     })
     y_prediction=json.dumps(y_prediction.tolist())
-    model= pickle.dumps(model)
-    model = base64.b64encode(model).decode('utf-8')
     obj={
         "metrics": selected_metrics,   #4
         "metrics_table":merged_list,     #8
         "y_pred" : y_prediction,
-        "model_deploy": model
     }
+    # model_id, plus the pickled model for clients that ask for it with inline_model
+    obj.update(register(model, file, "regressor", X_train, merged_list, evaluation))
     return JsonResponse(obj)
-
-def get_result(model, X, y, metrics):
-    y_pred = model.predict(X)
-    metric_dict = {
-        "R-Squared": r2_score(y, y_pred),
-        "Mean Absolute Error": mean_absolute_error(y, y_pred),
-        "Mean Squared Error": mean_squared_error(y, y_pred),
-        "Root Mean Squared Error": mean_squared_error(y, y_pred, squared=False)
-    }
-    result=metric_dict
-    return result
@@ -2,8 +2,10 @@ import pandas as pd
 from django.http import JsonResponse
 from sklearn.model_selection import train_test_split
 
+from dataset_manager.store import resolve_frame, datasets, describe
+
 def split_dataset(file):
-    data = pd.DataFrame (file.get("file"))
+    data = resolve_frame(file)
     target_var = file.get("target_variable")
     stratify = file.get("stratify")
     test_size = float(file.get("test_size"))
@@ -17,6 +19,12 @@ def split_dataset(file):
     y = data[target_var]
     X_train, X_test = train_test_split(X, test_size=test_size,random_state=random_state)
 
+    if file.get("dataset_id"):
+        obj={
+            "train": describe(datasets.put(X_train), X_train),
+            "test": describe(datasets.put(X_test), X_test)
+        }
+        return JsonResponse(obj, safe=False)
     X_train=X_train.to_dict(orient="records")
     X_test = X_test.to_dict(orient="records")
     obj={
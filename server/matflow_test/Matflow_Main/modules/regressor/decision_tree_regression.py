@@ -3,8 +3,8 @@ import time
 import pandas as pd
 import streamlit as st
 from django.http import JsonResponse
-from sklearn.model_selection import RandomizedSearchCV
 from sklearn.tree import DecisionTreeRegressor
+from ..search import search
 def hyperparameter_optimization(X_train, y_train,file):
     n_iter = int(file.get("Number of iterations for hyperparameter search"))
     cv = int(file.get("Number of cross-validation folds"))
@@ -20,8 +20,7 @@ def hyperparameter_optimization(X_train, y_train,file):
     }
     model = DecisionTreeRegressor()
 
-    clf = RandomizedSearchCV(model, param_distributions=param_dist, n_iter=n_iter, cv=cv,
-                             random_state=random_state)
+    clf = search(model, param_dist, file, n_iter=n_iter, cv=cv, random_state=random_state)
     clf.fit(X_train, y_train)
 
     best_params = clf.best_params_
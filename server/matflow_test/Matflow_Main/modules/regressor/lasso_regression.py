@@ -3,7 +3,7 @@ from django.http import JsonResponse
 from sklearn.linear_model import Lasso
 import pandas as pd
 import time
-from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
+from ..search import search
 
 
 def hyperparameter_optimization(X_train, y_train,file):
@@ -21,8 +21,7 @@ def hyperparameter_optimization(X_train, y_train,file):
     }
     model = Lasso()
 
-    clf = RandomizedSearchCV(model, param_distributions=param_dist, n_iter=n_iter, cv=cv,
-                             random_state=random_state)
+    clf = search(model, param_dist, file, n_iter=n_iter, cv=cv, random_state=random_state)
     clf.fit(X_train, y_train)
     best_params = clf.best_params_
 
@@ -4,7 +4,7 @@ import pandas as pd
 import streamlit as st
 from django.http import JsonResponse
 from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import GridSearchCV
+from ..search import search
 
 
 def hyperparameter_optimization(X_train, y_train,file):
@@ -14,7 +14,7 @@ def hyperparameter_optimization(X_train, y_train,file):
         "fit_intercept": [True, False],
     }
     model = LinearRegression()
-    clf = GridSearchCV(model, param_grid=param_grid, cv=cv, n_jobs=-1)
+    clf = search(model, param_grid, file, cv=cv, grid=True)
     clf.fit(X_train, y_train)
     best_params = clf.best_params_
     rows = []
@@ -4,7 +4,7 @@ import pandas as pd
 import streamlit as st
 from django.http import JsonResponse
 from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import RandomizedSearchCV
+from ..search import search
 
 def hyperparameter_optimization(X_train, y_train,file):
     n_iter = int(file.get("Number of iterations for hyperparameter search"))
@@ -20,8 +20,7 @@ def hyperparameter_optimization(X_train, y_train,file):
         "n_jobs": [-1],
     }
     model = RandomForestRegressor(random_state=0)
-    clf = RandomizedSearchCV(model, param_distributions=param_dist, n_iter=n_iter, cv=cv,
-                             random_state=random_state)
+    clf = search(model, param_dist, file, n_iter=n_iter, cv=cv, random_state=random_state)
     clf.fit(X_train, y_train)
     best_params = clf.best_params_
     rows = []
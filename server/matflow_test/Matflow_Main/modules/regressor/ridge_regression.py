@@ -1,9 +1,9 @@
 import streamlit as st
 from django.http import JsonResponse
 from sklearn.linear_model import Ridge
-from sklearn.model_selection import RandomizedSearchCV
 import time
 import pandas as pd
+from ..search import search
 
 def hyperparameter_optimization(X_train, y_train,file):
     n_iter = int(file.get("Number of iterations for hyperparameter search"))
@@ -18,8 +18,7 @@ def hyperparameter_optimization(X_train, y_train,file):
             "random_state": [0]
         }
     model = Ridge()
-    clf = RandomizedSearchCV(model, param_distributions=param_dist, n_iter=n_iter, cv=cv,
-                                     random_state=random_state)
+    clf = search(model, param_dist, file, n_iter=n_iter, cv=cv, random_state=random_state)
     clf.fit(X_train, y_train)
     best_params = clf.best_params_
     rows = []
@@ -4,7 +4,7 @@ import pandas as pd
 import streamlit as st
 from django.http import JsonResponse
 from sklearn.svm import SVR
-from sklearn.model_selection import RandomizedSearchCV
+from ..search import search
 
 
 def hyperparameter_optimization(X_train, y_train,file):
@@ -18,7 +18,7 @@ def hyperparameter_optimization(X_train, y_train,file):
         "epsilon": [0.1, 0.01, 0.001],
     }
     model = SVR()
-    clf = RandomizedSearchCV(model, param_distributions=param_dist, n_jobs=-1, cv=cv)
+    clf = search(model, param_dist, file, cv=cv)
     clf.fit(X_train, y_train)
     best_params = clf.best_params_
     rows = []
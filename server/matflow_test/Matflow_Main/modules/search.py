@@ -0,0 +1,242 @@
+import math
+import time
+
+import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.base import clone, is_classifier
+from sklearn.model_selection import ParameterGrid, ParameterSampler, check_cv
+
+from jobs.events import report_progress
+from .study import TPE_STARTUP, open_study, params_key, tpe_sample
+
+STRATEGIES = ("random", "halving", "hyperband")
+
+
+def fit_and_score(estimator, params, X, y, train, test, single_thread):
+    try:
+        model = clone(estimator).set_params(**params)
+        if single_thread and 'n_jobs' in model.get_params():
+            # The search already uses every core
+            model.set_params(n_jobs=1)
+        model.fit(X.iloc[train], y.iloc[train])
+        return model.score(X.iloc[test], y.iloc[test])
+    except Exception:
+        return np.nan  # Invalid combination, e.g. a penalty the solver doesn't support
+
+
+class BudgetedSearch:
+    """
+    Parallel, resumable hyperparameter search with successive halving and a
+    time budget.
+
+    Every (candidate, fold) fit runs on a joblib process pool of `n_jobs`
+    workers. 'halving' evaluates many candidates on a small resource (rows of
+    the training data, or trees for ensembles whose space has n_estimators)
+    and keeps the best 1/`factor` for a `factor` times larger resource until
+    the full one. 'hyperband' runs several such brackets starting from
+    different resources. 'random' scores `n_iter` candidates on the full data.
+    With `time_budget` (seconds) no new fits start once it is spent, and the
+    result covers every candidate scored so far; the first candidate is
+    always scored on all folds, however small the budget.
+
+    Every score is recorded in the Study of this data, target, estimator and
+    space, so configurations evaluated by earlier requests are not fit
+    again: a random search with two more iterations fits two candidates, and
+    an interrupted search picks up where it stopped. Once enough trials
+    exist, new candidates come from a TPE sampler fit on them.
+    """
+
+    def __init__(self, estimator, param_dist, n_iter=10, cv=5, random_state=None, strategy="random",
+                 n_jobs=-1, time_budget=None, factor=3, grid=False, sampler="tpe", reuse=True):
+        self.estimator = estimator
+        self.space = dict(param_dist)
+        self.param_dist = dict(param_dist)
+        self.n_iter = n_iter
+        self.cv = cv
+        self.random_state = random_state
+        self.strategy = strategy
+        self.n_jobs = n_jobs
+        self.time_budget = time_budget
+        self.factor = factor
+        self.grid = grid
+        self.sampler = sampler
+        self.reuse = reuse
+
+        # Trees are a cheaper resource than rows when the space tunes them anyway
+        self.resource = 'n_estimators' if strategy != "random" and 'n_estimators' in self.param_dist else 'n_samples'
+        if self.resource == 'n_estimators':
+            trees = self.param_dist.pop('n_estimators')
+            self.max_resource = max(trees)
+            self.min_resource = min(trees)
+
+    def categorical(self):
+        return all(isinstance(v, (list, tuple)) for v in self.param_dist.values())
+
+    def sample(self, n):
+        """
+        Up to n candidates this study has not scored on the full resource yet.
+        """
+        if self.grid:
+            return list(ParameterGrid(self.param_dist))
+        seen = {params_key(params) for params, _ in self.study.history(self.max_resource)}
+        if self.sampler == "tpe" and self.categorical() and len(self.study.prior) >= TPE_STARTUP:
+            return tpe_sample(self.param_dist, self.study.prior, n, self.rng, exclude=seen)
+        n_draw = n + len(seen)
+        if self.categorical():
+            n_draw = min(n_draw, len(ParameterGrid(self.param_dist)))
+        draws = ParameterSampler(self.param_dist, n_draw, random_state=self.rng)
+        return [params for params in draws if params_key(params) not in seen][:n]
+
+    def n_rounds(self):
+        return max(int(math.log(self.max_resource / self.min_resource, self.factor)) + 1, 1)
+
+    def fit(self, X, y):
+        self.X, self.y = X, y
+        self.deadline = time.time() + self.time_budget if self.time_budget else None
+        self.workers = effective_n_jobs(self.n_jobs)
+        self.folds = check_cv(self.cv, y, classifier=is_classifier(self.estimator))
+        self.rng = np.random.RandomState(self.random_state)
+        self.study = open_study(self.estimator, self.space, X, y, self.cv, self.reuse)
+        if self.resource == 'n_samples':
+            self.max_resource = len(X)
+            n_classes = y.nunique() if is_classifier(self.estimator) else 1
+            self.min_resource = min(max(2 * self.folds.get_n_splits() * n_classes, 20), len(X))
+            self.order = np.random.RandomState(self.random_state).permutation(len(X))
+        self.params, self.scores, self.keys, self.finals = [], [], [], []
+        self.done, self.total = 0, 0
+        # The budget is only enforced once the results have a row
+        self.scored = bool(self.study.history(self.max_resource))
+
+        with Parallel(n_jobs=self.n_jobs) as self.parallel:
+            rounds = self.n_rounds()
+            if self.strategy == "random":
+                # n_iter counts the configurations earlier requests already scored
+                n_new = max(self.n_iter - len(self.study.history(self.max_resource)), 0)
+                self.halving(self.sample(n_new), self.max_resource, 1)
+            elif self.strategy == "hyperband":
+                # Brackets from the most to the least aggressive, about the same work each
+                for s in reversed(range(rounds)):
+                    n = int(math.ceil(self.n_iter * self.factor ** s / (s + 1)))
+                    self.halving(self.sample(n), self.max_resource / self.factor ** s, s + 1)
+            else:
+                # As many full-resource fits in total as a random search of n_iter candidates
+                n = max(self.n_iter * self.factor ** (rounds - 1) // rounds, self.n_iter)
+                self.halving(self.sample(n), self.min_resource, rounds)
+
+        # Earlier trials of this study complete the table
+        for params, score in self.study.history(self.max_resource):
+            if params_key(params) not in self.keys:
+                self.finals.append(len(self.params))
+                self.params.append(dict(params, **self.resource_params(self.max_resource)))
+                self.scores.append(score)
+
+        finals = [i for i in self.finals if not np.isnan(self.scores[i])] or \
+            [i for i in range(len(self.scores)) if not np.isnan(self.scores[i])]
+        best = max(finals, key=lambda i: self.scores[i]) if finals else 0
+        # Read like a fitted RandomizedSearchCV by the hyperparameter_optimization functions
+        self.cv_results_ = {'params': self.params, 'mean_test_score': np.asarray(self.scores, dtype=float)}
+        self.best_params_ = self.params[best] if self.params else {}
+        return self
+
+    def expired(self):
+        return self.scored and self.deadline is not None and time.time() > self.deadline
+
+    def resource_params(self, resource):
+        if self.resource == 'n_estimators':
+            return {'n_estimators': int(round(resource))}
+        return {}
+
+    def evaluate(self, candidates, resource):
+        """
+        Mean CV score of every candidate on `resource`: NaN when a fit
+        failed, None when the budget ran out before all its folds were fit.
+        Scores found in the study are not computed again, new ones are
+        recorded there as soon as all folds of a candidate are done.
+        """
+        final = resource >= self.max_resource
+        scores = [self.study.get(params, resource) for params in candidates]
+        todo = [i for i, score in enumerate(scores) if score is None]
+        self.scored = self.scored or len(todo) < len(scores)
+        if not todo:
+            return scores
+
+        X, y = self.X, self.y
+        if self.resource == 'n_samples' and resource < len(X):
+            rows = np.sort(self.order[:int(resource)])
+            X, y = X.iloc[rows], y.iloc[rows]
+        folds = list(self.folds.split(X, y))
+        tasks = [(i, dict(candidates[i], **self.resource_params(resource)), train, test)
+                 for i in todo for train, test in folds]
+        self.total += len(tasks)
+        fold_scores = {i: [] for i in todo}
+        single_thread = self.workers > 1
+        step = self.workers * 2
+        for start in range(0, len(tasks), step):
+            if self.expired():
+                break
+            batch = tasks[start:start + step]
+            results = self.parallel(delayed(fit_and_score)(self.estimator, params, X, y, train, test, single_thread)
+                                    for _, params, train, test in batch)
+            completed = []
+            for (i, _, _, _), score in zip(batch, results):
+                fold_scores[i].append(score)
+                if len(fold_scores[i]) == len(folds):
+                    scores[i] = np.mean(fold_scores[i])
+                    completed.append((candidates[i], scores[i]))
+            self.study.put(completed, resource, final)
+            self.scored = self.scored or bool(completed)
+            self.done += len(batch)
+            report_progress('search', done=self.done, total=self.total)
+        return scores
+
+    def halving(self, candidates, resource, rounds):
+        """
+        Successive halving from `resource` over `rounds` rounds, the last one
+        on the full resource. Every candidate gets one row in the results,
+        with its score on the largest resource it reached.
+        """
+        rows = [None] * len(candidates)
+        alive = list(range(len(candidates)))
+        for r in range(rounds):
+            if not alive or self.expired():
+                return
+            last = r == rounds - 1
+            resource_r = self.max_resource if last else min(resource * self.factor ** r, self.max_resource)
+            scores = dict(zip(alive, self.evaluate([candidates[c] for c in alive], resource_r)))
+            for c in alive:
+                if scores[c] is None:
+                    continue
+                params = dict(candidates[c], **self.resource_params(resource_r))
+                if rows[c] is None:
+                    rows[c] = len(self.params)
+                    self.params.append(params)
+                    self.scores.append(scores[c])
+                    self.keys.append(params_key(candidates[c]))
+                else:
+                    self.params[rows[c]] = params
+                    self.scores[rows[c]] = scores[c]
+                if last:
+                    self.finals.append(rows[c])
+            scored = [c for c in alive if scores[c] is not None and not np.isnan(scores[c])]
+            alive = sorted(scored, key=lambda c: -scores[c])[:max(int(math.ceil(len(alive) / self.factor)), 1)]
+
+
+def search(estimator, param_dist, file, n_iter=10, cv=5, random_state=None, grid=False):
+    """
+    The search object a hyperparameter_optimization function fits.
+
+    The request may add 'search_strategy' ('random', the default, 'halving'
+    or 'hyperband'), 'n_jobs' (default: every core), 'time_budget' in
+    seconds, 'sampler' ('tpe', the default, or 'random') and 'reuse_trials'
+    (false to ignore the trials of earlier requests).
+    """
+    strategy = file.get("search_strategy", "random")
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown search strategy '{strategy}', use one of {', '.join(STRATEGIES)}.")
+    time_budget = file.get("time_budget")
+    if grid:
+        n_iter = len(ParameterGrid(param_dist))
+    return BudgetedSearch(estimator, param_dist, n_iter=n_iter, cv=cv, random_state=random_state,
+                          strategy=strategy, n_jobs=int(file.get("n_jobs", -1)),
+                          time_budget=float(time_budget) if time_budget else None, grid=grid,
+                          sampler=file.get("sampler", "tpe"), reuse=str(file.get("reuse_trials", True)).lower() not in ("false", "0"))
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+import numpy as np
+from django.conf import settings
+
+from matflow_test.evaluation import frame_fingerprint
+
+# Set HYPER_STUDIES to False to start every hyperparameter search from scratch
+HYPER_STUDIES = getattr(settings, 'HYPER_STUDIES', True)
+STUDY_DB = os.path.join(settings.BASE_DIR, 'dataset', '.cache', 'studies.sqlite3')
+# Earlier full-resource trials needed before TPE replaces random sampling
+TPE_STARTUP = getattr(settings, 'HYPER_TPE_STARTUP', 10)
+
+
+def to_json(value):
+    # NumPy scalars of np.arange spaces come back from the database as plain numbers
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+def params_key(params):
+    return json.dumps(params, sort_keys=True, default=to_json)
+
+
+class Study:
+    """
+    Trial history of one hyperparameter search problem, kept in SQLite.
+
+    A study is identified by the data fingerprint, target, estimator, search
+    space and folds, so it knows the score of every (configuration, resource)
+    already evaluated. Its family drops the data fingerprint: trials on
+    earlier versions of the data still guide the sampler, but are not reused
+    as scores.
+    """
+
+    def __init__(self, family, key, db_path=STUDY_DB):
+        self.family = family
+        self.key = key
+        self.db_path = db_path
+        self.trials = {}
+        self.prior = []
+        if not db_path:
+            return
+        with closing(self.connect()) as conn:
+            for study, params, resource, score, final in conn.execute(
+                    'SELECT study, params, resource, score, final FROM trials WHERE family = ?', (family,)):
+                score = np.nan if score is None else score
+                if study == key:
+                    self.trials[(params, resource)] = score
+                if final:
+                    self.prior.append((json.loads(params), score))
+
+    def connect(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('CREATE TABLE IF NOT EXISTS trials (family TEXT NOT NULL, study TEXT NOT NULL, params TEXT NOT NULL, '
+                     'resource INTEGER NOT NULL, score REAL, final INTEGER NOT NULL, created REAL NOT NULL, '
+                     'PRIMARY KEY (study, params, resource))')
+        conn.execute('CREATE INDEX IF NOT EXISTS trials_family ON trials (family)')
+        return conn
+
+    def get(self, params, resource):
+        return self.trials.get((params_key(params), int(resource)))
+
+    def put(self, results, resource, final):
+        """
+        Record the scores of a list of (params, score), NaN for failed fits.
+        """
+        resource = int(resource)
+        rows = []
+        for params, score in results:
+            self.trials[(params_key(params), resource)] = score
+            if final:
+                self.prior.append((params, score))
+            rows.append((self.family, self.key, params_key(params), resource,
+                         None if np.isnan(score) else float(score), int(final), time.time()))
+        if self.db_path and rows:
+            with closing(self.connect()) as conn, conn:
+                conn.executemany('INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def history(self, resource):
+        """
+        (params, score) of every configuration this study evaluated on `resource`.
+        """
+        resource = int(resource)
+        return [(json.loads(params), score) for (params, r), score in self.trials.items() if r == resource]
+
+
+def open_study(estimator, param_dist, X, y, cv, reuse=True):
+    family = hashlib.sha1('|'.join([str(y.name), type(estimator).__module__, repr(estimator),
+                                    params_key(param_dist), str(cv)]).encode()).hexdigest()
+    key = hashlib.sha1('|'.join([family, frame_fingerprint(X), frame_fingerprint(y.to_frame())]).encode()).hexdigest()
+    return Study(family, key, STUDY_DB if reuse and HYPER_STUDIES else None)
+
+
+def tpe_sample(space, history, n, rng, exclude=(), gamma=0.25, n_draws=24):
+    """
+    Tree-structured Parzen estimator over a space of choice lists.
+
+    The best `gamma` share of the history (higher scores are better) and the
+    rest, failed trials included, each give every parameter a smoothed
+    categorical distribution, l and g. Each suggestion is the one of `n_draws` draws from l with the
+    highest l/g, skipping configurations in `exclude` and those already
+    suggested. Returns at most n configurations.
+    """
+    ranked = sorted((t for t in history if not np.isnan(t[1])), key=lambda t: -t[1])
+    failed = [t for t in history if np.isnan(t[1])]
+    n_good = max(int(math.ceil(gamma * len(ranked))), 1)
+    good, bad = ranked[:n_good], ranked[n_good:] + failed
+
+    def distribution(trials, name, choices):
+        keys = [params_key(c) for c in choices]
+        counts = np.ones(len(choices))
+        for params, _ in trials:
+            value = params_key(params.get(name))
+            if value in keys:
+                counts[keys.index(value)] += 1
+        return counts / counts.sum()
+
+    l = {name: distribution(good, name, choices) for name, choices in space.items()}
+    g = {name: distribution(bad, name, choices) for name, choices in space.items()}
+    taken = set(exclude)
+    suggestions = []
+    for _ in range(n):
+        best, best_ratio = None, -np.inf
+        for _ in range(n_draws):
+            picks = {name: rng.choice(len(choices), p=l[name]) for name, choices in space.items()}
+            candidate = {name: space[name][i] for name, i in picks.items()}
+            if params_key(candidate) in taken:
+                continue
+            ratio = sum(np.log(l[name][i]) - np.log(g[name][i]) for name, i in picks.items())
+            if ratio > best_ratio:
+                best, best_ratio = candidate, ratio
+        if best is None:
+            break  # The space is (nearly) exhausted
+        taken.add(params_key(best))
+        suggestions.append(best)
+    return suggestions
@@ -3,10 +3,11 @@ import pandas as pd
 from sklearn.ensemble import ExtraTreesRegressor, ExtraTreesClassifier
 from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
 from sklearn.ensemble import GradientBoostingRegressor, GradientBoostingClassifier
-from sklearn.model_selection import cross_validate
 import streamlit as st
 from xgboost import XGBRegressor, XGBClassifier
 
+from pfs.cache import SubsetScorer
+
 
 def feature_selection(dataset, table_name, target_var, problem_type):
 
@@ -111,18 +112,16 @@ def feature_selection(dataset, table_name, target_var, problem_type):
     total_iterations = len(list_X)
 
     progress_bar = st.progress(0, text=':blue[Stage 1: Calculating scores for each feature]')
+    # Scores of subsets seen in earlier runs come from the cache
+    scorer = SubsetScorer(X_n, Y_n, estimator, kfold, scoring, 1 if problem_type == 'classification' else -1)
 
     for i in range(len(list_X)):
-        scores = cross_validate(estimator, X_n[list_X[i]].values.reshape(-1, 1), Y_n, cv=kfold, scoring=scoring,
-                                n_jobs=-1)
         progress_percentage = (i + 1) / total_iterations
 
         progress_bar.progress(progress_percentage,
                               text=':blue[Stage 1: Calculating scores for each feature]' + ('..') * (i % 3))
         try:
-            to_sort_df.loc[list_X[i]] = [
-                round(scores['test_' + score].mean() * (1 if problem_type == 'classification' else -1), 4) for score in
-                scoring]
+            to_sort_df.loc[list_X[i]] = scorer.score([list_X[i]])
         except Exception as e:
             st.error(f"Error while adding data to result dataframe: {str(e)}")
             return pd.DataFrame
@@ -138,18 +137,14 @@ def feature_selection(dataset, table_name, target_var, problem_type):
     list_X = to_sort_df.index.tolist()
     selected = [list_X[0]]
     selected_feature_scores = df_result.copy()
-    scores = cross_validate(estimator, X_n[selected].values.reshape(-1, 1), Y_n, cv=kfold, scoring=scoring, n_jobs=-1)
-    selected_feature_scores.loc[list_X[0]] = [
-        round(scores['test_' + score].mean() * (1 if problem_type == 'classification' else -1), 4) for score in scoring]
+    selected_feature_scores.loc[list_X[0]] = scorer.score(selected)
     list_X.remove(list_X[0])
     all_features_scores=df_result.copy()
     dropped_columns=df_result.copy()
     while len(list_X) > 0:
         var = df_result.copy()
         for i in list_X:
-            scores = cross_validate(estimator, X_n[selected + [i]], Y_n, cv=kfold, scoring=scoring, n_jobs=-1)
-            var.loc[i] = [round(scores['test_' + score].mean() * (1 if problem_type == 'classification' else -1), 4) for
-                          score in scoring]
+            var.loc[i] = scorer.score(selected + [i])
         var = var.sort_values('RMSE')
         list_X.remove(var.index[0])
 
@@ -7,7 +7,8 @@ import plotly.graph_objects as go
 
 import pandas as pd
 from sklearn.ensemble import ExtraTreesClassifier, ExtraTreesRegressor
-from sklearn.model_selection import cross_validate
+
+from pfs.cache import SubsetScorer
 def feature_selection(dataset, target_var, problem_type, kfold, display_opt, selected_features=None):
     try:
         tab = dataset
@@ -35,15 +36,12 @@ def feature_selection(dataset, target_var, problem_type, kfold, display_opt, sel
 
         total_iterations = len(list_X)
         to_sort_df = df_result.copy()
+        # Scores of subsets seen in earlier runs come from the cache
+        scorer = SubsetScorer(X_n, Y_n, estimator, kfold, scoring, 1 if problem_type == 'classification' else -1)
 
         for i in range(len(list_X)):
-            scores = cross_validate(estimator, X_n[list_X[i]].values.reshape(-1, 1), Y_n, cv=kfold, scoring=scoring,
-                                    n_jobs=-1)
             try:
-                to_sort_df.loc[list_X[i]] = [
-                    round(scores['test_' + score].mean() * (1 if problem_type == 'classification' else -1), 4) for score
-                    in
-                    scoring]
+                to_sort_df.loc[list_X[i]] = scorer.score([list_X[i]])
             except Exception as e:
                 print(f"Error while adding data to result dataframe: {str(e)}")
                 return
@@ -67,21 +65,11 @@ def feature_selection(dataset, target_var, problem_type, kfold, display_opt, sel
         k = str(5)
 
         for i in range(0, len(list_X), 5):
-            selected_column_data = X_n[list_X[:min(i + 5, mx_len)]]
-
-            scores_all = cross_validate(estimator, selected_column_data, Y_n, cv=kfold, scoring=scoring, n_jobs=-1)
+            scores_all = scorer.score(list_X[:min(i + 5, mx_len)])
             try:
 
-                df_result_group.loc[str(i + 5)] = [
-                    round(scores_all['test_' + score].mean() * (1 if problem_type == 'classification' else -1), 4) for
-                    score
-                    in
-                    scoring]
-                df_all_result_group.loc[str(i + 5)] = [
-                    round(scores_all['test_' + score].mean() * (1 if problem_type == 'classification' else -1), 4) for
-                    score
-                    in
-                    scoring]
+                df_result_group.loc[str(i + 5)] = scores_all
+                df_all_result_group.loc[str(i + 5)] = scores_all
             except Exception as e:
                 print(f"Error while adding data to result dataframe: {str(e)}")
                 return pd.DataFrame
@@ -113,42 +101,21 @@ def feature_selection(dataset, target_var, problem_type, kfold, display_opt, sel
             selected_column_data[list_X[i]] = X_n[list_X[i]]
 
             if len(dropped_columns) > 0:
-                scores_all = cross_validate(estimator, all_column_data_first, Y_n, cv=kfold, scoring=scoring, n_jobs=-1)
-                scores_selected = cross_validate(estimator, selected_column_data, Y_n, cv=kfold, scoring=scoring,
-                                                 n_jobs=-1)
+                scores_all = scorer.score(list(all_column_data_first.columns))
+                scores_selected = scorer.score(list(selected_column_data.columns))
                 try:
 
-                    df_result.loc[list_X[i]] = [
-                        round(scores_selected['test_' + score].mean() * (1 if problem_type == 'classification' else -1),
-                              4)
-                        for score
-                        in
-                        scoring]
-                    df_all_result.loc[list_X[i]] = [
-                        round(scores_all['test_' + score].mean() * (1 if problem_type == 'classification' else -1), 4)
-                        for
-                        score
-                        in
-                        scoring]
+                    df_result.loc[list_X[i]] = scores_selected
+                    df_all_result.loc[list_X[i]] = scores_all
                 except Exception as e:
                     print(f"Error while adding data to result dataframe: {str(e)}")
                     return pd.DataFrame
             else:
-                scores_all = cross_validate(estimator, all_column_data_first, Y_n, cv=kfold, scoring=scoring, n_jobs=-1)
+                scores_all = scorer.score(list(all_column_data_first.columns))
                 try:
 
-                    df_result.loc[list_X[i]] = [
-                        round(scores_all['test_' + score].mean() * (1 if problem_type == 'classification' else -1), 4)
-                        for
-                        score
-                        in
-                        scoring]
-                    df_all_result.loc[list_X[i]] = [
-                        round(scores_all['test_' + score].mean() * (1 if problem_type == 'classification' else -1), 4)
-                        for
-                        score
-                        in
-                        scoring]
+                    df_result.loc[list_X[i]] = scores_all
+                    df_all_result.loc[list_X[i]] = scores_all
                 except Exception as e:
                     return pd.DataFrame
 
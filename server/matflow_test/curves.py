@@ -0,0 +1,82 @@
+import numpy as np
+from django.conf import settings
+
+from .registry import models, resolve_model
+
+# Points kept per curve, larger test sets are decimated to this resolution
+CURVE_MAX_POINTS = getattr(settings, 'CURVE_MAX_POINTS', 1000)
+
+
+def decimate(n, max_points):
+    """
+    Indices of at most `max_points` evenly spread points out of n, keeping
+    the first and the last.
+    """
+    if n <= max_points:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, max_points).round().astype(int))
+
+
+def ratio(a, total):
+    return a / total if total else np.zeros_like(a)
+
+
+def ovr_curves(y_true, scores, classes, max_points=CURVE_MAX_POINTS):
+    """
+    One-vs-rest ROC and precision-recall curves of every class.
+
+    `scores` has one column per class in `classes` order. All columns are
+    sorted and accumulated in one pass; each curve then keeps the points at
+    distinct thresholds, as sklearn's roc_curve does, and is decimated to
+    `max_points` after its AUC and average precision are taken on all of them.
+    """
+    y_true = np.asarray(y_true)
+    scores = np.asarray(scores, dtype=float)
+    classes = np.asarray(classes)
+    n = len(scores)
+
+    order = np.argsort(-scores, axis=0, kind='mergesort')
+    sorted_scores = np.take_along_axis(scores, order, axis=0)
+    tps = np.cumsum(y_true[order] == classes[None, :], axis=0)
+    fps = np.arange(1, n + 1)[:, None] - tps
+    distinct = np.ones(scores.shape, dtype=bool)
+    distinct[:-1] = sorted_scores[:-1] != sorted_scores[1:]
+
+    curves = []
+    for j, label in enumerate(classes):
+        ends = np.flatnonzero(distinct[:, j])
+        tp, fp = tps[ends, j].astype(float), fps[ends, j].astype(float)
+        fpr = np.r_[0, ratio(fp, fp[-1])]
+        tpr = np.r_[0, ratio(tp, tp[-1])]
+        precision = np.r_[1, tp / (tp + fp)]
+        recall = tpr
+        keep = decimate(len(fpr), max_points)
+        curves.append({
+            'label': label,
+            'fpr': fpr[keep], 'tpr': tpr[keep],
+            'auc': float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2)),
+            'precision': precision[keep], 'recall': recall[keep],
+            'average_precision': float(np.sum(np.diff(recall) * precision[1:])),
+        })
+    return curves
+
+
+def class_scores(file, X, y, y_pred, split=None):
+    """
+    Per-class scores for the curves of a model_prediction request and their
+    classes: the probabilities cached with the registered model for these
+    rows, else predict_proba of the model the request refers to, else the
+    one-hot predictions, which give the curves of the hard predictions.
+    """
+    if split is not None and split.proba is not None:
+        return split.proba, split.classes
+    model = None
+    if file.get('model_id'):
+        model = models.get_model(file.get('model_id'))
+        X = models.model_input(file.get('model_id'), X)
+    elif file.get('model_deploy'):
+        model = resolve_model(file)
+    if model is not None and hasattr(model, 'predict_proba'):
+        return model.predict_proba(X), model.classes_
+    classes = np.unique(np.r_[np.asarray(y), np.asarray(y_pred)])
+    return (np.asarray(y_pred)[:, None] == classes[None, :]).astype(float), classes
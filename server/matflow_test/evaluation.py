@@ -0,0 +1,100 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import (accuracy_score, confusion_matrix, f1_score, mean_absolute_error, mean_squared_error,
+                             precision_score, r2_score, recall_score)
+
+
+def frame_fingerprint(X):
+    """
+    Fingerprint of a feature frame's shape, columns and values, to recognise
+    the same data in a later request.
+    """
+    digest = hashlib.sha1(f"{X.shape}|{list(map(str, X.columns))}".encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+class SplitResult:
+    """
+    Cached outputs of a model on one split: the true target, the predictions
+    and, for classifiers, the class probabilities in `classes` order.
+    """
+
+    def __init__(self, fingerprint, y_true, y_pred, proba=None, classes=None):
+        self.fingerprint = fingerprint
+        self.y_true = y_true
+        self.y_pred = y_pred
+        self.proba = proba
+        self.classes = classes
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.y_true, self.y_pred, self.proba) if a is not None)
+
+    def classification_metrics(self, average):
+        return {
+            "Accuracy": accuracy_score(self.y_true, self.y_pred),
+            "Precision": precision_score(self.y_true, self.y_pred, average=average),
+            "Recall": recall_score(self.y_true, self.y_pred, average=average),
+            "F1-Score": f1_score(self.y_true, self.y_pred, average=average),
+        }
+
+    def regression_metrics(self):
+        mse = mean_squared_error(self.y_true, self.y_pred)
+        return {
+            "R-Squared": r2_score(self.y_true, self.y_pred),
+            "Mean Absolute Error": mean_absolute_error(self.y_true, self.y_pred),
+            "Mean Squared Error": mse,
+            "Root Mean Squared Error": np.sqrt(mse),
+        }
+
+    def confusion_matrix(self):
+        return confusion_matrix(self.y_true, self.y_pred)
+
+
+class Evaluation:
+    """
+    Predictions of a model on every split it was evaluated on, computed once
+    by evaluate() and kept with the model so every metric, confusion matrix
+    and curve is derived from them rather than from another predict call.
+    """
+
+    def __init__(self, splits):
+        self.splits = splits
+
+    def __getitem__(self, name):
+        return self.splits[name]
+
+    @property
+    def nbytes(self):
+        return sum(split.nbytes for split in self.splits.values())
+
+    def find(self, X):
+        """
+        The cached split holding exactly the rows of X, or None.
+        """
+        candidates = [split for split in self.splits.values() if len(split.y_pred) == len(X)]
+        if not candidates:
+            return None
+        fingerprint = frame_fingerprint(X)
+        return next((split for split in candidates if split.fingerprint == fingerprint), None)
+
+
+def evaluate(model, splits):
+    """
+    Predict (and predict_proba where the model has it) once per split.
+    `splits` maps a name to its (X, y).
+    """
+    proba = hasattr(model, 'predict_proba')
+    results = {}
+    for name, (X, y) in splits.items():
+        results[name] = SplitResult(
+            frame_fingerprint(X),
+            np.asarray(y),
+            np.asarray(model.predict(X)),
+            np.asarray(model.predict_proba(X)) if proba else None,
+            np.asarray(model.classes_) if proba else None,
+        )
+    return Evaluation(results)
@@ -0,0 +1,129 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+# How long (in seconds) a single-row predict call waits for more rows, 0 batches only rows that queue up meanwhile
+PREDICT_BATCH_WINDOW = getattr(settings, 'PREDICT_BATCH_WINDOW', 0)
+PREDICT_MAX_BATCH = getattr(settings, 'PREDICT_MAX_BATCH', 256)
+
+
+class FeatureSchema:
+    """
+    Column order of a model, turning request rows into the matrix it predicts on.
+
+    Rows are objects keyed by feature name, where missing features are 0 like
+    in deploy_result, or lists already in feature order.
+    """
+
+    def __init__(self, features):
+        self.features = list(features)
+        self.index = {name: i for i, name in enumerate(self.features)}
+
+    def vector(self, row):
+        if not isinstance(row, dict):
+            x = np.asarray(row, dtype=float)
+            if x.shape != (len(self.features),):
+                raise ValueError(f"Expected {len(self.features)} values, got {x.size}.")
+            return x
+        unknown = [name for name in row if name not in self.index]
+        if unknown:
+            raise ValueError(f"Unknown features: {unknown}")
+        x = np.zeros(len(self.features))
+        for name, value in row.items():
+            x[self.index[name]] = value
+        return x
+
+    def matrix(self, rows):
+        return np.vstack([self.vector(row) for row in rows]) if rows else np.empty((0, len(self.features)))
+
+
+class Pending:
+    def __init__(self, x):
+        self.x = x
+        self.value = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predictions into one vectorized call.
+
+    One call runs at a time per model. Rows that arrive while it runs are
+    predicted together by the next one, so an idle model answers at once and
+    a busy one batches. With `window` > 0 every call also waits up to that
+    many seconds, or until `max_batch` rows are pending, for more rows.
+    """
+
+    def __init__(self, predict, window=PREDICT_BATCH_WINDOW, max_batch=PREDICT_MAX_BATCH):
+        self.predict = predict
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = []
+        self.lock = threading.Lock()
+        self.running = threading.Lock()
+        self.full = threading.Event()
+
+    def submit(self, x):
+        item = Pending(x)
+        with self.lock:
+            self.pending.append(item)
+            if len(self.pending) >= self.max_batch:
+                self.full.set()
+        with self.running:
+            if not item.done.is_set():
+                # Nobody took this row yet, predict it with everything pending
+                if self.window > 0:
+                    self.full.wait(self.window)
+                with self.lock:
+                    batch, self.pending = self.pending, []
+                    self.full.clear()
+                self.run(batch)
+        if item.error is not None:
+            raise item.error
+        return item.value
+
+    def run(self, batch):
+        try:
+            values = self.predict(np.vstack([p.x for p in batch]))
+            for p, value in zip(batch, values):
+                p.value = value
+        except Exception as e:
+            for p in batch:
+                p.error = e
+        finally:
+            for p in batch:
+                p.done.set()
+
+
+class Predictor:
+    """
+    A resident model with its feature schema and batcher, built once when the
+    model is loaded by the registry.
+    """
+
+    def __init__(self, model, features):
+        if not features:
+            features = [str(c) for c in getattr(model, 'feature_names_in_', range(getattr(model, 'n_features_in_', 0)))]
+        self.model = model
+        self.schema = FeatureSchema(features)
+        # Models fitted on a DataFrame are given one, so sklearn can check the columns
+        self.named = hasattr(model, 'feature_names_in_')
+        self.batcher = MicroBatcher(self.predict)
+
+    def predict(self, X):
+        if self.named:
+            X = pd.DataFrame(X, columns=self.schema.features)
+        return self.model.predict(X)
+
+    def predict_one(self, row):
+        return self.batcher.submit(self.schema.vector(row))
+
+    def predict_many(self, rows):
+        return self.predict(self.schema.matrix(rows))
+
+
+def to_python(values):
+    return np.asarray(values).tolist()
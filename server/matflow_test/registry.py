@@ -0,0 +1,215 @@
+import base64
+import gzip
+import json
+import os
+import pickle
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.http import Http404
+
+from dataset_manager.cache import LRUCache
+from .Matflow_Main.modules.classes.model import Models
+from .inference import Predictor
+
+# Fitted models live next to the dataset store, hidden from the file tab
+MODEL_DIR = os.path.join(settings.BASE_DIR, 'dataset', '.models')
+MODEL_MEMORY = getattr(settings, 'MODEL_REGISTRY_MEMORY', 1024 ** 3)
+MODEL_COMPRESS_LEVEL = getattr(settings, 'MODEL_COMPRESS_LEVEL', 3)
+
+MODEL_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class RegisteredModel:
+    """
+    A fitted estimator with its metadata, its online predictor and the
+    Evaluation of its splits. `nbytes`, the size of its pickle plus the
+    cached predictions, is what the memory budget of the registry counts.
+    """
+
+    def __init__(self, model, meta, nbytes, evaluation=None):
+        self.model = model
+        self.meta = meta
+        self.nbytes = nbytes + (evaluation.nbytes if evaluation is not None else 0)
+        self.evaluation = evaluation
+        self.predictor = Predictor(model, meta.get('features'))
+
+
+class ModelRegistry(Models):
+    """
+    Server-side registry of fitted models addressed by opaque ids.
+
+    Every model is pickled once to a gzip file with a JSON metadata sidecar,
+    and the most recently used ones are kept unpickled in memory, so clients
+    pass a `model_id` around instead of the pickled model.
+    """
+
+    def __init__(self, root, max_bytes, compress_level=MODEL_COMPRESS_LEVEL):
+        super().__init__()
+        self.root = root
+        self.compress_level = compress_level
+        self.model = LRUCache(max_bytes)
+
+    def path(self, model_id, ext='.pkl.gz'):
+        if not MODEL_ID.match(str(model_id)):
+            raise Http404(f"Unknown model id '{model_id}'.")
+        return os.path.join(self.root, model_id + ext)
+
+    def put(self, model, evaluation=None, **meta):
+        """
+        Store a fitted model, and optionally the Evaluation of its splits, and
+        return its id. `meta` holds JSON-serializable facts about it, e.g. the
+        feature names and target variable.
+        """
+        model_id = uuid.uuid4().hex
+        raw = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+        meta = dict(meta, model_id=model_id, estimator=type(model).__name__, created=time.time(), nbytes=len(raw))
+        files = [('.pkl.gz', gzip.compress(raw, compresslevel=self.compress_level)),
+                 ('.json', json.dumps(meta, default=str).encode())]
+        if evaluation is not None:
+            files.append(('.eval.pkl.gz', gzip.compress(pickle.dumps(evaluation, protocol=pickle.HIGHEST_PROTOCOL),
+                                                        compresslevel=self.compress_level)))
+        os.makedirs(self.root, exist_ok=True)
+        for ext, content in files:
+            path = self.path(model_id, ext)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(content)
+            os.replace(path + '.tmp', path)
+        self.model.put(model_id, RegisteredModel(model, meta, len(raw), evaluation))
+        return model_id
+
+    def dumps(self, model_id):
+        """
+        The model's plain pickle, read from disk without unpickling it.
+        """
+        path = self.path(model_id)
+        if not os.path.isfile(path):
+            raise Http404(f"Unknown model id '{model_id}'.")
+        with gzip.open(path, 'rb') as f:
+            return f.read()
+
+    def get(self, model_id):
+        entry = self.model.get(model_id)
+        if entry is None:
+            raw = self.dumps(model_id)
+            entry = RegisteredModel(pickle.loads(raw), self.get_meta(model_id), len(raw), self.load_evaluation(model_id))
+            self.model.put(model_id, entry)
+        return entry
+
+    def load_evaluation(self, model_id):
+        path = self.path(model_id, '.eval.pkl.gz')
+        if not os.path.isfile(path):
+            return None
+        with gzip.open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def get_evaluation(self, model_id):
+        return self.get(model_id).evaluation
+
+    def get_meta(self, model_id):
+        entry = self.model.get(model_id)
+        if entry is not None:
+            return entry.meta
+        path = self.path(model_id, '.json')
+        if not os.path.isfile(path):
+            raise Http404(f"Unknown model id '{model_id}'.")
+        with open(path) as f:
+            return json.load(f)
+
+    def get_model(self, model_id):
+        return self.get(model_id).model
+
+    def get_result(self, model_id):
+        return self.get_meta(model_id).get('metrics_table', {})
+
+    def model_input(self, model_id, X):
+        """
+        The columns of a DataFrame the model was fitted on, in its order.
+        """
+        features = self.get_meta(model_id).get('features')
+        if features and hasattr(X, 'columns') and set(features) <= set(map(str, X.columns)):
+            X = X.rename(columns=str)[features]
+        return X
+
+    def get_prediction(self, model_id, X):
+        return self.get_model(model_id).predict(self.model_input(model_id, X))
+
+    def list_name(self):
+        if not os.path.isdir(self.root):
+            return []
+        return [name[:-len('.pkl.gz')] for name in os.listdir(self.root) if name.endswith('.pkl.gz')]
+
+    def delete_model(self, model_id):
+        path = self.path(model_id)
+        self.model.pop(model_id)
+        if not os.path.isfile(path):
+            raise Http404(f"Unknown model id '{model_id}'.")
+        os.remove(path)
+        for ext in ('.json', '.eval.pkl.gz'):
+            if os.path.isfile(self.path(model_id, ext)):
+                os.remove(self.path(model_id, ext))
+
+
+models = ModelRegistry(MODEL_DIR, MODEL_MEMORY)
+
+
+def resolve_model(file):
+    """
+    Return the fitted model a request refers to, either through its
+    `model_id` or from the base64 pickle sent inline as `model_deploy`.
+    """
+    model_id = file.get('model_id')
+    if model_id:
+        return models.get_model(model_id)
+    return pickle.loads(base64.b64decode(file.get('model_deploy')))
+
+
+def cached_split(file, X):
+    """
+    The SplitResult the registered `model_id` cached for exactly the rows of
+    X when it was built, or None.
+    """
+    model_id = file.get('model_id')
+    evaluation = models.get_evaluation(model_id) if model_id else None
+    return evaluation.find(X) if evaluation is not None else None
+
+
+def predictions(file, X, split=None):
+    """
+    The predictions a model_prediction request evaluates: `y_pred` when the
+    client sends them, otherwise those of the registered `model_id` on X,
+    cached when X is one of the splits it was evaluated on (`split`, see
+    cached_split).
+    """
+    y_pred = file.get('y_pred')
+    if y_pred is None and file.get('model_id'):
+        split = split or cached_split(file, X)
+        y_pred = split.y_pred if split is not None else models.get_prediction(file['model_id'], X)
+    return y_pred
+
+
+def register(model, file, model_type, X_train, metrics_table, evaluation=None):
+    """
+    Put a model fitted by build_model in the registry and return the fields
+    to add to its response: the `model_id`, and the inline `model_deploy`
+    for clients that still send the model back and ask for it with
+    `inline_model`.
+    """
+    model_id = models.put(
+        model,
+        evaluation,
+        name=file.get('model_name'),
+        type=model_type,
+        algorithm=file.get(model_type),
+        target_var=file.get('target_var'),
+        features=[str(c) for c in X_train.columns],
+        train_id=file.get('train_id'),
+        test_id=file.get('test_id'),
+        metrics_table=metrics_table,
+    )
+    fields = {'model_id': model_id}
+    if file.get('inline_model', False):
+        fields['model_deploy'] = base64.b64encode(models.dumps(model_id)).decode('utf-8')
+    return fields
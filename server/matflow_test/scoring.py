@@ -0,0 +1,120 @@
+import multiprocessing
+import os
+import pickle
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+STREAM_TYPES = ('.csv', '.parquet')
+
+# Set once per worker process by init_worker, so every chunk only ships its rows
+_state = {}
+
+
+def init_worker(raw, features, proba, keep):
+    _state.update(model=pickle.loads(raw), features=features, proba=proba, keep=keep)
+
+
+def score_chunk(chunk, state=_state):
+    """
+    Predictions for one chunk of rows: the `keep` columns of the input, the
+    prediction and, for classifiers, one probability column per class.
+    """
+    model = state['model']
+    X = chunk[state['features']] if state['features'] else chunk
+    out = chunk[state['keep']].copy() if state['keep'] else pd.DataFrame(index=chunk.index)
+    out['prediction'] = model.predict(X)
+    if state['proba']:
+        proba = model.predict_proba(X)
+        for i, label in enumerate(model.classes_):
+            out[f'proba_{label}'] = proba[:, i]
+    return out
+
+
+def file_chunks(file_path, chunksize):
+    """
+    Read a CSV or Parquet file `chunksize` rows at a time.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.csv':
+        yield from pd.read_csv(file_path, chunksize=chunksize)
+    elif extension == '.parquet':
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        raise ValueError("Unsupported file type. Batch scoring streams .csv and .parquet files.")
+
+
+def frame_chunks(df, chunksize):
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+class ChunkWriter:
+    """
+    Appends DataFrame chunks to a CSV or Parquet file, written under a
+    temporary name and moved into place by close().
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.parquet = os.path.splitext(file_path)[1].lower() == '.parquet'
+        self.writer = None
+        self.n_rows = 0
+        self.columns = None
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    def write(self, df):
+        if self.parquet:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.file_path + '.part', table.schema)
+            self.writer.write_table(table.cast(self.writer.schema))
+        else:
+            df.to_csv(self.file_path + '.part', mode='a' if self.n_rows else 'w', header=not self.n_rows, index=False)
+        self.n_rows += len(df)
+        self.columns = self.columns or [str(c) for c in df.columns]
+
+    def close(self):
+        if not self.n_rows:
+            raise ValueError("the input has no rows.")
+        if self.writer is not None:
+            self.writer.close()
+        os.replace(self.file_path + '.part', self.file_path)
+
+    def abort(self):
+        if self.writer is not None:
+            self.writer.close()
+        if os.path.exists(self.file_path + '.part'):
+            os.remove(self.file_path + '.part')
+
+
+def score_chunks(chunks, model, features, proba=False, keep=None, n_jobs=1):
+    """
+    Yield the predictions of every chunk in input order.
+
+    With n_jobs > 1 the chunks are scored by a pool of worker processes that
+    each unpickle the model once. At most two chunks per worker are in flight,
+    so memory stays flat whatever the size of the input.
+    """
+    state = dict(model=model, features=features, proba=proba, keep=keep)
+    if n_jobs <= 1:
+        for chunk in chunks:
+            yield score_chunk(chunk, state)
+        return
+    raw = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+    # Not forked: the request thread would copy the server's locks, database connections and caches
+    context = multiprocessing.get_context(
+        'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+    with ProcessPoolExecutor(n_jobs, mp_context=context, initializer=init_worker,
+                             initargs=(raw, features, proba, keep)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(score_chunk, chunk))
+            if len(pending) >= 2 * n_jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
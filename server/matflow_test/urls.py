@@ -29,7 +29,13 @@ urlpatterns = [
     path('hyperparameter_optimization/', Hyper_opti, name='dropping'),
     path('model_evaluation/', model_evaluation, name='dropping'),
     path('model_prediction/', model_prediction, name='dropping'),
+    path('leaderboard/', Leaderboard, name='leaderboard'),
     path('download_model/', download_model, name='download_model'),
+    path('models/', list_models, name='list_models'),
+    path('models/<str:model_id>/', model_handle, name='model_handle'),
+    path('predict/', predict, name='predict'),
+    path('predict/<str:model_id>/', predict, name='predict_model'),
+    path('batch_predict/', batch_predict, name='batch_predict'),
     path('reverseml/', Reverse_ml, name='dropping'),
     path('deploy_data/', deploy_data, name="deploy_data"),
     path('deploy_result/', deploy_result, name="deploy_result"),
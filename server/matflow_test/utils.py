@@ -24,3 +24,82 @@ def objective_function(hyperparameters, model_type, X_train, y_train, X_test, y_
         print(f"MSE: {mse}, RMSE: {rmse}, R²: {r_squared}")
 
     return mse  # Optimize based on MSE by default
+
+
+def quantize(value, digits=3):
+    """
+    Round to `digits` significant digits, so nearby hyperparameter values
+    share one fit.
+    """
+    return float(f"{value:.{digits}g}")
+
+
+class HyperparameterObjective:
+    """
+    objective_function for a whole PSO run.
+
+    The data is converted to NumPy once, every fit is memoized by its
+    quantized hyperparameter, Ridge solves every alpha from one SVD of the
+    training data, and Lasso warm starts from the coefficients of the closest
+    alpha fitted so far, so a run costs about one regularization path.
+    Every supported hyperparameter (alpha, or C for SVR) must be positive.
+    """
+
+    PARAMETERS = {'Ridge': 'alpha', 'Lasso': 'alpha', 'SVR': 'C'}
+
+    def __init__(self, model_type, X_train, y_train, X_test, y_test, debug=False, digits=3):
+        if model_type not in self.PARAMETERS:
+            raise ValueError(f"Unsupported model type: {model_type}")
+        self.model_type = model_type
+        self.parameter = self.PARAMETERS[model_type]
+        self.X_train = np.asarray(X_train, dtype=float)
+        self.y_train = np.asarray(y_train, dtype=float).ravel()
+        self.X_test = np.asarray(X_test, dtype=float)
+        self.y_test = np.asarray(y_test, dtype=float).ravel()
+        self.debug = debug
+        self.digits = digits
+        self.results = {}
+        self.lasso_coefs = {}
+        if model_type == 'Ridge':
+            # Ridge with an intercept is a ridge on centered data
+            self.x_mean = self.X_train.mean(axis=0)
+            self.y_mean = self.y_train.mean()
+            U, self.s, self.Vt = np.linalg.svd(self.X_train - self.x_mean, full_matrices=False)
+            self.Uty = U.T @ (self.y_train - self.y_mean)
+
+    def predict(self, value):
+        if self.model_type == 'Ridge':
+            d = self.s / (self.s ** 2 + value)
+            coef = self.Vt.T @ (d * self.Uty)
+            return self.X_test @ coef + (self.y_mean - self.x_mean @ coef)
+        if self.model_type == 'Lasso':
+            model = Lasso(alpha=value, warm_start=True)
+            if self.lasso_coefs:
+                # Start from the closest alpha on the path fitted so far
+                nearest = min(self.lasso_coefs, key=lambda alpha: abs(np.log1p(alpha) - np.log1p(value)))
+                model.coef_ = self.lasso_coefs[nearest].copy()
+            model.fit(self.X_train, self.y_train)
+            self.lasso_coefs[value] = model.coef_
+            return model.predict(self.X_test)
+        model = SVR(C=value)
+        model.fit(self.X_train, self.y_train)
+        return model.predict(self.X_test)
+
+    def metrics(self, hyperparameters):
+        """
+        (MSE, RMSE, R²) on the test data, memoized by quantized hyperparameter.
+        """
+        value = quantize(hyperparameters[0], self.digits)
+        if value <= 0:
+            raise ValueError(f"{self.model_type} needs a positive {self.parameter}, got {value}.")
+        if value not in self.results:
+            predictions = self.predict(value)
+            mse = mean_squared_error(self.y_test, predictions)
+            self.results[value] = (mse, np.sqrt(mse), r2_score(self.y_test, predictions))
+        mse, rmse, r_squared = self.results[value]
+        if self.debug:
+            print(f"MSE: {mse}, RMSE: {rmse}, R²: {r_squared}")
+        return mse, rmse, r_squared
+
+    def __call__(self, hyperparameters):
+        return self.metrics(hyperparameters)[0]  # Optimize based on MSE by default
@@ -1,15 +1,30 @@
 import base64
 import json
+import os
+import uuid
 import pandas as pd
 import numpy as np
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.conf import settings
+from django.core.files.storage import default_storage
 from django.contrib.auth import authenticate, login
 from rest_framework import status
 from django.contrib.auth.models import User
 from rest_framework.views import APIView
 
+from dataset_manager.ingest import UPLOAD_DIR
+from dataset_manager.reader import read_dataset
+from dataset_manager.store import datasets, resolve_frame, frame_response, wants_records
+from dataset_manager.wire import read_body
+from dataset_manager.window import filter_result
+from jobs.events import report_progress
+from jobs.runner import run_as_job
+from .inference import to_python
+from .registry import models, resolve_model
+from .scoring import STREAM_TYPES, ChunkWriter, file_chunks, frame_chunks, score_chunks
 from .Matflow_Main.modules import utils
 from .Matflow_Main.modules.classes import imputer
 from .Matflow_Main.modules.classifier import knn, svm, log_reg, decision_tree, random_forest, perceptron
@@ -25,6 +40,7 @@ from .Matflow_Main.modules.feature.encoding import encoding
 from .Matflow_Main.modules.feature.merge_dataset import merge_df
 from .Matflow_Main.modules.feature.scaling import scaling
 from .Matflow_Main.modules.model.classification import classification
+from .Matflow_Main.modules.model.leaderboard import leaderboard
 from .Matflow_Main.modules.model.model_report import model_report
 from .Matflow_Main.modules.model.prediction_classification import prediction_classification
 from .Matflow_Main.modules.model.prediction_regression import prediction_regression
@@ -38,6 +54,9 @@ from .Matflow_Main.subpage.temp import temp
 from .Matflow_Main.subpage.time_series import  time_series
 from .Matflow_Main.subpage.time_series_analysis import  time_series_analysis
 
+DATASET_DIR = os.path.join(settings.BASE_DIR, 'dataset')
+BATCH_CHUNKSIZE = getattr(settings, 'BATCH_PREDICT_CHUNKSIZE', 50000)
+
 
 @api_view(['POST'])
 def signup(request):
@@ -79,10 +98,9 @@ def login(request):
 #     return HttpResponse("hello")
 @api_view(['GET', 'POST'])
 def display_group(request):
-    data = json.loads(request.body)
-    file = data.get('file')
+    data = read_body(request)
     # file=pd.read_csv(file)
-    file = pd.DataFrame(file)
+    file = resolve_frame(data)
     group_var = data.get("group_var")
     agg_func = data.get("agg_func")
     numeric_columns = file.select_dtypes(include='number').columns
@@ -91,9 +109,8 @@ def display_group(request):
     return JsonResponse({'data': data})
 @api_view(['GET', 'POST'])
 def display_correlation(request):
-    data = json.loads(request.body)
-    file = data.get('file')
-    file = pd.DataFrame(file)
+    data = read_body(request)
+    file = resolve_frame(data)
     correlation_method="kendall"
     file = file.select_dtypes(include='number')
     correlation_data =file.corr(correlation_method)
@@ -101,7 +118,7 @@ def display_correlation(request):
     return JsonResponse({'data': data})
 @api_view(['GET','POST'])
 def display_correlation_featurePair(request):
-    data = json.loads(request.body)
+    data = read_body(request)
     correlation_data =pd.DataFrame(data.get('file'))
     bg_gradient= data.get('gradient')
     feature1 = data.get('feature1')
@@ -114,31 +131,31 @@ def display_correlation_featurePair(request):
     return JsonResponse({'data': data})
 @api_view(['GET','POST'])
 def display_correlation_heatmap(request):
-    data = json.loads(request.body)
+    data = read_body(request)
     correlation_data =pd.DataFrame(data.get('file'))
     response= display_heatmap(correlation_data)
     return response
 @api_view(['GET','POST'])
 def feature_creation(request):
-    data=json.loads(request.body)
+    data=read_body(request)
     response = creation(data)
     return response
 @api_view(['GET','POST'])
 def changeDtype(request):
-    data=json.loads(request.body)
+    data=read_body(request)
     response = Change_dtype(data)
     return response
 @api_view(['GET','POST'])
 def Alter_field(request):
-    data=json.loads(request.body)
+    data=read_body(request)
     response = change_field_name(data)
     return response
 from numpyencoder import NumpyEncoder
 @api_view(['GET','POST'])
 def feature_selection_api(request):
     if request.method == 'POST':
-        data = json.loads(request.body)
-        dataset = pd.DataFrame(data.get('dataset')).reset_index(drop=True)
+        data = read_body(request, 'dataset')
+        dataset = resolve_frame(data, 'dataset').reset_index(drop=True)
         # table_name = data['table_name']
         target_var = data.get('target_var')
         method = data.get('method')
@@ -152,8 +169,8 @@ def feature_selection_api(request):
         return JsonResponse({'error': 'Invalid request method'})
 @api_view(['GET','POST'])
 def imputation_data1(request):
-    file=json.loads(request.body)
-    data=pd.DataFrame(file.get('file'))
+    file=read_body(request)
+    data=resolve_frame(file)
     # num_var = utils.get_numerical(data)
     null_var = utils.get_null(data)
     low_cardinality = utils.get_low_cardinality(data, add_hypen=True)
@@ -165,8 +182,8 @@ def imputation_data1(request):
 
 @api_view(['GET','POST'])
 def imputation_data2(request):
-    file=json.loads(request.body)
-    data=pd.DataFrame(file.get('file'))
+    file=read_body(request)
+    data=resolve_frame(file)
     var=file.get('Select_columns')
     num_var = utils.get_numerical(data)
     category=''
@@ -192,8 +209,8 @@ def imputation_data2(request):
 
 @api_view(['GET', 'POST'])
 def imputation_result(request):
-    file = json.loads(request.body)
-    data=pd.DataFrame(file.get('file'))
+    file = read_body(request)
+    data=resolve_frame(file)
     strat,fill_group ,constant=None, None,0
     strat=file.get('strategy')
     fill_group=file.get('fill_group')
@@ -205,6 +222,8 @@ def imputation_result(request):
     imp = imputer.Imputer(strategy=strat, columns=[var], fill_value=constant, group_col=fill_group)
     new_value = imp.fit_transform(data)
     new_value=new_value.reset_index()
+    if not wants_records(file):
+        return frame_response(new_value, file)
     new_value=new_value.to_dict(orient='records')
 
     response = {
@@ -214,54 +233,55 @@ def imputation_result(request):
 
 @api_view(['GET','POST'])
 def merge_dataset(request):
-    data=json.loads(request.body)
+    data=read_body(request)
     response = merge_df(data)
     return response
 @api_view(['GET','POST'])
 def Encoding(request):
-    data=json.loads(request.body)
+    data=read_body(request)
     response = encoding(data)
     return response
 @api_view(['GET','POST'])
 def Scaling(request):
-    data=json.loads(request.body)
+    data=read_body(request)
     response = scaling(data)
     return response
 @api_view(['GET','POST'])
 def Drop_column(request):
-    data=json.loads(request.body)
+    data=read_body(request)
     response = drop_column(data)
     return response
 @api_view(['GET','POST'])
 def Drop_row(request):
-    data=json.loads(request.body)
+    data=read_body(request)
     response = drop_row(data)
     return response
 @api_view(['GET','POST'])
 def Append(request):
-    data=json.loads(request.body)
+    data=read_body(request)
     response = append(data)
     return response
 @api_view(['GET','POST'])
 def Cluster(request):
-    data=json.loads(request.body)
+    data=read_body(request)
     response = cluster_dataset(data)
     return response
 @api_view(['GET','POST'])
 def Split(request):
-    data=json.loads(request.body)
+    data=read_body(request)
     response = split_dataset(data)
     return response
 @api_view(['GET','POST'])
 def Build_model(request):
-    data=json.loads(request.body)
+    data=read_body(request)
     response = split_dataset(data)
     return response
+@run_as_job
 @api_view(['GET','POST'])
 def Hyper_opti(request):
-    data=json.loads(request.body)
-    train_data=pd.DataFrame(data.get("train"))
-    test_data=pd.DataFrame(data.get("test"))
+    data=read_body(request)
+    train_data=resolve_frame(data, "train")
+    test_data=resolve_frame(data, "test")
     target_var=data.get("target_var")
     # print(f"{train_data.head} {test_data.head} {target_var}")
     X_train, y_train = split_xy(train_data, target_var)
@@ -298,7 +318,7 @@ def Hyper_opti(request):
     return response
 @api_view(['GET','POST'])
 def Build_model(request):
-    data=json.loads(request.body)
+    data=read_body(request)
     type=data.get("type")
     if(type== "classifier"):
         response = classification(data)
@@ -307,12 +327,22 @@ def Build_model(request):
     return response
 @api_view(['GET','POST'])
 def model_evaluation(request):
-    data=json.loads(request.body)
+    data=read_body(request)
+    if data.get("model_ids") and not data.get("file"):
+        # Compare registered models by the metrics stored with them
+        data["file"] = [dict(models.get_result(model_id), name=models.get_meta(model_id).get("name") or model_id)
+                        for model_id in data.get("model_ids")]
     response = model_report(data)
     return response
+@run_as_job
+@api_view(['GET','POST'])
+def Leaderboard(request):
+    data=read_body(request)
+    response = leaderboard(data)
+    return response
 @api_view(['GET','POST'])
 def model_prediction(request):
-    data=json.loads(request.body)
+    data=read_body(request)
     type=data.get("type")
     if(type=="regressor"):
         response=prediction_regression(data)
@@ -322,14 +352,160 @@ def model_prediction(request):
 import pickle
 from django.http import HttpResponse
 @api_view(['GET','POST'])
-def download_model(file):
-    model = pickle.loads(file.get("model"))
-    model_binary = pickle.dumps(model)
+def download_model(request):
+    file = read_body(request)
+    model_id = file.get("model_id")
+    if model_id:
+        model_binary = models.dumps(model_id)
+        model_name = models.get_meta(model_id).get("name") or model_id
+    else:
+        model_binary = pickle.dumps(resolve_model(file))
+        model_name = file.get("model_name", "model")
     response = HttpResponse(model_binary, content_type='application/octet-stream')
-    response['Content-Disposition'] = f'attachment; filename="model_name".pkl"'
+    response['Content-Disposition'] = f'attachment; filename="{model_name}.pkl"'
     return response
 
 
+@api_view(['GET'])
+def list_models(request):
+    return JsonResponse([models.get_meta(model_id) for model_id in models.list_name()], safe=False)
+
+
+@api_view(['GET', 'DELETE'])
+def model_handle(request, model_id):
+    """
+    GET returns the metadata of a registered model, DELETE removes it.
+    """
+    if request.method == 'DELETE':
+        models.delete_model(model_id)
+        return JsonResponse({"message": "Model deleted successfully!"})
+    return JsonResponse(models.get_meta(model_id))
+
+
+@csrf_exempt
+def predict(request, model_id=None):
+    """
+    Online prediction with a registered model, kept unpickled between calls.
+    Expects 'row', an object of feature values (missing ones are 0) or a list
+    in feature order, or 'rows', a list of those. Single rows sent at the
+    same time are predicted together in one call.
+    """
+    if request.method != 'POST':
+        return HttpResponse(status=405)
+    try:
+        body = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON data"}, status=400)
+    model_id = model_id or body.get("model_id")
+    if not model_id:
+        return JsonResponse({"error": "model_id is required."}, status=400)
+    predictor = models.get(model_id).predictor
+    try:
+        if body.get("rows") is not None:
+            pred = to_python(predictor.predict_many(body["rows"]))
+        elif body.get("row") is not None:
+            pred = to_python(predictor.predict_one(body["row"]))
+        else:
+            return JsonResponse({"error": "Send either 'row' or 'rows'."}, status=400)
+    except (ValueError, TypeError) as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse({"model_id": model_id, "pred": pred})
+
+
+@run_as_job
+@csrf_exempt
+def batch_predict(request):
+    """
+    Score a whole dataset with a registered model, chunk by chunk.
+
+    The input is an uploaded CSV/Parquet 'file' (multipart, other parameters
+    as form fields), a 'dataset_id', or 'folder' and 'file' naming a file in
+    the dataset directory. Predictions, probabilities for classifiers and the
+    'keep_columns' of the input are written to 'output_name' (CSV, or
+    Parquet by extension) in 'output_folder'. 'n_jobs' > 1 scores chunks of
+    'chunksize' rows on worker processes.
+    """
+    if request.method != 'POST':
+        return HttpResponse(status=405)
+    upload = request.FILES.get('file')
+    if request.content_type.startswith('multipart/'):
+        params = request.POST.dict()
+        params['keep_columns'] = request.POST.getlist('keep_columns')
+    else:
+        try:
+            params = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({"error": "Invalid JSON data"}, status=400)
+
+    model_id = params.get("model_id")
+    if not model_id:
+        return JsonResponse({"error": "model_id is required."}, status=400)
+    entry = models.get(model_id)
+    chunksize = int(params.get("chunksize", BATCH_CHUNKSIZE))
+    n_jobs = int(params.get("n_jobs", 1))
+    proba = str(params.get("probabilities", True)).lower() not in ("false", "0") and hasattr(entry.model, "predict_proba")
+    folder = params.get("folder", "")
+    total = None
+
+    upload_path = None
+    if upload:
+        stem, extension = os.path.splitext(upload.name)
+        if extension.lower() not in STREAM_TYPES:
+            return JsonResponse({"error": "Upload a .csv or .parquet file."}, status=400)
+        # Kept out of the dataset directory, only the predictions are
+        upload_path = os.path.join(UPLOAD_DIR, uuid.uuid4().hex + extension.lower())
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        with open(upload_path, 'wb') as out:
+            for piece in upload.chunks():
+                out.write(piece)
+        chunks = file_chunks(upload_path, chunksize)
+    elif params.get("dataset_id"):
+        df = datasets.get_data(params.get("dataset_id"))
+        stem, total = params.get("dataset_id"), len(df)
+        chunks = frame_chunks(df, chunksize)
+    elif params.get("file"):
+        file_path = os.path.join(DATASET_DIR, folder, params.get("file"))
+        if not os.path.isfile(file_path):
+            return JsonResponse({"error": f"File '{params.get('file')}' not found."}, status=404)
+        stem, extension = os.path.splitext(params.get("file"))
+        if extension.lower() in STREAM_TYPES:
+            chunks = file_chunks(file_path, chunksize)
+        else:
+            df = read_dataset(file_path)  # Excel files can't be streamed
+            total = len(df)
+            chunks = frame_chunks(df, chunksize)
+    else:
+        return JsonResponse({"error": "Send a 'file' upload, a 'dataset_id', or 'folder' and 'file'."}, status=400)
+
+    output_folder = params.get("output_folder", folder)
+    output_path = default_storage.get_available_name(
+        os.path.join(DATASET_DIR, output_folder, params.get("output_name") or f"{stem}_predictions.csv"))
+    writer = ChunkWriter(output_path)
+    try:
+        for out in score_chunks(chunks, entry.model, entry.meta.get("features"), proba,
+                                params.get("keep_columns") or None, n_jobs):
+            writer.write(out)
+            report_progress('scoring', done=writer.n_rows, total=total)
+        writer.close()
+    except (KeyError, ValueError) as e:
+        writer.abort()
+        return JsonResponse({"error": f"Cannot score this data: {str(e)}"}, status=400)
+    except BaseException:
+        writer.abort()
+        raise
+    finally:
+        if upload_path and os.path.exists(upload_path):
+            os.remove(upload_path)
+
+    return JsonResponse({
+        "model_id": model_id,
+        "folder": output_folder,
+        "file": os.path.basename(output_path),
+        "n_rows": writer.n_rows,
+        "columns": writer.columns,
+    }, status=201)
+
+
 import json
 import numpy as np
 import pandas as pd
@@ -351,14 +527,14 @@ def deploy_data(request):
 
     # Step 1: Parse the incoming JSON data
     try:
-        file = json.loads(request.body)
+        file = read_body(request, 'train')
         print("Parsed JSON data successfully.")
     except json.JSONDecodeError as e:
         print(f"JSON decoding failed: {e}")
         return JsonResponse({"error": "Invalid JSON data"}, status=status.HTTP_400_BAD_REQUEST)
 
     # Step 2: Convert 'train' data to a Pandas DataFrame
-    train_data = pd.DataFrame(file.get('train'))
+    train_data = resolve_frame(file, 'train').copy()
     print(f"train_data created with shape: {train_data.shape}")
     print(f"train_data columns: {train_data.columns.tolist()}")
 
@@ -511,17 +687,20 @@ def deploy_data(request):
 
 @api_view(['GET','POST'])
 def deploy_result(request):
-    file = json.loads(request.body)
-    model_bytes = base64.b64decode(file.get("model_deploy"))
-    model = pickle.loads(model_bytes)
+    file = read_body(request, 'train')
+    model = resolve_model(file)
     result = file.get("result")
-    train_data = pd.DataFrame(file.get('train'))
     target_var=file.get('target_var')
     col_names_all = []
     col_names=[]
-    for i in train_data.columns:
-        if i!=target_var:
-            col_names_all.append(i)
+    if file.get("model_id") and not (file.get("train") or file.get("train_id")):
+        # The registry knows the features, no need to send the training data
+        col_names_all = models.get_meta(file.get("model_id")).get("features")
+    else:
+        train_data = resolve_frame(file, 'train')
+        for i in train_data.columns:
+            if i!=target_var:
+                col_names_all.append(i)
     col_names.extend(result.keys())
     X = [result[i] if i in col_names  else 0 for i in col_names_all]
     # prediction = model.get_prediction(model_name, [X])
@@ -532,17 +711,18 @@ def deploy_result(request):
     return JsonResponse(obj)
 @api_view(['GET','POST'])
 def Time_series(request):
-    data=json.loads(request.body)
+    data=read_body(request)
     response = time_series(data)
     return response
 @api_view(['GET','POST'])
 def Time_series_analysis(request):
-    data=json.loads(request.body)
+    data=read_body(request)
     response = time_series_analysis(data)
     return response
+@run_as_job
 @api_view(['GET','POST'])
 def Reverse_ml(request):
-    data=json.loads(request.body)
+    data=read_body(request)
     response = reverse_ml(data)
     return response
 
@@ -570,36 +750,8 @@ def filter_data(data, params, display_var):
 
     return result
 
-def filter_result(data, filter_var, filter_operator, filter_value):
-    if filter_operator == "<":
-        result = data.loc[data[filter_var] < filter_value]
-    elif filter_operator == ">":
-        result = data.loc[data[filter_var] > filter_value]
-    elif filter_operator == "==":
-        if type(filter_value) != str:  # np.isna() cannot pass str as parameter
-            if np.isnan(filter_value):  # check if value is nan
-                result = data.loc[data[filter_var].isna() == True]
-            else:
-                result = data.loc[data[filter_var] == filter_value]
-        else:
-            result = data.loc[data[filter_var] == filter_value]
-    elif filter_operator == "<=":
-        result = data.loc[data[filter_var] <= filter_value]
-    elif filter_operator == ">=":
-        result = data.loc[data[filter_var] >= filter_value]
-    else:
-        if type(filter_value) != str:  # np.isna() cannot pass str as parameter
-            if np.isnan(filter_value):  # check if value is nan
-                result = data.loc[data[filter_var].isna() == False]
-            else:
-                result = data.loc[data[filter_var] == filter_value]
-        else:
-            result = data.loc[data[filter_var] != filter_value]
-
-    return result
-
 
-from .utils import objective_function  # Import the objective function
+from .utils import HyperparameterObjective  # Import the objective function
 from pyswarm import pso
 
 
@@ -623,10 +775,18 @@ class PsoOptimizeModel(APIView):
         minfunc = data.get('minfunc', 1e-8)
         debug = data.get('debug', True)
 
+        # Built once per request: the data is converted and every fit memoized for the whole swarm
+        try:
+            objective = HyperparameterObjective(model_type, X_train_scaled, y_train, X_test_scaled, y_test, debug)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if lb[0] <= 0:
+            return Response({'error': f"'lb' must be positive, {model_type} needs a positive {objective.parameter}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
         best_params, best_mse = pso(
-            objective_function,
+            objective,
             lb, ub,
-            args=(model_type, X_train_scaled, y_train, X_test_scaled, y_test, debug),
             swarmsize=swarmsize,
             maxiter=maxiter,
             minstep=minstep,
@@ -636,13 +796,12 @@ class PsoOptimizeModel(APIView):
             phig=phig
         )
 
-        # Re-run model with best params for additional metrics
-        final_metrics = objective_function(best_params, model_type, X_train_scaled, y_train, X_test_scaled, y_test,
-                                           debug=False)
-        final_mse, final_rmse, final_r_squared = final_metrics
+        # Additional metrics of the best params, from the memoized fit
+        objective.debug = False
+        final_mse, final_rmse, final_r_squared = objective.metrics(best_params)
 
         return Response({
-            'best_params': best_params,
+            'best_params': list(best_params),
             'MSE': best_mse,
             'RMSE': final_rmse,
             'R²': final_r_squared
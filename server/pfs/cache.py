@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import closing
+
+from django.conf import settings
+from sklearn.model_selection import cross_validate
+
+from dataset_manager.cache import LRUCache, column_hash
+
+SCORE_CACHE_MEMORY = getattr(settings, 'PFS_SCORE_CACHE_MEMORY', 64 * 1024 ** 2)
+# Set PFS_SCORE_CACHE_DISK to False to keep scores in memory only
+SCORE_CACHE_DISK = getattr(settings, 'PFS_SCORE_CACHE_DISK', True)
+SCORE_CACHE_ROWS = getattr(settings, 'PFS_SCORE_CACHE_ROWS', 1000000)
+SCORE_DB = os.path.join(settings.BASE_DIR, 'dataset', '.cache', 'scores.sqlite3')
+
+
+class ScoreCache:
+    """
+    Cross-validation scores of feature subsets, most recently used in memory
+    and optionally all of them in an SQLite file shared by the server processes.
+    """
+
+    def __init__(self, max_bytes, db_path=None, max_rows=SCORE_CACHE_ROWS):
+        self.memory = LRUCache(max_bytes)
+        self.db_path = db_path
+        self.max_rows = max_rows
+
+    def connect(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('CREATE TABLE IF NOT EXISTS scores (key TEXT PRIMARY KEY, scores TEXT NOT NULL)')
+        return conn
+
+    def get(self, key):
+        scores = self.memory.get(key)
+        if scores is None and self.db_path:
+            with closing(self.connect()) as conn:
+                row = conn.execute('SELECT scores FROM scores WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                scores = json.loads(row[0])
+                self.memory.put(key, scores)
+        return scores
+
+    def put(self, key, scores):
+        self.memory.put(key, scores)
+        if not self.db_path:
+            return
+        with closing(self.connect()) as conn, conn:
+            rowid = conn.execute('INSERT OR REPLACE INTO scores (key, scores) VALUES (?, ?)',
+                                 (key, json.dumps(scores))).lastrowid
+            if rowid % 1000 == 0:
+                # Every so often drop the oldest scores beyond the row budget
+                conn.execute('DELETE FROM scores WHERE rowid <= ?', (rowid - self.max_rows,))
+
+
+scores = ScoreCache(SCORE_CACHE_MEMORY, SCORE_DB if SCORE_CACHE_DISK else None)
+
+
+class SubsetScorer:
+    """
+    Scores feature subsets of X against y through the score cache.
+
+    Keys are built from per-column fingerprints rather than one hash of the
+    whole dataset, so adding a column or changing the display options leaves
+    the scores of every other subset valid.
+    """
+
+    def __init__(self, X, y, estimator, kfold, scoring, sign):
+        self.X = X
+        self.y = y
+        self.estimator = estimator
+        self.kfold = kfold
+        self.scoring = scoring
+        self.sign = sign
+        self.hashes = {}
+        # Not repr(estimator): sklearn truncates it past 700 characters
+        params = json.dumps(estimator.get_params(deep=True), sort_keys=True, default=str)
+        self.base = '|'.join([column_hash(y), f"{type(estimator).__module__}.{type(estimator).__qualname__}",
+                              params, str(kfold), ','.join(scoring), str(sign)])
+
+    def key(self, features):
+        for feature in features:
+            if feature not in self.hashes:
+                self.hashes[feature] = column_hash(self.X[feature])
+        return hashlib.sha1('|'.join([self.base] + [self.hashes[f] for f in features]).encode()).hexdigest()
+
+    def cached(self, features):
+        return scores.get(self.key(features))
+
+    def store(self, features, row):
+        scores.put(self.key(features), row)
+
+    def score(self, features, cv=None, n_jobs=-1):
+        """
+        Rounded mean score of every metric for X[features], from the cache
+        when this subset was scored before. `cv` may pass precomputed folds
+        equal to the ones `kfold` selects.
+        """
+        row = self.cached(features)
+        if row is None:
+            result = cross_validate(self.estimator, self.X[features], self.y, cv=self.kfold if cv is None else cv,
+                                    scoring=self.scoring, n_jobs=n_jobs)
+            row = [round(result['test_' + score].mean() * self.sign, 4) for score in self.scoring]
+            self.store(features, row)
+        return row
@@ -0,0 +1,84 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from sklearn.base import clone
+from sklearn.model_selection import cross_validate
+
+# Set once per worker process by init_worker, so every candidate only ships its feature list
+_state = {}
+
+
+def init_worker(estimator, X, y, folds, scoring, sign):
+    if 'n_jobs' in estimator.get_params():
+        # The pool already uses every core, don't let e.g. XGBoost start threads on top
+        estimator = clone(estimator).set_params(n_jobs=1)
+    _state.update(estimator=estimator, X=X, y=y, folds=folds, scoring=scoring, sign=sign)
+
+
+def score_subset(features, state=_state):
+    """
+    Cross-validate the estimator on a subset of features with the shared folds.
+    Returns the features and the mean score of every metric, rounded like the
+    rest of the feature selection results.
+    """
+    scores = cross_validate(state['estimator'], state['X'][features], state['y'],
+                            cv=state['folds'], scoring=state['scoring'], n_jobs=1)
+    return features, [round(scores['test_' + score].mean() * state['sign'], 4) for score in state['scoring']]
+
+
+class CandidatePool:
+    """
+    Scores feature subsets across worker processes.
+
+    The data, estimator and fold indices are sent to each worker once when the
+    pool starts, and the pool is reused for every round of the selection.
+    With n_jobs=1 the subsets are scored in this process. Subsets found in
+    `cache` (a SubsetScorer) are not scored again.
+    """
+
+    def __init__(self, estimator, X, y, folds, scoring, sign, n_jobs=-1, cache=None):
+        self.workers = (os.cpu_count() or 1) if n_jobs is None or n_jobs < 0 else max(n_jobs, 1)
+        self.state = dict(estimator=estimator, X=X, y=y, folds=folds, scoring=scoring, sign=sign)
+        self.cache = cache
+        self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+    def score(self, subsets):
+        """
+        Yield (features, scores) for every subset, cached ones first and the
+        others in order of completion.
+        """
+        missing = []
+        for features in subsets:
+            row = self.cache.cached(features) if self.cache else None
+            if row is None:
+                missing.append(features)
+            else:
+                yield features, row
+        for features, row in self.compute(missing):
+            if self.cache:
+                self.cache.store(features, row)
+            yield features, row
+
+    def compute(self, subsets):
+        if self.executor is None and self.workers > 1 and subsets:
+            # Started on first use, a fully cached run never pays for the pool. Not forked:
+            # the request thread would copy the server's locks, database connections and caches
+            context = multiprocessing.get_context(
+                'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+            self.executor = ProcessPoolExecutor(self.workers, mp_context=context, initializer=init_worker,
+                                                initargs=tuple(self.state.values()))
+        if self.executor is None:
+            for features in subsets:
+                yield score_subset(features, self.state)
+            return
+        futures = [self.executor.submit(score_subset, features) for features in subsets]
+        for future in as_completed(futures):
+            yield future.result()
@@ -4,8 +4,9 @@ from rest_framework import serializers
 class FeatureSelectionSerializer(serializers.Serializer):
     dataset = serializers.ListField(
         child=serializers.DictField(),
-        required=True
+        required=False
     )
+    dataset_id = serializers.CharField(required=False)
     target_var = serializers.CharField(required=True)
     problem_type = serializers.ChoiceField(choices=['regression', 'classification'])
     estimator_name = serializers.ChoiceField(choices=[
@@ -17,3 +18,11 @@ class FeatureSelectionSerializer(serializers.Serializer):
     features_to_display = serializers.ListField(
         child=serializers.CharField(), required=False, allow_null=True, allow_empty=True
     )
+    # Candidates are scored in this many processes (-1 for every core)
+    n_jobs = serializers.IntegerField(default=-1)
+    # Pruning: only the best ranked remaining features compete in a round,
+    # rounds without improvement tolerated before stopping, and a mutual
+    # information pre-screen keeping this many features
+    beam_width = serializers.IntegerField(required=False, allow_null=True, min_value=1)
+    patience = serializers.IntegerField(default=0, min_value=0)
+    prescreen = serializers.IntegerField(required=False, allow_null=True, min_value=1)
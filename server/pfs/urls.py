@@ -1,7 +1,8 @@
 from django.urls import path, include
 
+from jobs.runner import run_as_job
 from .views import FeatureSelectionAPIView
 
 urlpatterns = [
-    path('pfs/', FeatureSelectionAPIView.as_view(), name='progressive_feature_selection'),
+    path('pfs/', run_as_job(FeatureSelectionAPIView.as_view()), name='progressive_feature_selection'),
 ]
\ No newline at end of file
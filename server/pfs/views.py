@@ -8,32 +8,50 @@ import pandas as pd
 from sklearn.ensemble import ExtraTreesRegressor, ExtraTreesClassifier
 from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
 from sklearn.ensemble import GradientBoostingRegressor, GradientBoostingClassifier
-from sklearn.model_selection import cross_validate
+from sklearn.base import is_classifier
+from sklearn.feature_selection import mutual_info_classif, mutual_info_regression
+from sklearn.model_selection import check_cv
 from xgboost import XGBRegressor, XGBClassifier
 import plotly.graph_objects as go
 import io
 import base64
 
+from dataset_manager.store import resolve_frame
+from dataset_manager.wire import ArrowStreamParser
+from jobs.events import report_progress
+from .cache import SubsetScorer
+from .pool import CandidatePool
 from .serializer import FeatureSelectionSerializer
 
 
 class FeatureSelectionAPIView(APIView):
-    parser_classes = (JSONParser,)  # Use JSONParser since data is in JSON format
+    parser_classes = (JSONParser, ArrowStreamParser)  # JSON records or an Arrow stream of the dataset
+    arrow_key = 'dataset'
 
     def post(self, request, format=None):
-        serializer = FeatureSelectionSerializer(data=request.data)
+        params = dict(request.data)
+        # An Arrow body arrives as a DataFrame, which the serializer can't validate
+        frame = params.pop('dataset') if isinstance(params.get('dataset'), pd.DataFrame) else None
+        serializer = FeatureSelectionSerializer(data=params)
         if serializer.is_valid():
-            dataset_records = serializer.validated_data['dataset']
+            dataset_records = frame if frame is not None else serializer.validated_data.get('dataset')
+            dataset_id = serializer.validated_data.get('dataset_id')
+            if dataset_records is None and not dataset_id:
+                return Response({'error': "Either 'dataset' or 'dataset_id' is required."}, status=status.HTTP_400_BAD_REQUEST)
             target_var = serializer.validated_data['target_var']
             problem_type = serializer.validated_data['problem_type']
             estimator_name = serializer.validated_data['estimator_name']
             kfold = serializer.validated_data['kfold']
             display_opt = serializer.validated_data['display_opt']
             features_to_display = serializer.validated_data.get('features_to_display', None)
+            n_jobs = serializer.validated_data['n_jobs']
+            beam_width = serializer.validated_data.get('beam_width')
+            patience = serializer.validated_data['patience']
+            prescreen = serializer.validated_data.get('prescreen')
 
             # Convert dataset records to DataFrame
             try:
-                dataset = pd.DataFrame(dataset_records)
+                dataset = resolve_frame({'dataset': dataset_records, 'dataset_id': dataset_id}, 'dataset')
             except Exception as e:
                 return Response({'error': f"Error converting dataset to DataFrame: {str(e)}"}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -45,7 +63,11 @@ class FeatureSelectionAPIView(APIView):
                 estimator_name=estimator_name,
                 kfold=kfold,
                 display_opt=display_opt,
-                features_to_display=features_to_display
+                features_to_display=features_to_display,
+                n_jobs=n_jobs,
+                beam_width=beam_width,
+                patience=patience,
+                prescreen=prescreen
             )
 
             if 'error' in result:
@@ -55,7 +77,8 @@ class FeatureSelectionAPIView(APIView):
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-def feature_selection(dataset, target_var, problem_type, estimator_name, kfold=2, display_opt='None', features_to_display=None):
+def feature_selection(dataset, target_var, problem_type, estimator_name, kfold=2, display_opt='None', features_to_display=None,
+                      n_jobs=-1, beam_width=None, patience=0, prescreen=None):
     # Validate and prepare data
     try:
         if target_var not in dataset.columns:
@@ -105,69 +128,112 @@ def feature_selection(dataset, target_var, problem_type, estimator_name, kfold=2
         list_X = features_to_display
 
     to_sort_df = df_result.copy()
+    sign = 1 if problem_type == 'classification' else -1
+    primary_metric = 'F1' if problem_type == 'classification' else 'RMSE'
+
+    def improves(score, best):
+        return score > best if problem_type == 'classification' else score < best
 
-    # Stage 1: Calculating scores for each feature
-    for feature in list_X:
+    # Cheap filter before any model is fitted: keep the features sharing the most information with the target
+    prescreened = []
+    if prescreen and prescreen < len(list_X):
         try:
-            scores = cross_validate(estimator, X_n[[feature]], Y_n, cv=kfold, scoring=scoring, n_jobs=-1)
-            to_sort_df.loc[feature] = [
-                round(scores['test_' + score].mean() * (1 if problem_type == 'classification' else -1), 4) for score in scoring]
+            mutual_info = mutual_info_classif if problem_type == 'classification' else mutual_info_regression
+            mi = pd.Series(mutual_info(X_n[list_X], Y_n, random_state=0), index=list_X)
         except Exception as e:
-            return {'error': f"Error during cross-validation: {str(e)}"}
-
-    # Sort features based on primary metric
-    primary_metric = 'F1' if problem_type == 'classification' else 'RMSE'
-    to_sort_df = to_sort_df.sort_values(primary_metric, ascending=(problem_type == 'regression'))
-
-    # Stage 2: Feature Selection
-    list_X = to_sort_df.index.tolist()
-    selected = [list_X[0]]
-    selected_feature_scores = df_result.copy()
+            return {'error': f"Error during mutual information pre-screen: {str(e)}"}
+        keep = set(mi.nlargest(prescreen).index)
+        prescreened = [feature for feature in list_X if feature not in keep]
+        list_X = [feature for feature in list_X if feature in keep]
 
+    # The same folds cross_validate(cv=kfold) would pick, computed once and shared by every candidate
     try:
-        scores = cross_validate(estimator, X_n[selected], Y_n, cv=kfold, scoring=scoring, n_jobs=-1)
+        folds = list(check_cv(kfold, Y_n, classifier=is_classifier(estimator)).split(X_n, Y_n))
     except Exception as e:
         return {'error': f"Error during cross-validation: {str(e)}"}
-    selected_feature_scores.loc[list_X[0]] = [
-        round(scores['test_' + score].mean() * (1 if problem_type == 'classification' else -1), 4) for score in scoring]
-    list_X.remove(list_X[0])
 
-    all_features_scores = df_result.copy()
-    dropped_columns = df_result.copy()
-
-    while list_X:
-        var = df_result.copy()
+    cache = SubsetScorer(X_n, Y_n, estimator, kfold, scoring, sign)
+    with CandidatePool(estimator, X_n, Y_n, folds, scoring, sign, n_jobs, cache) as pool:
+        # Stage 1: Calculating scores for each feature
+        rows = {}
+        try:
+            for done, (features, row) in enumerate(pool.score([[feature] for feature in list_X]), 1):
+                rows[features[0]] = row
+                report_progress('ranking', done=done, total=len(list_X), feature=features[0])
+        except Exception as e:
+            return {'error': f"Error during cross-validation: {str(e)}"}
         for feature in list_X:
+            to_sort_df.loc[feature] = rows[feature]
+
+        # Sort features based on primary metric
+        to_sort_df = to_sort_df.sort_values(primary_metric, ascending=(problem_type == 'regression'))
+
+        # Stage 2: Feature Selection, starting from the best single feature scored in stage 1
+        list_X = to_sort_df.index.tolist()
+        selected = [list_X[0]]
+        selected_feature_scores = df_result.copy()
+        selected_feature_scores.loc[list_X[0]] = to_sort_df.loc[list_X[0]]
+        best_score = selected_feature_scores[primary_metric].iloc[-1]
+        list_X.remove(list_X[0])
+
+        all_features_scores = df_result.copy()
+        dropped_columns = df_result.copy()
+
+        evaluated = 0
+        pending = []  # Added in rounds that didn't improve, kept only if a later round does
+        while list_X:
+            # Beam: only the best ranked remaining features compete in a round
+            candidates = list_X[:beam_width] if beam_width else list_X
+            base = selected + [feature for feature, _ in pending]
+            rows = {}
             try:
-                scores = cross_validate(estimator, X_n[selected + [feature]], Y_n, cv=kfold, scoring=scoring, n_jobs=-1)
-                var.loc[feature] = [round(scores['test_' + score].mean() * (1 if problem_type == 'classification' else -1), 4) for
-                                  score in scoring]
+                for done, (features, row) in enumerate(pool.score([base + [feature] for feature in candidates]), 1):
+                    rows[features[-1]] = row
+                    evaluated += 1
+                    report_progress('selection', done=done, total=len(candidates), round=len(base),
+                                    candidates_evaluated=evaluated, selected=list(selected),
+                                    best_score=float(best_score))
             except Exception as e:
                 return {'error': f"Error during cross-validation: {str(e)}"}
-
-        var = var.sort_values(primary_metric, ascending=(problem_type == 'regression'))
-        best_feature = var.index[0]
-        list_X.remove(best_feature)
-
-        metric_improved = (
-            var.iloc[0][primary_metric] > selected_feature_scores[primary_metric].iloc[-1]
-            if problem_type == 'classification'
-            else var.iloc[0][primary_metric] < selected_feature_scores[primary_metric].iloc[-1]
-        )
-
-        if metric_improved:
-            selected_feature_scores.loc[best_feature] = var.iloc[0]
-            all_features_scores.loc[best_feature] = var.iloc[0]
-            selected.append(best_feature)
-        else:
-            for feature in var.index:
-                all_features_scores.loc[feature] = var.loc[feature]
-                dropped_columns.loc[feature] = var.loc[feature]
-            break
+            var = df_result.copy()
+            for feature in candidates:
+                var.loc[feature] = rows[feature]
+
+            var = var.sort_values(primary_metric, ascending=(problem_type == 'regression'))
+            best_feature = var.index[0]
+            list_X.remove(best_feature)
+
+            if improves(var.iloc[0][primary_metric], best_score):
+                for feature, row in pending + [(best_feature, var.iloc[0])]:
+                    selected_feature_scores.loc[feature] = row
+                    all_features_scores.loc[feature] = row
+                    selected.append(feature)
+                pending = []
+                best_score = var.iloc[0][primary_metric]
+            elif len(pending) < patience:
+                pending.append((best_feature, var.iloc[0]))
+            else:
+                for feature, row in pending:
+                    all_features_scores.loc[feature] = row
+                    dropped_columns.loc[feature] = row
+                pending = []
+                for feature in var.index:
+                    all_features_scores.loc[feature] = var.loc[feature]
+                    dropped_columns.loc[feature] = var.loc[feature]
+                # Features outside the beam were never tried with the selection, keep their stage 1 score
+                for feature in list_X:
+                    if feature not in var.index:
+                        dropped_columns.loc[feature] = to_sort_df.loc[feature]
+                break
+
+        # Ran out of features while waiting for an improvement
+        for feature, row in pending:
+            all_features_scores.loc[feature] = row
+            dropped_columns.loc[feature] = row
 
     # Prepare results
     selected_features = list(selected_feature_scores.index.values)
-    dropped_features = list(dropped_columns.index.values)
+    dropped_features = list(dropped_columns.index.values) + prescreened
 
     # Generate plot data
     plot_data = feature_graph(selected_feature_scores, all_features_scores, problem_type, dropped_columns)
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from sklearn.linear_model import ElasticNet, Lasso, LinearRegression, Ridge
+from sklearn.neural_network import MLPRegressor
+from sklearn.svm import SVR
+
+LINEAR_MODELS = (LinearRegression, Ridge, Lasso, ElasticNet)
+
+
+def affine_scaling(scaler):
+    """
+    (offset, scale) such that scaler.transform(x) == x * scale + offset, for
+    per-feature scalers such as MinMaxScaler or StandardScaler.
+    """
+    n_features = scaler.n_features_in_
+    columns = getattr(scaler, 'feature_names_in_', None)
+    offset = scaler.transform(pd.DataFrame(np.zeros((1, n_features)), columns=columns))[0]
+    scale = scaler.transform(pd.DataFrame(np.ones((1, n_features)), columns=columns))[0] - offset
+    return offset, scale
+
+
+def random_start(seed, lb, ub):
+    rng = np.random.RandomState(seed)
+    return lb + rng.rand(len(lb)) * (ub - lb)
+
+
+class LinearInverse:
+    """
+    Exact inverse of a linear surrogate, f(x) = a.x + c.
+
+    Every seed draws a random point in the bounds and returns the closest point
+    to it on the plane a.x = target within the bounds, so different seeds give
+    different, equally exact solutions. That point is clip(x0 - l*a, lb, ub)
+    for the multiplier l found by bisection. Targets out of reach give the
+    closest corner of the box.
+    """
+
+    def __init__(self, coef, intercept, offset, scale):
+        self.a = coef * scale
+        self.c = coef @ offset + intercept
+
+    def solve(self, seed, lb, ub, target):
+        a = self.a
+        x0 = random_start(seed, lb, ub)
+        if not np.any(a):
+            return x0
+        reachable = np.sum(np.minimum(a * lb, a * ub)), np.sum(np.maximum(a * lb, a * ub))
+        d = np.clip(target - self.c, *reachable)
+
+        # a.clip(x0 - l*a) decreases with l, and is constant beyond +-limit
+        limit = np.max((ub - lb)[a != 0] / np.abs(a[a != 0])) * 2
+        low, high = -limit, limit
+        for _ in range(100):
+            mid = (low + high) / 2
+            if a @ np.clip(x0 - mid * a, lb, ub) > d:
+                low = mid
+            else:
+                high = mid
+        return np.clip(x0 - (low + high) / 2 * a, lb, ub)
+
+
+class GradientInverse:
+    """
+    Inverse of a smooth surrogate by bounded L-BFGS-B on (f(x) - target)^2,
+    started from a random point in the bounds for every seed.
+
+    `value_and_grad` returns the prediction and its gradient for one scaled
+    sample.
+    """
+
+    def __init__(self, value_and_grad, offset, scale):
+        self.value_and_grad = value_and_grad
+        self.offset = offset
+        self.scale = scale
+
+    def solve(self, seed, lb, ub, target):
+        def loss(x):
+            value, grad = self.value_and_grad(x * self.scale + self.offset)
+            residual = value - target
+            return residual ** 2, 2 * residual * grad * self.scale
+
+        result = minimize(loss, random_start(seed, lb, ub), jac=True, method='L-BFGS-B', bounds=list(zip(lb, ub)))
+        return np.clip(result.x, lb, ub)
+
+
+def svr_rbf_gradient(svr):
+    support = svr.support_vectors_
+    alpha = svr.dual_coef_.ravel()
+    intercept = svr.intercept_[0]
+    gamma = svr._gamma
+
+    def value_and_grad(xs):
+        diff = xs - support
+        weights = alpha * np.exp(-gamma * np.sum(diff ** 2, axis=1))
+        return weights.sum() + intercept, -2 * gamma * (weights @ diff)
+    return value_and_grad
+
+
+ACTIVATIONS = {
+    'identity': (lambda z: z, lambda a: np.ones_like(a)),
+    'relu': (lambda z: np.maximum(z, 0), lambda a: (a > 0).astype(float)),
+    'tanh': (np.tanh, lambda a: 1 - a ** 2),
+    'logistic': (lambda z: 1 / (1 + np.exp(-z)), lambda a: a * (1 - a)),
+}
+
+
+def mlp_gradient(mlp):
+    activation, derivative = ACTIVATIONS[mlp.activation]
+
+    def value_and_grad(xs):
+        # Forward pass keeping the hidden activations, then back-propagate to the input
+        hidden = []
+        a = xs
+        for W, b in zip(mlp.coefs_[:-1], mlp.intercepts_[:-1]):
+            a = activation(a @ W + b)
+            hidden.append(a)
+        value = (a @ mlp.coefs_[-1] + mlp.intercepts_[-1])[0]
+        grad = mlp.coefs_[-1][:, 0]
+        for W, a in zip(reversed(mlp.coefs_[:-1]), reversed(hidden)):
+            grad = W @ (grad * derivative(a))
+        return value, grad
+    return value_and_grad
+
+
+def inverse_solver(regressor, scaler):
+    """
+    Pick the inverse solver for a fitted surrogate: exact for linear models,
+    gradient based for SVR and MLP, None (swarm search) for everything else,
+    e.g. trees and forests whose piecewise constant output has no gradient.
+    """
+    try:
+        offset, scale = affine_scaling(scaler)
+    except Exception:
+        return None  # Not a per-feature scaler
+    if isinstance(regressor, LINEAR_MODELS) or (isinstance(regressor, SVR) and regressor.kernel == 'linear'):
+        return LinearInverse(np.ravel(regressor.coef_), float(np.ravel(regressor.intercept_)[0]), offset, scale)
+    if isinstance(regressor, SVR) and regressor.kernel == 'rbf':
+        return GradientInverse(svr_rbf_gradient(regressor), offset, scale)
+    if isinstance(regressor, MLPRegressor) and regressor.activation in ACTIVATIONS:
+        return GradientInverse(mlp_gradient(regressor), offset, scale)
+    return None
@@ -0,0 +1,257 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from jobs.events import report_progress
+from .inverse import inverse_solver
+from .swarm import swarm_pso
+
+# Optimizers of a worker process by model name, built once per pool by init_worker
+_worker = {}
+
+
+def surrogate_objective(x, epsilon, regressor, scaler, features):
+    """
+    Distance of the surrogate's predictions from the target value, for the
+    whole swarm at once.
+    """
+    # Convert x to DataFrame with feature names to avoid scaler warnings
+    x_df = pd.DataFrame(x, columns=features)
+    x_scaled = scaler.transform(x_df)
+    prediction = regressor.predict(x_scaled)
+    return np.abs(prediction - epsilon)
+
+
+def init_worker(models):
+    for name, (regressor, scaler, objective) in models.items():
+        _worker[name] = PSO_Optimizer(regressor, scaler, objective)
+
+
+def run_seed(name, n_run, optimisation_options):
+    return _worker[name].optimisation(n_run, optimisation_options, [])
+
+
+class PSO_Optimizer:
+    def __init__(self, regressor, scaler, objective):
+        self.regressor = regressor
+        self.scaler = scaler
+        self.base_objective = objective
+        self.objective = lambda x, cp: objective(x, cp, regressor)
+        # Exact or gradient based inverse when the surrogate allows it, otherwise a swarm search
+        self.solver = inverse_solver(regressor, scaler)
+
+    def optimisation(self, n_run, optimisation_options, manager_list):
+        print('Optimization No.:', n_run)
+
+        if self.solver is not None:
+            xopt = self.solver.solve(n_run, np.asarray(optimisation_options['lb'], dtype=float),
+                                     np.asarray(optimisation_options['ub'], dtype=float),
+                                     optimisation_options['Epsilon'])
+            fopt = float(self.objective(xopt[np.newaxis, :], optimisation_options['Epsilon'])[0])
+            manager_list.append((xopt, fopt))
+            return (xopt, fopt)
+
+        # The objective scores the whole swarm per call, see swarm_pso
+        xopt, fopt = swarm_pso(
+            self.objective,
+            optimisation_options['lb'],
+            optimisation_options['ub'],
+            args=[optimisation_options['Epsilon']],
+            swarmsize=optimisation_options['swarmsize'],
+            omega=optimisation_options['omega'],
+            phip=optimisation_options['phip'],
+            phig=optimisation_options['phig'],
+            maxiter=optimisation_options['maxiter'],
+            debug=optimisation_options['debug_flag'],
+            seed=n_run)
+        manager_list.append((xopt, fopt))
+        return (xopt, fopt)
+
+    def reset(self):
+        self.sols_per = []
+        self.sols_xopts = []
+        self.sols_pred = []
+
+    def add_solutions(self, return_list, optimisation_options):
+        """
+        Score the (xopt, fopt) results of a round and add them to the solutions.
+        """
+        # Predict every solution of the round at once
+        x_df = pd.DataFrame([xopt for xopt, fopt in return_list], columns=optimisation_options['opt_vars'])
+        preds = self.regressor.predict(self.scaler.transform(x_df)) if return_list else []
+        for (xopt, fopt), pred_xopt in zip(return_list, preds):
+            if optimisation_options['Epsilon'] != 0:
+                per_sol_pred = abs(pred_xopt - optimisation_options['Epsilon']) / optimisation_options['Epsilon']
+            else:
+                per_sol_pred = 999999999999999999999999
+
+            self.sols_per.append(per_sol_pred)
+            self.sols_xopts.append(xopt)
+            self.sols_pred.append(pred_xopt)
+
+    def best_error(self):
+        return float(np.min(self.sols_per)) if self.sols_per else float('inf')
+
+    def solutions(self, optimisation_options):
+        """
+        The best n_solutions solutions found so far, as the sols_df returned by
+        optimisation_parallel.
+        """
+        n_solutions = optimisation_options['n_solutions']
+        sols_per = np.array(self.sols_per)
+        sols_xopts = np.array(self.sols_xopts).reshape(len(sols_per), len(optimisation_options['opt_vars']))
+        sols_pred = np.array(self.sols_pred)
+
+        sols_per_argsort = sols_per.argsort()
+
+        sols_per = sols_per[sols_per_argsort][:n_solutions]
+        sols_xopts = sols_xopts[sols_per_argsort][:n_solutions]
+        sols_pred = sols_pred[sols_per_argsort][:n_solutions]
+
+        sols_df = pd.DataFrame()
+
+        for _item in enumerate(optimisation_options['opt_vars']):
+            sols_df[optimisation_options['opt_vars'][_item[0]]] = sols_xopts[:, _item[0]]
+
+        sols_df['Epsilon'] = sols_pred
+        sols_df['% Error'] = sols_per
+
+        sols_df.columns = ['Pred_' + item for item in sols_df.columns]
+
+        sols_df.loc[:, 'Epsilon'] = optimisation_options['Epsilon']
+
+        return sols_df
+
+    def optimisation_parallel(self, optimisation_options):
+        n_solutions = optimisation_options['n_solutions']
+        nprocessors = optimisation_options['nprocessors']
+        start = time.time()
+        starttime = datetime.now()
+
+        print('Optimisation sequence started at time: ' + starttime.strftime("%Y-%m-%d %H:%M:%S"))
+
+        run_flag = True
+        round_count = 0
+        self.reset()
+
+        pool = None
+        # Inverse solvers take milliseconds, only swarm searches are worth a process pool
+        if optimisation_options.get('parallel_mode', 'process') == 'process' and nprocessors > 1 \
+                and self.solver is None:
+            # The model and scaler reach every worker once, by fork or through the initializer,
+            # after that only the seed and options travel per run
+            pool = ProcessPoolExecutor(nprocessors, initializer=init_worker,
+                                       initargs=({None: (self.regressor, self.scaler, self.base_objective)},))
+
+        try:
+            while run_flag:
+                seeds_list = np.arange(1, nprocessors + 1) + nprocessors * round_count
+
+                round_count += 1
+                print('Working on round:', round_count)
+
+                if pool is not None:
+                    return_list = list(pool.map(run_seed, repeat(None), seeds_list, repeat(optimisation_options)))
+                else:
+                    return_list = []
+
+                    processes = []
+                    for i in seeds_list:
+                        p = threading.Thread(name=str(i), target=self.optimisation, args=(i, optimisation_options, return_list))
+                        processes.append(p)
+                        p.start()
+
+                    for j in processes:
+                        j.join()
+
+                self.add_solutions(return_list, optimisation_options)
+
+                print('So far', len(self.sols_per), 'solutions have been found')
+                report_progress('pso', done=min(len(self.sols_per), n_solutions), total=n_solutions, round=round_count,
+                                max_rounds=optimisation_options['max_rounds'], solutions_found=len(self.sols_per),
+                                best_error=self.best_error() if self.sols_per else None)
+                if len(self.sols_per) >= n_solutions:
+                    run_flag = False
+
+                if round_count > optimisation_options['max_rounds']:
+                    run_flag = False
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        sols_df = self.solutions(optimisation_options)
+
+        end = time.time()
+        runtime = end - start
+
+        print('Optimisation finished in %.3f' % (runtime), '[s]')
+
+        return sols_df, runtime
+
+
+def race(optimizers, optimisation_options, tolerance=0.01, factor=2.0, time_budget=None, min_rounds=1):
+    """
+    Optimize several surrogates at once, round by round, dropping the ones
+    that fall clearly behind.
+
+    Every model runs the same seeds per round as optimisation_parallel and
+    stops on the same conditions (n_solutions or max_rounds). After each round
+    a model whose best % error is above `tolerance` and more than `factor`
+    times the leader's (or the tolerance, if larger) is eliminated, so the
+    shared workers go to the promising models. When `time_budget` seconds have
+    passed every model stops with what it has found so far.
+    Returns {model name: (sols_df, runtime)}.
+    """
+    n_solutions = optimisation_options['n_solutions']
+    nprocessors = optimisation_options['nprocessors']
+    start = time.time()
+    active = list(optimizers)
+    outcomes = {}
+    for optimizer in optimizers.values():
+        optimizer.reset()
+
+    if optimisation_options.get('parallel_mode', 'process') == 'process' and nprocessors > 1:
+        models = {name: (opt.regressor, opt.scaler, opt.base_objective) for name, opt in optimizers.items()}
+        executor = ProcessPoolExecutor(nprocessors, initializer=init_worker, initargs=(models,))
+        submit = lambda name, seed: executor.submit(run_seed, name, seed, optimisation_options)
+    else:
+        executor = ThreadPoolExecutor(nprocessors)
+        submit = lambda name, seed: executor.submit(optimizers[name].optimisation, seed, optimisation_options, [])
+
+    round_count = 0
+    try:
+        while active:
+            seeds_list = np.arange(1, nprocessors + 1) + nprocessors * round_count
+            round_count += 1
+            print('Working on round:', round_count, 'with', active)
+
+            # Every remaining model's seeds share the workers
+            futures = {name: [submit(name, seed) for seed in seeds_list] for name in active}
+            for name, model_futures in futures.items():
+                optimizers[name].add_solutions([future.result() for future in model_futures], optimisation_options)
+
+            best_errors = {name: optimizers[name].best_error() for name in active}
+            leader = min(best_errors.values())
+            out_of_time = time_budget is not None and time.time() - start > time_budget
+            for name in list(active):
+                optimizer = optimizers[name]
+                finished = len(optimizer.sols_per) >= n_solutions or round_count > optimisation_options['max_rounds']
+                eliminated = round_count >= min_rounds and best_errors[name] > tolerance \
+                    and best_errors[name] > factor * max(leader, tolerance)
+                if finished or eliminated or out_of_time:
+                    if eliminated and not finished:
+                        print(f"Eliminated {name} after round {round_count}, best % error {best_errors[name]}")
+                    active.remove(name)
+                    outcomes[name] = (optimizer.solutions(optimisation_options), time.time() - start)
+
+            report_progress('race', done=len(optimizers) - len(active), total=len(optimizers), round=round_count,
+                            active=list(active), best_errors=best_errors, best_error=leader)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+    return outcomes
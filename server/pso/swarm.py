@@ -0,0 +1,77 @@
+import numpy as np
+
+
+def swarm_pso(func, lb, ub, args=(), swarmsize=100, omega=0.5, phip=0.5, phig=0.5, maxiter=100,
+              minstep=1e-8, minfunc=1e-8, debug=False, seed=None):
+    """
+    Particle swarm minimisation of `func` within the bounds `lb` and `ub`.
+
+    Same algorithm, parameters and stopping rules as pyswarm.pso, but `func`
+    receives the whole swarm as a (swarmsize, n_features) array and returns
+    one objective value per particle, so a surrogate model is called once per
+    iteration instead of once per particle. Random numbers come from a
+    generator seeded with `seed`, so runs in parallel threads stay
+    reproducible. Returns the best position and its objective value.
+    """
+    rng = np.random.RandomState(seed)
+    lb = np.asarray(lb, dtype=float)
+    ub = np.asarray(ub, dtype=float)
+    assert lb.shape == ub.shape, 'Lower- and upper-bounds must be the same length'
+    assert np.all(ub > lb), 'All upper-bound values must be greater than lower-bound values'
+
+    vhigh = np.abs(ub - lb)
+    vlow = -vhigh
+    S, D = swarmsize, len(lb)
+
+    def evaluate(x):
+        return np.asarray(func(x, *args), dtype=float).reshape(S)
+
+    # Initialize the particles
+    x = lb + rng.rand(S, D) * (ub - lb)
+    fx = evaluate(x)
+    p = x.copy()
+    fp = fx.copy()
+
+    # Swarm's best position
+    i_min = np.argmin(fp)
+    if fp[i_min] < np.inf:
+        fg = fp[i_min]
+        g = p[i_min, :].copy()
+    else:
+        fg = np.inf
+        g = x[0, :].copy()
+
+    v = vlow + rng.rand(S, D) * (vhigh - vlow)
+
+    for it in range(1, maxiter + 1):
+        rp = rng.uniform(size=(S, D))
+        rg = rng.uniform(size=(S, D))
+        v = omega * v + phip * rp * (p - x) + phig * rg * (g - x)
+        x = np.clip(x + v, lb, ub)
+        fx = evaluate(x)
+
+        # Particles' best positions
+        i_update = fx < fp
+        p[i_update, :] = x[i_update, :]
+        fp[i_update] = fx[i_update]
+
+        i_min = np.argmin(fp)
+        if fp[i_min] < fg:
+            if debug:
+                print('New best for swarm at iteration {:}: {:} {:}'.format(it, p[i_min, :], fp[i_min]))
+            p_min = p[i_min, :].copy()
+            stepsize = np.sqrt(np.sum((g - p_min) ** 2))
+            if np.abs(fg - fp[i_min]) <= minfunc:
+                print('Stopping search: Swarm best objective change less than {:}'.format(minfunc))
+                return p_min, fp[i_min]
+            elif stepsize <= minstep:
+                print('Stopping search: Swarm best position change less than {:}'.format(minstep))
+                return p_min, fp[i_min]
+            g = p_min
+            fg = fp[i_min]
+
+        if debug:
+            print('Best after iteration {:}: {:} {:}'.format(it, g, fg))
+
+    print('Stopping search: maximum iterations reached --> {:}'.format(maxiter))
+    return g, fg
@@ -9,11 +9,8 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.linear_model import LinearRegression, Ridge, Lasso
 from sklearn.svm import SVR
 from sklearn.tree import DecisionTreeRegressor
-from pyswarm import pso
-import time
-from datetime import datetime
-import threading
 import warnings
+from functools import partial
 
 # Added imports for plotting and image handling
 import matplotlib.pyplot as plt
@@ -22,116 +19,9 @@ import base64
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
 
-
-class PSO_Optimizer:
-    def __init__(self, regressor, scaler, objective):
-        self.regressor = regressor
-        self.scaler = scaler
-        self.objective = lambda x, cp: objective(x, cp, regressor)
-
-    def optimisation(self, n_run, optimisation_options, manager_list):
-        print('Optimization No.:', n_run)
-        np.random.seed(n_run)
-
-        xopt, fopt = pso(
-            self.objective,
-            optimisation_options['lb'],
-            optimisation_options['ub'],
-            args=[optimisation_options['Epsilon']],
-            swarmsize=optimisation_options['swarmsize'],
-            omega=optimisation_options['omega'],
-            phip=optimisation_options['phip'],
-            phig=optimisation_options['phig'],
-            maxiter=optimisation_options['maxiter'],
-            debug=optimisation_options['debug_flag'])
-        manager_list.append((xopt, fopt))
-        return (xopt, fopt)
-
-    def optimisation_parallel(self, optimisation_options):
-        n_solutions = optimisation_options['n_solutions']
-        nprocessors = optimisation_options['nprocessors']
-        start = time.time()
-        starttime = datetime.now()
-
-        print('Optimisation sequence started at time: ' + starttime.strftime("%Y-%m-%d %H:%M:%S"))
-
-        run_flag = True
-        round_count = 0
-
-        sols_per = []
-        sols_xopts = []
-        sols_pred = []
-
-        while run_flag:
-            seeds_list = np.arange(1, nprocessors + 1) + nprocessors * round_count
-
-            round_count += 1
-            print('Working on round:', round_count)
-
-            return_list = []
-
-            processes = []
-            for i in seeds_list:
-                p = threading.Thread(name=str(i), target=self.optimisation, args=(i, optimisation_options, return_list))
-                processes.append(p)
-                p.start()
-
-            for j in processes:
-                j.join()
-
-            for xopt, fopt in return_list:
-                # Convert xopt to DataFrame with feature names to avoid scaler warnings
-                x_df = pd.DataFrame([xopt], columns=optimisation_options['opt_vars'])
-                x_scaled = self.scaler.transform(x_df)
-                pred_xopt = self.regressor.predict(x_scaled)[0]
-                if optimisation_options['Epsilon'] != 0:
-                    per_sol_pred = abs(pred_xopt - optimisation_options['Epsilon']) / optimisation_options['Epsilon']
-                else:
-                    per_sol_pred = 999999999999999999999999
-
-                sols_per.append(per_sol_pred)
-                sols_xopts.append(xopt)
-                sols_pred.append(pred_xopt)
-
-            print('So far', len(sols_per), 'solutions have been found')
-            if len(sols_per) >= n_solutions:
-                run_flag = False
-
-                sols_per = np.array(sols_per)
-                sols_xopts = np.array(sols_xopts)
-                sols_pred = np.array(sols_pred)
-
-                sols_per_argsort = np.array(sols_per).argsort()
-
-                sols_per = sols_per[sols_per_argsort]
-                sols_xopts = sols_xopts[sols_per_argsort]
-                sols_pred = sols_pred[sols_per_argsort]
-
-                sols_per = sols_per[:n_solutions]
-                sols_xopts = sols_xopts[:n_solutions]
-                sols_pred = sols_pred[:n_solutions]
-
-            if round_count > optimisation_options['max_rounds']:
-                run_flag = False
-
-        sols_df = pd.DataFrame()
-
-        for _item in enumerate(optimisation_options['opt_vars']):
-            sols_df[optimisation_options['opt_vars'][_item[0]]] = sols_xopts[:, _item[0]]
-
-        sols_df['Epsilon'] = sols_pred
-        sols_df['% Error'] = sols_per
-
-        end = time.time()
-        runtime = end - start
-
-        print('Optimisation finished in %.3f' % (runtime), '[s]')
-
-        sols_df.columns = ['Pred_' + item for item in sols_df.columns]
-
-        sols_df.loc[:, 'Epsilon'] = optimisation_options['Epsilon']
-
-        return sols_df, runtime
+from jobs.events import report_progress
+from jobs.runner import run_as_job
+from .optimizer import PSO_Optimizer, race, surrogate_objective
 
 
 def get_model(model_name):
@@ -155,6 +45,7 @@ def get_model(model_name):
         raise ValueError(f"Unknown model: {model_name}")
 
 
+@run_as_job
 @api_view(['POST'])
 def optimize(request):
     try:
@@ -193,13 +84,9 @@ def optimize(request):
             "Decision Tree"
         ]
 
-        # Objective function
-        def objective(x, epsilon, regressor):
-            # Convert x to DataFrame with feature names to avoid scaler warnings
-            x_df = pd.DataFrame([x], columns=features)
-            x_scaled = scaler.transform(x_df)
-            prediction = regressor.predict(x_scaled)[0]
-            return abs(prediction - epsilon)
+        # Objective function, evaluated for the whole swarm at once; a module level function so
+        # it can be sent to worker processes
+        objective = partial(surrogate_objective, scaler=scaler, features=features)
 
         epsilon = target_value  # Use user-provided target_value
 
@@ -216,6 +103,7 @@ def optimize(request):
             'n_solutions': pso_config['n_solutions'],
             'nprocessors': pso_config['nprocessors'],
             'max_rounds': pso_config['max_rounds'],
+            'parallel_mode': pso_config.get('parallel_mode', 'process'),
             'opt_vars': features
         }
 
@@ -228,13 +116,31 @@ def optimize(request):
         # Dictionary to store best solutions per model
         best_solutions_per_model = {}
 
-        for model_name in supported_models:
-            print(f"Starting optimization for model: {model_name}")
-            regressor = get_model(model_name)
-            regressor.fit(scaler.transform(X_train), y_train)  # Fit model on scaled data
-
-            optimizer = PSO_Optimizer(regressor, scaler, objective)
-            sols_df, runtime = optimizer.optimisation_parallel(optimisation_options)
+        # Race mode: all models are optimized together and the hopeless ones are dropped early
+        outcomes = None
+        if pso_config.get('race', False):
+            optimizers = {}
+            for model_name in supported_models:
+                regressor = get_model(model_name)
+                regressor.fit(scaler.transform(X_train), y_train)  # Fit model on scaled data
+                optimizers[model_name] = PSO_Optimizer(regressor, scaler, objective)
+            outcomes = race(optimizers, optimisation_options,
+                            tolerance=pso_config.get('race_tolerance', 0.01),
+                            factor=pso_config.get('race_factor', 2.0),
+                            time_budget=pso_config.get('time_budget'))
+
+        for i, model_name in enumerate(supported_models):
+            if outcomes is not None:
+                sols_df, runtime = outcomes[model_name]
+            else:
+                print(f"Starting optimization for model: {model_name}")
+                report_progress('model', done=i, total=len(supported_models), model=model_name,
+                                best_model=best_model_name, best_fopt=best_fopt if best_model_name else None)
+                regressor = get_model(model_name)
+                regressor.fit(scaler.transform(X_train), y_train)  # Fit model on scaled data
+
+                optimizer = PSO_Optimizer(regressor, scaler, objective)
+                sols_df, runtime = optimizer.optimisation_parallel(optimisation_options)
 
             # Find the best fopt for this model
             current_best_fopt = sols_df['Pred_% Error'].min()
@@ -262,6 +168,9 @@ def optimize(request):
                 best_sols_df = sols_df
                 best_runtime = runtime
 
+            report_progress('model', done=i + 1, total=len(supported_models), model=model_name,
+                            best_model=best_model_name, best_fopt=float(best_fopt))
+
         if not best_solutions_per_model:
             return Response({"error": "No models were optimized."}, status=400)
 